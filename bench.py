@@ -0,0 +1,312 @@
+import os
+import sys
+import json
+import time
+import builtins
+import argparse
+import subprocess
+import tempfile
+import importlib
+import contextlib
+from datetime import datetime
+from colorama import init, Fore, Style
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from localchain import (LocalChain, RpcCounter, CHAIN_ID, WALLET_BALANCE, SEED_AMOUNT, PING, SWAPPONG_PONG,
+                        SUSDT, SOMI, SEND_TOKEN, deploy_stand_ins)
+
+init(autoreset=True)
+
+BORDER_WIDTH = 80
+# Cold start of `main.py <script>` up to the script's run function, best of STARTUP_RUNS
+STARTUP_BUDGET = 3.0
+STARTUP_RUNS = 3
+# Only the code paths that use them may import these
+HEAVY_MODULES = ("web3", "solcx", "inquirer")
+
+# Scripted answers to each script's input() prompts, and token balances it needs up front
+SCENARIOS = {
+    "sendtx": {"inputs": ["1", "", "1"]},
+    "mintping": {"inputs": []},
+    "mintpong": {"inputs": []},
+    "mintsusdt": {"inputs": []},
+    "swapping": {"inputs": ["10", "1"], "seed": [PING]},
+    "swappong": {"inputs": ["100", "1"], "seed": [SWAPPONG_PONG]},
+    "buymeme": {"inputs": ["1", "10"], "seed": [SUSDT]},
+    "sellmeme": {"inputs": ["1", "10"], "seed": [SOMI]},
+    "deploytoken": {"inputs": ["Bench Token", "BENCH", "18", "1000000"]},
+    "sendtoken": {"inputs": [SEND_TOKEN, "1", "1"]},
+    "conftnft": {"inputs": []},
+}
+
+def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
+    text = text.strip()
+    if len(text) > width - 4:
+        text = text[:width - 7] + "..."
+    padded_text = f" {text} ".center(width - 2)
+    print(f"{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
+    print(f"{color}│{padded_text}│{Style.RESET_ALL}")
+    print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+
+def create_wallets(chain: LocalChain, count: int) -> list:
+    from eth_account import Account
+    wallets = [Account.create() for _ in range(count)]
+    for wallet in wallets:
+        chain.set_balance(wallet.address, WALLET_BALANCE)
+    return wallets
+
+class _NoDelay:
+    """Stands in for a script's `time` module so per-wallet pacing sleeps are skipped."""
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+@contextlib.contextmanager
+def scripted_input(answers: list):
+    queue = list(answers)
+    original = builtins.input
+
+    def fake_input(prompt=""):
+        if not queue:
+            raise EOFError(f"benchmark ran out of scripted input at prompt: {prompt!r}")
+        return queue.pop(0)
+
+    builtins.input = fake_input
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+def load_script(name: str, rpc_url: str, keep_delays: bool):
+    module = importlib.import_module(f"scripts.{name}")
+    for attr in ("NETWORK_URL", "SOMNIA_TESTNET_RPC_URL"):
+        if hasattr(module, attr):
+            setattr(module, attr, rpc_url)
+    if not keep_delays and hasattr(module, "time"):
+        module.time = _NoDelay()
+    return module
+
+def run_scenario(name: str, chain: LocalChain, counter: RpcCounter, wallets: list, keep_delays: bool, verbose: bool,
+                 proxy=None) -> dict:
+    import metrics
+    scenario = SCENARIOS[name]
+    for token in scenario.get("seed", []):
+        for wallet in wallets:
+            chain.set_mapping(token, 0, wallet.address, SEED_AMOUNT)
+    module = load_script(name, counter.url, keep_delays)
+    runner = getattr(module, f"run_{name}")
+
+    counter.reset()
+    injected = proxy.stats() if proxy is not None else {}
+    error = None
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, scripted_input(scenario["inputs"]):
+        with contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+            try:
+                runner()
+            except (Exception, SystemExit) as e:
+                error = f"{type(e).__name__}: {e}"
+    duration = time.perf_counter() - start
+    calls = counter.reset()
+    faults = {kind: count - injected.get(kind, 0) for kind, count in (proxy.stats() if proxy is not None else {}).items()
+              if count > injected.get(kind, 0)}
+
+    data = metrics.snapshot(name).get(name, {"stages": {}, "counters": {}})
+    counters = data["counters"]
+    inclusion = data["stages"].get("inclusion", {})
+    submitted = calls.get("eth_sendRawTransaction", 0)
+    confirmed = counters.get("tx_confirmed", 0)
+    total_calls = sum(calls.values())
+    return {
+        "script": name,
+        "wallets": len(wallets),
+        "duration": round(duration, 3),
+        "submitted": submitted,
+        "confirmed": confirmed,
+        "reverted": counters.get("tx_reverted", 0),
+        "timeouts": counters.get("tx_timeout", 0),
+        "tx_per_sec": round(confirmed / duration, 3) if duration else 0.0,
+        "inclusion_p50": inclusion.get("p50", 0.0),
+        "inclusion_p99": inclusion.get("p99", 0.0),
+        "rpc_calls": total_calls,
+        "rpc_per_tx": round(total_calls / submitted, 2) if submitted else None,
+        "rpc_methods": dict(sorted(calls.items(), key=lambda item: -item[1])),
+        "stages": data["stages"],
+        "faults": faults,
+        "error": error,
+    }
+
+def print_report(results: list):
+    print(f"{Fore.CYAN}  {'script':<12}{'tx':>6}{'ok':>6}{'tx/s':>9}{'p50 (s)':>10}{'p99 (s)':>10}{'rpc/tx':>9}{'time (s)':>10}{Style.RESET_ALL}")
+    for r in results:
+        color = Fore.RED if r["error"] or r["confirmed"] < r["submitted"] else Fore.GREEN
+        rpc_per_tx = f"{r['rpc_per_tx']:.1f}" if r["rpc_per_tx"] is not None else "-"
+        print(f"{color}  {r['script']:<12}{r['submitted']:>6}{r['confirmed']:>6}{r['tx_per_sec']:>9.2f}"
+              f"{r['inclusion_p50']:>10.3f}{r['inclusion_p99']:>10.3f}{rpc_per_tx:>9}{r['duration']:>10.2f}{Style.RESET_ALL}")
+        if r["error"]:
+            print(f"{Fore.RED}    ✖ {r['error']}{Style.RESET_ALL}")
+
+def write_results(results: list, args, output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(output_dir, f"bench-{args.wallets}w-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "started": stamp,
+            "wallets": args.wallets,
+            "threads": args.threads,
+            "block_time": args.block_time,
+            "provider_profile": args.provider_profile,
+            "faults": args.faults,
+            "results": results,
+        }, f, indent=2)
+    return path
+
+def list_scripts() -> list:
+    return sorted(name[:-3] for name in os.listdir(os.path.join(ROOT_DIR, "scripts"))
+                  if name.endswith(".py") and not name.startswith("_"))
+
+def _startup_command(name: str = None, importtime: bool = False) -> list:
+    # What `python main.py <script>` imports before the script starts: the entry point, the CLI and the script
+    # (name None: the headless CLI alone). The importtime run also reports which HEAVY_MODULES got loaded
+    flags = ["-X", "importtime"] if importtime else []
+    code = "import main, cli" + (f"; import scripts.{name}" if name else "")
+    if importtime:
+        code += f"; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    return [sys.executable, *flags, "-c", code]
+
+def _slowest_imports(stderr: str, n: int = 5) -> list:
+    # -X importtime lines: "import time: self [us] | cumulative | <indent>package"; top level has no indent
+    imports = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit() or parts[2].startswith("  "):
+            continue
+        imports.append((int(parts[1]) / 1e6, parts[2].strip()))
+    return sorted(imports, reverse=True)[:n]
+
+def measure_startup(name: str = None, runs: int = STARTUP_RUNS) -> dict:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(_startup_command(name), cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            return {"script": name, "seconds": None, "imports": [], "loaded": [],
+                    "error": proc.stderr.strip().splitlines()[-1]}
+    proc = subprocess.run(_startup_command(name, importtime=True), cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return {"script": name, "seconds": min(timings), "imports": _slowest_imports(proc.stderr), "loaded": loaded, "error": None}
+
+def check_startup(names: list, budget: float) -> bool:
+    print_border(f"STARTUP: {len(names)} SCRIPTS, BUDGET {budget:.2f}s", Fore.CYAN)
+    ok = True
+    for name in names:
+        result = measure_startup(name)
+        if result["error"]:
+            ok = False
+            print(f"{Fore.RED}  ✖ {name:<12} {result['error']}{Style.RESET_ALL}")
+            continue
+        within = result["seconds"] <= budget
+        ok = ok and within
+        color = Fore.GREEN if within else Fore.RED
+        slowest = ", ".join(f"{module} {seconds:.3f}s" for seconds, module in result["imports"])
+        print(f"{color}  {'✔' if within else '✖'} {name:<12} {result['seconds']:.3f}s  {slowest}{Style.RESET_ALL}")
+    return ok
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end throughput benchmark against a local anvil chain")
+    parser.add_argument("--wallets", type=int, default=10, help="number of generated, funded wallets (default 10)")
+    parser.add_argument("--threads", type=int, default=None, help="maxWorkers for the scripts (default: config.json)")
+    parser.add_argument("--scripts", default=None, help="comma-separated scripts to run, in order (default: all)")
+    parser.add_argument("--block-time", type=float, default=None, help="anvil block time in seconds (default: automine)")
+    parser.add_argument("--keep-delays", action="store_true", help="keep the scripts' per-wallet pacing sleeps")
+    parser.add_argument("--output", default=None, help="directory for the JSON report (default: metrics summary dir)")
+    parser.add_argument("--verbose", action="store_true", help="show script output")
+    parser.add_argument("--provider-profile", choices=("fast", "default"), default=None,
+                        help="provider profile for the scripts (default: config.json); compare rpc/tx between the two")
+    parser.add_argument("--faults", default=None,
+                        help="inject latency and errors from this mockrpc fault profile (JSON) between the scripts and anvil")
+    parser.add_argument("--startup", action="store_true",
+                        help="no chain: check each script's cold start against --startup-budget, exit 1 if over")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET,
+                        help=f"cold start budget in seconds for --startup (default {STARTUP_BUDGET})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    available = list_scripts() if args.startup else list(SCENARIOS)
+    names = [name.strip() for name in (args.scripts or ",".join(available)).split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        print(f"{Fore.RED}  ✖ Unknown scripts: {', '.join(unknown)} (available: {', '.join(available)}){Style.RESET_ALL}")
+        sys.exit(2)
+    if args.startup:
+        sys.exit(0 if check_startup(names, args.startup_budget) else 1)
+
+    # Scripts read config.json at import time, so the bench config has to be in place first
+    import config
+    bench_config = json.loads(json.dumps(config.load_config()))
+    if args.threads:
+        bench_config.setdefault("threads", {})["maxWorkers"] = args.threads
+    args.threads = bench_config.get("threads", {}).get("maxWorkers", 10)
+    if args.provider_profile:
+        bench_config.setdefault("provider", {})["profile"] = args.provider_profile
+    args.provider_profile = bench_config.get("provider", {}).get("profile", "fast")
+    workdir = tempfile.mkdtemp(prefix="somnia-bench-")
+    config_path = os.path.join(workdir, "config.json")
+    with open(config_path, "w") as f:
+        json.dump(bench_config, f)
+    os.environ["CONFIG_PATH"] = config_path
+    config.CONFIG_PATH = config_path
+    config._config = None
+    output_dir = os.path.abspath(args.output or bench_config.get("metrics", {}).get("summaryDir", "metrics"))
+
+    print_border(f"BENCHMARK: {len(names)} SCRIPTS × {args.wallets} WALLETS", Fore.CYAN)
+    chain = LocalChain(CHAIN_ID, block_time=args.block_time)
+    counter = proxy = None
+    cwd = os.getcwd()
+    results = []
+    try:
+        chain.start()
+        upstream = chain.url
+        if args.faults:
+            import mockrpc
+            proxy = mockrpc.FaultProxy(chain.url, mockrpc.load_faults(args.faults)).start()
+            upstream = proxy.url
+            print(f"{Fore.YELLOW}  ℹ Injecting faults from {args.faults} on {proxy.url}{Style.RESET_ALL}")
+        counter = RpcCounter(upstream).start()
+        print(f"{Fore.YELLOW}  ℹ anvil on {chain.url} (chain {CHAIN_ID}), counting RPC on {counter.url}{Style.RESET_ALL}")
+        deploy_stand_ins(chain)
+        wallets = create_wallets(chain, args.wallets)
+        os.chdir(workdir)
+        with open("pvkey.txt", "w") as f:
+            f.write("\n".join(wallet.key.hex() for wallet in wallets) + "\n")
+        print(f"{Fore.YELLOW}  ℹ {len(wallets)} wallets funded, working directory {workdir}{Style.RESET_ALL}")
+        for name in names:
+            print(f"{Fore.CYAN}  > {name}...{Style.RESET_ALL}")
+            results.append(run_scenario(name, chain, counter, wallets, args.keep_delays, args.verbose, proxy))
+    finally:
+        os.chdir(cwd)
+        if counter is not None:
+            counter.stop()
+        if proxy is not None:
+            proxy.stop()
+        chain.stop()
+
+    print_border("RESULTS", Fore.GREEN)
+    print_report(results)
+    path = write_results(results, args, output_dir)
+    print(f"{Fore.YELLOW}  ℹ Benchmark results written to {path}{Style.RESET_ALL}")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+
+import console
+import network
+import profiler
+import preflight
+import txerrors
+import reconcile
+
+def add_arguments(parser: argparse.ArgumentParser):
+    profiler.add_arguments(parser)
+    console.add_arguments(parser)
+    preflight.add_arguments(parser)
+    network.add_arguments(parser)
+    parser.add_argument("--dashboard", action="store_true",
+                        help="live progress view instead of per-wallet lines (human/compact modes)")
+
+def run_script(script: str, func, args):
+    if args.preflight:
+        preflight.configure(args.preflight)
+    with console.capture(script, args.log_mode, args.log_level) as con, network.use(args.network):
+        board = None
+        if args.dashboard and con.mode != "json":
+            import dashboard
+            # An explicit --log-level wins over the dashboard's quieter default
+            board = dashboard.Dashboard(script, con, log_level=None if args.log_level else dashboard.LOG_LEVEL).start()
+        try:
+            if args.profile:
+                return profiler.profile_run(script, func, mode=args.profile, top=args.top)
+            return func()
+        finally:
+            if board is not None:
+                board.stop()
+            # Anything the script did not settle itself (batch modes, an aborted run)
+            reconcile.settle(script)
+            txerrors.report(script)
+
+def run(script: str, func):
+    parser = argparse.ArgumentParser(description=f"Run {script}")
+    add_arguments(parser)
+    return run_script(script, func, parser.parse_args())
@@ -0,0 +1,19 @@
+import os
+import json
+
+CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "config.json"))
+
+_config = None
+
+def load_config() -> dict:
+    global _config
+    if _config is None:
+        try:
+            with open(CONFIG_PATH, "r") as f:
+                _config = json.load(f)
+        except Exception:
+            _config = {}
+    return _config
+
+def get_section(name: str) -> dict:
+    return load_config().get(name) or {}
@@ -0,0 +1,263 @@
+import io
+import os
+import re
+import sys
+import json
+import queue
+import builtins
+import threading
+import contextlib
+from loguru import logger
+
+import config
+
+CONSOLE_CONFIG = config.get_section("console")
+CONSOLE_MODE = os.environ.get("CONSOLE_MODE", CONSOLE_CONFIG.get("mode", "human"))
+CONSOLE_LEVEL = os.environ.get("LOG_LEVEL", CONSOLE_CONFIG.get("level"))
+MODES = ("human", "compact", "json")
+# human keeps every line (boxes and spacing included); the others start at INFO
+DEFAULT_LEVELS = {"human": "DEBUG", "compact": "INFO", "json": "INFO"}
+BATCH_SIZE = 512
+
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+DECORATION_RE = re.compile(r'^[\s┌┐└┘─═│]*$')
+ICON_LEVELS = {"✖": "ERROR", "⚠": "WARNING", "✔": "SUCCESS"}
+
+def classify(text: str):
+    """Return (level, text) for one ANSI-stripped line of script output."""
+    if DECORATION_RE.match(text):
+        return "DEBUG", text.strip()
+    text = text.strip().strip("│").strip()
+    return ICON_LEVELS.get(text[:1], "INFO"), text
+
+def _short_thread(name: str) -> str:
+    if name == "MainThread":
+        return "main"
+    match = re.search(r'_(\d+)$', name)
+    return f"w{match.group(1)}" if match else name
+
+class _Writer:
+    """Dedicated writer thread: callers only enqueue, so workers never wait on the terminal.
+
+    An optional footer (the live dashboard) stays pinned below the scrolling output: each
+    batch erases it, writes the new lines and redraws it.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.queue = queue.SimpleQueue()
+        self.footer = ""
+        self._shown = 0
+        self._hold = False
+        self.thread = threading.Thread(target=self._run, name="console-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, text: str, stream=None):
+        self.queue.put(("text", text, stream or self.out))
+
+    def set_footer(self, text: str):
+        self.queue.put(("footer", text, None))
+
+    def hold_footer(self, hold: bool):
+        self.queue.put(("hold", hold, None))
+
+    def drain(self):
+        done = threading.Event()
+        self.queue.put(("drain", done, None))
+        done.wait()
+
+    def close(self):
+        self.drain()
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            chunks = {}
+            redraw = False
+            for item in batch:
+                if item is None:
+                    self._flush(chunks, redraw)
+                    return
+                kind, payload, stream = item
+                if kind == "text":
+                    chunks.setdefault(stream, []).append(payload)
+                elif kind == "footer":
+                    self.footer = payload
+                    redraw = True
+                else:
+                    self._flush(chunks, True)
+                    chunks, redraw = {}, False
+                    if kind == "hold":
+                        self._hold = payload
+                        self._flush({}, True)
+                    else:
+                        payload.set()
+            self._flush(chunks, redraw)
+
+    def _flush(self, chunks: dict, redraw: bool):
+        for stream, texts in chunks.items():
+            if stream is not self.out:
+                self._write(stream, "".join(texts))
+        text = "".join(chunks.get(self.out, ()))
+        if not text and not redraw:
+            return
+        if self._shown:
+            # Back to the first footer line and clear to the end of the screen
+            text = f"\x1b[{self._shown}F\x1b[J" + text
+        self._shown = 0
+        if self.footer and not self._hold:
+            text += self.footer
+            self._shown = self.footer.count("\n")
+        self._write(self.out, text)
+
+    def _write(self, stream, text: str):
+        if not text:
+            return
+        try:
+            stream.write(text)
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+class _ConsoleStream(io.TextIOBase):
+    """sys.stdout stand-in that turns each thread's complete lines into log records."""
+
+    def __init__(self, target, emit):
+        self._target = target
+        self._emit = emit
+        self._partial = {}
+
+    @property
+    def encoding(self):
+        return getattr(self._target, "encoding", "utf-8")
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        # colorama strips colours from non-tty streams
+        return self._target.isatty()
+
+    def write(self, text: str) -> int:
+        ident = threading.get_ident()
+        *lines, rest = (self._partial.pop(ident, "") + text).split("\n")
+        for line in lines:
+            self._emit(line)
+        if rest:
+            self._partial[ident] = rest
+        return len(text)
+
+    def flush(self):
+        # Lines are handed to the writer as they complete; colorama flushes after every chunk
+        pass
+
+    def take_partial(self) -> str:
+        return self._partial.pop(threading.get_ident(), "")
+
+class Console:
+    def __init__(self, mode: str = CONSOLE_MODE, level: str = CONSOLE_LEVEL, script: str = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown console mode: {mode} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.level = (level or DEFAULT_LEVELS[mode]).upper()
+        self._level_no = logger.level(self.level).no
+        self.script = script
+        self.writer = None
+        self.handler_id = None
+        self._stdout = None
+        self._input = None
+
+    def _emit(self, line: str):
+        text = ANSI_RE.sub("", line)
+        level, message = classify(text)
+        if self.mode != "human" and not message:
+            return
+        logger.bind(raw=line).log(level, message)
+
+    def _prompt(self, prompt=""):
+        # Prompts skip the logger: show the pending partial line plus the prompt, wait until
+        # it is on screen, then read. JSON mode keeps stdout parseable by prompting on stderr.
+        text = sys.stdout.take_partial() + str(prompt) if isinstance(sys.stdout, _ConsoleStream) else str(prompt)
+        self.writer.hold_footer(True)
+        if text:
+            stream = self._stdout if self.mode != "json" else sys.__stderr__
+            self.writer.put(text if self.mode == "human" else ANSI_RE.sub("", text), stream)
+        self.writer.drain()
+        try:
+            return self._input()
+        finally:
+            self.writer.hold_footer(False)
+
+    def set_level(self, level: str):
+        self._level_no = logger.level(level.upper()).no
+        self.level = level.upper()
+
+    def isatty(self) -> bool:
+        try:
+            return bool(self._stdout and self._stdout.isatty())
+        except (AttributeError, ValueError):
+            return False
+
+    def _filter(self, record) -> bool:
+        return record["level"].no >= self._level_no
+
+    def _sink(self, message):
+        record = message.record
+        if self.mode == "human":
+            text = record["extra"].get("raw", record["message"]) + "\n"
+        elif self.mode == "compact":
+            text = (f"{record['time']:%H:%M:%S} {record['level'].name[:4]:<4} "
+                    f"{_short_thread(record['thread'].name):>4} {record['message']}\n")
+        else:
+            text = json.dumps({
+                "ts": record["time"].isoformat(timespec="milliseconds"),
+                "level": record["level"].name,
+                "script": self.script,
+                "thread": record["thread"].name,
+                "msg": record["message"],
+            }, ensure_ascii=False) + "\n"
+        self.writer.put(text)
+
+    def install(self):
+        self._stdout = sys.stdout
+        self.writer = _Writer(self._stdout)
+        logger.remove()
+        self.handler_id = logger.add(self._sink, level=0, filter=self._filter, format="{message}",
+                                     colorize=False, catch=True)
+        sys.stdout = _ConsoleStream(self._stdout, self._emit)
+        self._input = builtins.input
+        builtins.input = self._prompt
+        return self
+
+    def uninstall(self):
+        stream = sys.stdout
+        if isinstance(stream, _ConsoleStream):
+            for rest in list(stream._partial.values()):
+                self._emit(rest)
+        sys.stdout = self._stdout
+        builtins.input = self._input
+        if self.handler_id is not None:
+            logger.remove(self.handler_id)
+            self.handler_id = None
+        self.writer.close()
+
+@contextlib.contextmanager
+def capture(script: str = None, mode: str = None, level: str = None):
+    console = Console(mode or CONSOLE_MODE, level or CONSOLE_LEVEL, script).install()
+    try:
+        yield console
+    finally:
+        console.uninstall()
+
+def add_arguments(parser):
+    parser.add_argument("--log-mode", choices=MODES, default=None,
+                        help=f"console output: human (default), compact or json lines (current: {CONSOLE_MODE})")
+    parser.add_argument("--log-level", default=None,
+                        help="minimum level: DEBUG, INFO, SUCCESS, WARNING or ERROR")
@@ -0,0 +1,135 @@
+import time
+import shutil
+import threading
+from collections import deque
+from colorama import Fore, Style
+
+import config
+import metrics
+
+DASHBOARD_CONFIG = config.get_section("dashboard")
+REFRESH_HZ = DASHBOARD_CONFIG.get("refreshHz", 4)
+RATE_WINDOW = DASHBOARD_CONFIG.get("rateWindow", 10)
+# Per-wallet lines below this level are hidden while the dashboard is up
+LOG_LEVEL = DASHBOARD_CONFIG.get("logLevel", "WARNING")
+# Without a terminal there is nothing to redraw; print a status line this often instead
+PLAIN_INTERVAL = DASHBOARD_CONFIG.get("plainInterval", 10)
+MAX_WIDTH = 100
+
+def _clock(seconds) -> str:
+    if seconds is None:
+        return "--:--:--"
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+class Dashboard:
+    """Live view of one script run, redrawn at a fixed rate from metrics counters only."""
+
+    def __init__(self, script: str, console, refresh_hz: float = REFRESH_HZ, log_level: str = LOG_LEVEL):
+        self.script = script
+        self.console = console
+        self.interval = 1 / refresh_hz
+        self.log_level = log_level
+        self.tty = console.isatty()
+        self.active = False
+        self._resolved = deque()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="dashboard", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.active:
+            stats = self.compute()
+            self.console.writer.set_footer("")
+            self.console.writer.put(self.render(stats) if self.tty else self.render_line(stats) + "\n")
+
+    def _run(self):
+        last_line = 0.0
+        while not self._stop.wait(self.interval):
+            stats = self.compute()
+            if not self.active:
+                # Stay out of the way until the script has read its inputs and starts the fan-out
+                if stats["total"] is None:
+                    continue
+                self.active = True
+                if self.log_level:
+                    self.console.set_level(self.log_level)
+            if self.tty:
+                self.console.writer.set_footer(self.render(stats))
+            elif stats["now"] - last_line >= PLAIN_INTERVAL:
+                last_line = stats["now"]
+                self.console.writer.put(self.render_line(stats) + "\n")
+
+    def compute(self) -> dict:
+        live = metrics.live(self.script)
+        counters, stages = live["counters"], live["stages"]
+        now = time.time()
+        submitted = stages.get("submit", 0) - counters.get("submit_errors", 0)
+        confirmed = counters.get("tx_confirmed", 0)
+        reverted = counters.get("tx_reverted", 0)
+        timeouts = counters.get("tx_timeout", 0)
+        resolved = confirmed + reverted
+
+        self._resolved.append((now, resolved))
+        while len(self._resolved) > 2 and now - self._resolved[0][0] > RATE_WINDOW:
+            self._resolved.popleft()
+        first_at, first = self._resolved[0]
+        tps = (resolved - first) / (now - first_at) if now > first_at else 0.0
+
+        rpc_calls = sum(stages.get(stage, 0) for stage in metrics.RPC_STAGES)
+        rpc_errors = sum(counters.get(f"{stage}_errors", 0) for stage in metrics.RPC_STAGES)
+        elapsed = now - live["started"] if live["started"] else 0.0
+        done, total = counters.get("done", 0), live["total"]
+        eta = None
+        if total and done and elapsed:
+            eta = max(total - done, 0) / (done / elapsed)
+        return {
+            "now": now,
+            "elapsed": elapsed,
+            "total": total,
+            "done": done,
+            "succeeded": counters.get("succeeded", 0),
+            "failed": counters.get("failed", 0),
+            "submitted": submitted,
+            "pending": max(submitted - resolved - timeouts, 0),
+            "confirmed": confirmed,
+            "reverted": reverted,
+            "timeouts": timeouts,
+            "tps": tps,
+            "in_flight": live["active"],
+            # metrics.timer observes failed calls too, so rpc_calls already includes the errors
+            "rpc_error_rate": min(rpc_errors / rpc_calls, 1.0) if rpc_calls else 0.0,
+            "eta": eta,
+        }
+
+    def render(self, s: dict) -> str:
+        width = min(shutil.get_terminal_size((80, 24)).columns, MAX_WIDTH) - 1
+        total = s["total"] or 0
+        ratio = min(s["done"] / total, 1.0) if total else 0.0
+        bar_width = max(width - 46, 10)
+        filled = int(bar_width * ratio)
+        title = f" {self.script.upper()} │ {_clock(s['elapsed'])} "
+        rows = [
+            (Fore.CYAN, f"┌{title.center(width - 2, '─')}┐"),
+            (Fore.WHITE, f"│ {'█' * filled}{'░' * (bar_width - filled)} {s['done']}/{total} ({ratio:.1%})  ETA {_clock(s['eta'])}"),
+            (Fore.WHITE, f"│ submitted {s['submitted']}  pending {s['pending']}  confirmed {s['confirmed']}"),
+            (Fore.YELLOW if s["failed"] or s["reverted"] else Fore.WHITE,
+             f"│ succeeded {s['succeeded']}  failed {s['failed']}  reverted {s['reverted']}  timed out {s['timeouts']}"),
+            (Fore.YELLOW if s["rpc_error_rate"] > 0.05 else Fore.WHITE,
+             f"│ tx/s {s['tps']:.2f}  in-flight {s['in_flight']}  rpc errors {s['rpc_error_rate']:.1%}"),
+            (Fore.CYAN, f"└{'─' * (width - 2)}┘"),
+        ]
+        return "".join(f"{color}{text[:width]}{Style.RESET_ALL}\n" for color, text in rows)
+
+    def render_line(self, s: dict) -> str:
+        return (f"[{self.script} {_clock(s['elapsed'])}] {s['done']}/{s['total'] or 0} done, "
+                f"submitted {s['submitted']}, pending {s['pending']}, confirmed {s['confirmed']}, "
+                f"failed {s['failed']}, reverted {s['reverted']}, {s['tps']:.2f} tx/s, "
+                f"in-flight {s['in_flight']}, rpc errors {s['rpc_error_rate']:.1%}, ETA {_clock(s['eta'])}")
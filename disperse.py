@@ -0,0 +1,243 @@
+import os
+import threading
+import concurrent.futures
+from collections import deque
+from colorama import Fore, Style
+
+import config
+import metrics
+import reconcile
+import txerrors
+
+DISPERSE_CONFIG = config.get_section("disperse")
+# Reuse a deployed contract; otherwise the first run deploys one and records it in CONTRACT_FILE
+DISPERSE_ADDRESS = DISPERSE_CONFIG.get("address")
+CONTRACT_FILE = "contractDisperse.txt"
+# Gas per disperse transaction; capped at 80% of the block gas limit
+GAS_TARGET = DISPERSE_CONFIG.get("gasTarget", 10_000_000)
+MAX_RECIPIENTS = DISPERSE_CONFIG.get("maxRecipients", 500)
+# Transactions in flight per sender before waiting on the oldest receipt
+PIPELINE_DEPTH = DISPERSE_CONFIG.get("pipelineDepth", 8)
+GAS_MARGIN = 1.2
+# Planning figures before a contract exists: call overhead, and a value transfer to a fresh account
+DEFAULT_BASE_GAS = 30_000
+DEFAULT_GAS_PER_RECIPIENT = 36_000
+SOLC_VERSION = "0.8.22"
+
+SOURCE = """\
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.22;
+
+contract Disperse {
+    function disperseEther(address payable[] calldata recipients, uint256[] calldata values) external payable {
+        require(recipients.length == values.length, "length mismatch");
+        for (uint256 i = 0; i < recipients.length; i++) {
+            (bool ok, ) = recipients[i].call{value: values[i]}("");
+            require(ok, "transfer failed");
+        }
+        uint256 rest = address(this).balance;
+        if (rest > 0) {
+            (bool ok, ) = payable(msg.sender).call{value: rest}("");
+            require(ok, "refund failed");
+        }
+    }
+}
+"""
+
+ABI = [
+    {
+        "inputs": [
+            {"internalType": "address payable[]", "name": "recipients", "type": "address[]"},
+            {"internalType": "uint256[]", "name": "values", "type": "uint256[]"}
+        ],
+        "name": "disperseEther",
+        "outputs": [],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+_lock = threading.Lock()
+
+def compile_contract() -> tuple:
+    from solcx import compile_source, install_solc, get_installed_solc_versions
+    if SOLC_VERSION not in {str(v) for v in get_installed_solc_versions()}:
+        print(f"{Fore.YELLOW}  ℹ Installing solc version {SOLC_VERSION}...{Style.RESET_ALL}")
+        install_solc(SOLC_VERSION)
+    compiled = compile_source(SOURCE, output_values=['abi', 'bin'], solc_version=SOLC_VERSION)
+    _, interface = compiled.popitem()
+    return interface['abi'], interface['bin']
+
+def _known_address(w3):
+    candidates = [DISPERSE_ADDRESS] if DISPERSE_ADDRESS else []
+    if os.path.exists(CONTRACT_FILE):
+        with open(CONTRACT_FILE, 'r') as f:
+            candidates += [line.strip() for line in f if line.strip() and not line.startswith('#')][::-1]
+    for address in candidates:
+        if w3.is_address(address) and w3.eth.get_code(w3.to_checksum_address(address)):
+            return w3.to_checksum_address(address)
+    return None
+
+def find(w3):
+    """The configured or previously deployed Disperse contract, or None."""
+    address = _known_address(w3)
+    return w3.eth.contract(address=address, abi=ABI) if address else None
+
+def get_contract(w3, private_key: str, tx_fields: dict, script: str):
+    """The Disperse contract: configured, recorded by an earlier run, or deployed now by private_key."""
+    with _lock:
+        address = _known_address(w3)
+        if address is None:
+            account = w3.eth.account.from_key(private_key)
+            with metrics.timer(script, "compile"):
+                abi, bytecode = compile_contract()
+            factory = w3.eth.contract(abi=abi, bytecode=bytecode)
+            with metrics.timer(script, "nonce"):
+                nonce = w3.eth.get_transaction_count(account.address, 'pending')
+            tx = factory.constructor().build_transaction({**tx_fields, 'from': account.address, 'nonce': nonce})
+            tx_hash = txerrors.send(w3, script, tx, private_key, label="Disperse deployment")
+            receipt = reconcile.wait_for_receipt(w3, script, tx_hash, timeout=180, units=0)
+            if receipt.status != 1:
+                raise RuntimeError(f"Disperse deployment reverted: 0x{tx_hash.hex()}")
+            address = receipt['contractAddress']
+            with open(CONTRACT_FILE, 'a') as f:
+                f.write(f"{address}\n")
+            print(f"{Fore.GREEN}  ✔ Disperse contract deployed at {address} (saved to {CONTRACT_FILE}){Style.RESET_ALL}")
+        return w3.eth.contract(address=address, abi=ABI)
+
+def disperse_call(contract):
+    """The batch call of a Disperse contract, in the form estimate() and send_lane() take.
+
+    A batch call maps (recipients, values) to (contract function, wei sent with it); any other
+    one-call-per-chunk contract (e.g. sendtoken's batchSendToken) can be planned and sent the same way.
+    """
+    return lambda recipients, values: (contract.functions.disperseEther(recipients, values), sum(values))
+
+def _with_value(fields: dict, value: int) -> dict:
+    # Non-payable batch functions refuse a value field, even a zero one, on some web3 versions
+    return {**fields, 'value': value} if value else fields
+
+def _estimate_pair(call, sender: str, recipients: list, value: int, script: str) -> tuple:
+    fn, sent = call(recipients[:1], [value])
+    with metrics.timer(script, "gas_estimate"):
+        one = fn.estimate_gas(_with_value({'from': sender}, sent))
+    if len(recipients) < 2:
+        return 0, one
+    fn, sent = call(recipients[:2], [value, value])
+    with metrics.timer(script, "gas_estimate"):
+        two = fn.estimate_gas(_with_value({'from': sender}, sent))
+    per_recipient = max(two - one, 1)
+    return max(one - per_recipient, 0), per_recipient
+
+def estimate(contract, sender: str, recipients: list, value: int, script: str, call=None) -> tuple:
+    """(base gas, gas per recipient) for the worst case: the larger of two estimates over real
+    recipients and two over fresh addresses, which cost an account creation (or a new balance
+    slot) each. `call` defaults to disperse_call(contract)."""
+    from eth_account import Account
+    call = call or disperse_call(contract)
+    fresh = [Account.create().address for _ in range(2)]
+    real_base, real_per = _estimate_pair(call, sender, recipients, value, script)
+    fresh_base, fresh_per = _estimate_pair(call, sender, fresh, value, script)
+    return max(real_base, fresh_base), max(real_per, fresh_per)
+
+def chunk_size(w3, base_gas: int, per_recipient: int, script: str,
+               gas_target: int = GAS_TARGET, max_recipients: int = MAX_RECIPIENTS) -> tuple:
+    """(recipients per transaction, effective gas target)."""
+    with metrics.timer(script, "read"):
+        block_gas_limit = w3.eth.get_block('latest')['gasLimit']
+    gas_target = min(gas_target, int(block_gas_limit * 0.8))
+    size = int((gas_target - base_gas) / (per_recipient * GAS_MARGIN))
+    return max(1, min(size, max_recipients)), gas_target
+
+def gas_limit(base_gas: int, per_recipient: int, recipients: int) -> int:
+    return int((base_gas + per_recipient * recipients) * GAS_MARGIN)
+
+def assign(chunks: list, balances: dict, cost) -> tuple:
+    """Spread chunks over senders: each goes to the affordable sender with the shortest lane.
+
+    cost(chunk) is the wei a chunk takes out of its sender (values plus max gas).
+    Returns ({sender: [chunk, ...]}, [chunks no sender could afford]).
+    """
+    remaining = dict(balances)
+    lanes = {sender: [] for sender in balances}
+    unfunded = []
+    for chunk in sorted(chunks, key=cost, reverse=True):
+        needed = cost(chunk)
+        candidates = [s for s in lanes if remaining[s] >= needed]
+        if not candidates:
+            unfunded.append(chunk)
+            continue
+        sender = min(candidates, key=lambda s: (len(lanes[s]), -remaining[s]))
+        lanes[sender].append(chunk)
+        remaining[sender] -= needed
+    return {s: lane for s, lane in lanes.items() if lane}, unfunded
+
+def _settle(script: str, explorer_url: str, index: int, chunk: tuple, tx_hash, receipt_future) -> bool:
+    recipients, _ = chunk
+    try:
+        receipt = receipt_future.result()
+        ok = receipt.status == 1
+    except Exception as e:
+        print(f"{Fore.RED}  ✖ Batch {index}: {str(e)}{Style.RESET_ALL}")
+        ok = False
+    else:
+        if ok:
+            print(f"{Fore.GREEN}  ✔ Batch {index}: {len(recipients)} transfers │ Gas: {receipt['gasUsed']} │ Tx: {explorer_url}{tx_hash.hex()}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}  ✖ Batch {index}: Reverted │ Tx: {explorer_url}{tx_hash.hex()}{Style.RESET_ALL}")
+    metrics.progress(script, ok, len(recipients))
+    return ok
+
+def send_lane(w3, contract, private_key: str, chunks: list, base_gas: int, per_recipient: int, tx_fields: dict,
+              script: str, explorer_url: str, depth: int = PIPELINE_DEPTH, call=None) -> tuple:
+    """Send (recipients, values) chunks from one wallet on consecutive nonces, keeping `depth` in flight.
+    Each chunk is one `call` (default disperse_call(contract)).
+
+    Returns (confirmed transactions, delivered transfers, [(hash, recipients) of batches whose receipt
+    wait timed out]); those may still land, see reconcile.settle().
+    """
+    from web3.exceptions import TimeExhausted
+    call = call or disperse_call(contract)
+    sender = w3.eth.account.from_key(private_key).address
+    with metrics.timer(script, "nonce"):
+        nonce = w3.eth.get_transaction_count(sender, 'pending')
+    confirmed = delivered = 0
+    timed_out = []
+    in_flight = deque()
+
+    def settle():
+        nonlocal confirmed, delivered
+        index, chunk, tx_hash, receipt_future = in_flight.popleft()
+        if _settle(script, explorer_url, index, chunk, tx_hash, receipt_future):
+            confirmed += 1
+            delivered += len(chunk[0])
+        elif isinstance(receipt_future.exception(), TimeExhausted):
+            timed_out.append((reconcile.tx_hex(tx_hash), chunk[0]))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=depth) as executor:
+        for index, (recipients, values) in enumerate(chunks, 1):
+            if len(in_flight) >= depth:
+                settle()
+            try:
+                fn, value = call(recipients, values)
+                tx = fn.build_transaction(_with_value({
+                    **tx_fields,
+                    'from': sender,
+                    'nonce': nonce,
+                    'gas': gas_limit(base_gas, per_recipient, len(recipients)),
+                }, value))
+                sent = {}
+                tx_hash = txerrors.send(w3, script, tx, private_key, label=f"Batch {index}", sent=sent)
+                # Recovery may have moved the nonce; the next chunk follows whichever one went out
+                nonce = sent['nonce'] + 1
+            except Exception as e:
+                # Later nonces would only queue behind the gap; stop this lane
+                print(f"{Fore.RED}  ✖ Batch {index}: Failed to send from {sender}: {str(e)}{Style.RESET_ALL}")
+                for skipped, _ in chunks[index - 1:]:
+                    metrics.progress(script, False, len(skipped))
+                break
+            in_flight.append((index, (recipients, values), tx_hash,
+                              executor.submit(reconcile.wait_for_receipt, w3, script, tx_hash, 180, units=len(recipients))))
+        while in_flight:
+            settle()
+    return confirmed, delivered, timed_out
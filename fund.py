@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import argparse
+import concurrent.futures
+from colorama import init, Fore, Style
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import config
+import metrics
+import disperse
+import reconcile
+
+init(autoreset=True)
+
+BORDER_WIDTH = 80
+SCRIPT_NAME = "fund"
+NETWORK_URL = "https://dream-rpc.somnia.network"
+CHAIN_ID = 50312
+EXPLORER_URL = "https://shannon-explorer.somnia.network/tx/0x"
+THREADS = config.get_section("threads").get("maxWorkers", 10)
+FANOUT = config.get_section("funding").get("fanout", 10)
+
+# What one wallet spends per job: (STT sent per run, gas once, gas per run, minimum balance the script checks)
+JOBS = {
+    "mintping": (0, 0, 80_000, 0.002),
+    "mintpong": (0, 0, 200_000, 0.001),
+    "conftnft": (0.1, 0, 200_000, 0.1),
+    "mintsusdt": (0, 0, 200_000, 0),
+    "deploytoken": (0, 0, 2_000_000, 0),
+    "sendtoken": (0, 0, 200_000, 0),
+    "sendtx": (None, 0, 21_000, 0),
+    "swapping": (0, 200_000, 300_000, 0),
+    "swappong": (0, 200_000, 300_000, 0),
+    "buymeme": (0, 200_000, 300_000, 0),
+    "sellmeme": (0, 200_000, 300_000, 0),
+}
+
+def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
+    text = text.strip()
+    if len(text) > width - 4:
+        text = text[:width - 7] + "..."
+    padded_text = f" {text} ".center(width - 2)
+    print(f"{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
+    print(f"{color}│{padded_text}│{Style.RESET_ALL}")
+    print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+
+def load_keys(file_path: str) -> list:
+    keys = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            key = line.strip()
+            if key and not key.startswith('#'):
+                keys.append(key if key.startswith('0x') else '0x' + key)
+    return keys
+
+def requirement(job: str, runs: int, amount: float, max_fee: int) -> int:
+    """Wei one wallet needs for `runs` runs of `job` at max_fee per gas."""
+    if job == "custom":
+        return int(amount * 10**18)
+    value, gas_once, gas_per_run, minimum = JOBS[job]
+    value = amount if value is None else value
+    needed = int(value * 10**18) * runs + (gas_once + gas_per_run * runs) * max_fee
+    return max(needed, int(minimum * 10**18))
+
+def children(node: int, count: int, fanout: int) -> list:
+    # Heap layout over the wallet list; node -1 is the master
+    first = fanout * (node + 1)
+    return list(range(first, min(first + fanout, count)))
+
+def plan_tree(needs: list, fanout: int, base_gas: int, per_recipient: int, max_fee: int) -> dict:
+    """Bottom-up amounts: each node receives its own need, its subtree's amounts and the gas to forward them."""
+    count = len(needs)
+    sends = [0] * count
+    for node in range(count - 1, -1, -1):
+        kids = children(node, count, fanout)
+        forward_gas = disperse.gas_limit(base_gas, per_recipient, len(kids)) * max_fee if kids else 0
+        sends[node] = needs[node] + sum(sends[kid] for kid in kids) + forward_gas
+    levels, frontier = [], [-1]
+    while frontier:
+        senders = [node for node in frontier if children(node, count, fanout)]
+        if not senders:
+            break
+        levels.append(senders)
+        frontier = [kid for node in senders for kid in children(node, count, fanout)]
+    root = children(-1, count, fanout)
+    return {
+        "sends": sends,
+        "levels": levels,
+        "total": sum(sends[kid] for kid in root) + disperse.gas_limit(base_gas, per_recipient, len(root)) * max_fee,
+        "transactions": sum(len(level) for level in levels),
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fund many wallets through a fan-out tree of disperse transactions")
+    parser.add_argument("--job", required=True, choices=sorted(JOBS) + ["custom"],
+                        help="script the wallets will run; sets each wallet's requirement")
+    parser.add_argument("--runs", type=int, default=1, help="runs (transactions / swaps) per wallet (default 1)")
+    parser.add_argument("--amount", type=float, default=0.0,
+                        help="STT per transfer for sendtx, or the exact STT per wallet for --job custom")
+    parser.add_argument("--keys", default="pvkey.txt", help="wallets to fund (default pvkey.txt)")
+    parser.add_argument("--master-key", default=None, help="funding wallet's private key (or set MASTER_KEY)")
+    parser.add_argument("--fanout", type=int, default=FANOUT, help=f"children per node (default {FANOUT})")
+    parser.add_argument("--full", action="store_true", help="send the full requirement instead of topping up to it")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without sending anything")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    master_key = args.master_key or os.environ.get("MASTER_KEY")
+    if not master_key:
+        print(f"{Fore.RED}  ✖ Pass --master-key or set MASTER_KEY{Style.RESET_ALL}")
+        sys.exit(2)
+    if (args.job == "custom" or args.job == "sendtx") and args.amount <= 0:
+        print(f"{Fore.RED}  ✖ --job {args.job} needs --amount{Style.RESET_ALL}")
+        sys.exit(2)
+
+    import provider
+    from eth_account import Account
+    if not 2 <= args.fanout <= disperse.MAX_RECIPIENTS:
+        print(f"{Fore.RED}  ✖ --fanout must be between 2 and {disperse.MAX_RECIPIENTS}{Style.RESET_ALL}")
+        sys.exit(2)
+
+    print_border(f"FUNDING TREE: {args.job} × {args.runs}", Fore.CYAN)
+    metrics.start_run(SCRIPT_NAME)
+    w3 = provider.get_web3(NETWORK_URL)
+    master = Account.from_key(master_key).address
+    keys = load_keys(args.keys)
+    addresses = [Account.from_key(key).address for key in keys]
+    with metrics.timer(SCRIPT_NAME, "fee"):
+        base_fee = w3.eth.get_block('latest').get('baseFeePerGas', w3.to_wei(2, 'gwei'))
+    priority_fee = w3.to_wei(2, 'gwei')
+    # Headroom for base fee growth over the tree's depth; leftovers stay with the intermediates
+    max_fee = base_fee * 2 + priority_fee
+    tx_fields = {'chainId': CHAIN_ID, 'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': priority_fee}
+
+    required = requirement(args.job, args.runs, args.amount, max_fee)
+    if args.full:
+        needs = [required] * len(addresses)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+            with metrics.timer(SCRIPT_NAME, "read"):
+                balances = list(executor.map(w3.eth.get_balance, addresses))
+        needs = [max(required - balance, 0) for balance in balances]
+    wallets = [(key, address, need) for key, address, need in zip(keys, addresses, needs) if need > 0]
+    print(f"{Fore.YELLOW}  ℹ {len(addresses)} wallets, {len(wallets)} below {w3.from_wei(required, 'ether')} STT "
+          f"for {args.job} × {args.runs}{Style.RESET_ALL}")
+    if not wallets:
+        return
+
+    # A dry run never deploys; without a contract it plans with the default gas figures
+    contract = disperse.find(w3) if args.dry_run else disperse.get_contract(w3, master_key, tx_fields, SCRIPT_NAME)
+    if contract is not None:
+        sample = [address for _, address, _ in wallets[:2]]
+        base_gas, per_recipient = disperse.estimate(contract, master, sample, 1, SCRIPT_NAME)
+    else:
+        base_gas, per_recipient = disperse.DEFAULT_BASE_GAS, disperse.DEFAULT_GAS_PER_RECIPIENT
+    # Each node pays its children in one transaction, so no node may have more than fit under the gas target:
+    # one that never lands strands its whole subtree
+    size, gas_target = disperse.chunk_size(w3, base_gas, per_recipient, SCRIPT_NAME)
+    if args.fanout > size:
+        print(f"{Fore.YELLOW}  ⚠ Fan-out {args.fanout} needs more than the {gas_target} gas target per transaction, "
+              f"using {size}{Style.RESET_ALL}")
+        args.fanout = size
+    plan = plan_tree([need for _, _, need in wallets], args.fanout, base_gas, per_recipient, max_fee)
+    with metrics.timer(SCRIPT_NAME, "read"):
+        master_balance = w3.eth.get_balance(master)
+    print(f"{Fore.YELLOW}  ℹ Fan-out {args.fanout}: {len(plan['levels'])} levels, {plan['transactions']} transactions "
+          f"(vs {len(wallets)} sequential), master sends {w3.from_wei(plan['total'], 'ether'):.6f} STT "
+          f"of {w3.from_wei(master_balance, 'ether'):.6f}{Style.RESET_ALL}")
+    for depth, senders in enumerate(plan["levels"]):
+        print(f"{Fore.CYAN}    level {depth}: {len(senders)} sender(s){Style.RESET_ALL}")
+    if args.dry_run:
+        return
+    if master_balance < plan["total"]:
+        print(f"{Fore.RED}  ✖ Master wallet {master} cannot cover the tree{Style.RESET_ALL}")
+        sys.exit(1)
+
+    metrics.set_total(SCRIPT_NAME, len(wallets))
+    funded = {-1}
+    started = time.perf_counter()
+    for depth, senders in enumerate(plan["levels"]):
+        lanes = {}
+        for node in senders:
+            if node not in funded:
+                # Its own funding failed, so its subtree cannot be reached this run
+                continue
+            kids = children(node, len(wallets), args.fanout)
+            key = master_key if node == -1 else wallets[node][0]
+            lanes[node] = (key, kids, [([wallets[kid][1] for kid in kids], [plan["sends"][kid] for kid in kids])])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(THREADS, len(lanes)))) as executor:
+            futures = {executor.submit(disperse.send_lane, w3, contract, key, chunks, base_gas, per_recipient,
+                                       tx_fields, SCRIPT_NAME, EXPLORER_URL): kids
+                       for key, kids, chunks in lanes.values()}
+            late = {}
+            for future in concurrent.futures.as_completed(futures):
+                confirmed, _, timed_out = future.result()
+                if confirmed:
+                    funded.update(futures[future])
+                late.update((tx_hash, futures[future]) for tx_hash, _ in timed_out)
+        # A funding transaction that lands after its receipt wait still lets the next level go ahead
+        landed = set()
+        reconcile.settle(SCRIPT_NAME, confirmed=landed)
+        for tx_hash in landed:
+            funded.update(late.get(tx_hash, ()))
+        print(f"{Fore.YELLOW}  ℹ Level {depth} done: {len(funded) - 1}/{len(wallets)} wallets funded "
+              f"after {time.perf_counter() - started:.1f}s{Style.RESET_ALL}")
+
+    print_border(f"COMPLETED: {len(funded) - 1}/{len(wallets)} WALLETS FUNDED IN {len(plan['levels'])} LEVELS", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {
+        "successful": len(funded) - 1,
+        "total": len(wallets),
+        "job": args.job,
+        "runs": args.runs,
+        "fanout": args.fanout,
+        "levels": len(plan["levels"]),
+        "transactions": plan["transactions"],
+        "total_wei": plan["total"],
+    })
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import concurrent.futures
+from colorama import init, Fore, Style
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import config
+
+init(autoreset=True)
+
+BORDER_WIDTH = 80
+NETWORK_URL = "https://dream-rpc.somnia.network"
+INDEXER_CONFIG = config.get_section("indexer")
+INDEX_PATH = INDEXER_CONFIG.get("path", "index.sqlite")
+START_BLOCK = INDEXER_CONFIG.get("startBlock", 0)
+WORKERS = INDEXER_CONFIG.get("workers", 8)
+# Blocks per eth_getLogs range: halved when the node refuses a range, doubled while ranges stay sparse
+CHUNK_SIZE = INDEXER_CONFIG.get("chunkSize", 2000)
+MAX_CHUNK_SIZE = INDEXER_CONFIG.get("maxChunkSize", 50_000)
+SPARSE_LOGS = 2500
+CONFIRMATIONS = INDEXER_CONFIG.get("confirmations", 2)
+FOLLOW_INTERVAL = INDEXER_CONFIG.get("followInterval", 5)
+# Scripts answer balance/eligibility checks from the index only when enabled and recently updated
+USE_FOR_CHECKS = INDEXER_CONFIG.get("useForChecks", False)
+MAX_AGE = INDEXER_CONFIG.get("maxAge", 300)
+
+TRANSFER = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+APPROVAL = "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925"
+# Uniswap V3 pool Swap(sender, recipient, amount0, amount1, sqrtPriceX96, liquidity, tick)
+SWAP = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+EVENTS = {TRANSFER: "Transfer", APPROVAL: "Approval", SWAP: "Swap"}
+ZERO_ADDRESS = "0x" + "0" * 40
+DECIMALS = "0x313ce567"
+# eth_getLogs refusals that a smaller range fixes: result caps, range caps, server-side query timeouts
+REFUSALS = ("query returned more than", "block range", "range too large", "too many results", "response size",
+            "response too large", "log response", "limit", "timeout", "timed out")
+
+# name: (address, kind); kind erc20 | erc721 | pool
+CONTRACTS = {
+    "PING": ("0x33E7fAB0a8a5da1A923180989bD617c9c2D1C493", "erc20"),
+    "PONG": ("0x9beaA0016c22B646Ac311Ab171270B0ECf23098F", "erc20"),
+    "SWAP_PING": ("0xbecd9b5f373877881d91cbdbaf013d97eb532154", "erc20"),
+    "SWAP_PONG": ("0x7968ac15a72629e05f41b8271e4e7292e0cc9f90", "erc20"),
+    "sUSDT": ("0x65296738D4E5edB1515e40287B6FDf8320E6eE04", "erc20"),
+    "SOMI": ("0x7a7045415f3682C3349E4b68d2940204b81fFF33", "erc20"),
+    "SMSM": ("0x6756B4542d545270CacF1F15C3b7DefE589Ba1aa", "erc20"),
+    "SMI": ("0xC9005DD5C562bDdEF1Cf3C90Ad5B1Bf54fB8aa9d", "erc20"),
+    "CoNFT": ("0xFC79f0EaC5bEcf21fDcf037bAdb977b2b43DE497", "erc721"),
+    **{name: (address, "pool") for name, address in INDEXER_CONFIG.get("pools", {}).items()},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (address TEXT PRIMARY KEY, name TEXT, kind TEXT, decimals INTEGER);
+CREATE TABLE IF NOT EXISTS logs (
+    block INTEGER, tx TEXT, log_index INTEGER, contract TEXT, event TEXT, src TEXT, dst TEXT, value TEXT,
+    PRIMARY KEY (tx, log_index)
+);
+CREATE INDEX IF NOT EXISTS logs_src ON logs (src, contract);
+CREATE INDEX IF NOT EXISTS logs_dst ON logs (dst, contract);
+CREATE TABLE IF NOT EXISTS balances (contract TEXT, wallet TEXT, balance TEXT, PRIMARY KEY (contract, wallet));
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
+    text = text.strip()
+    if len(text) > width - 4:
+        text = text[:width - 7] + "..."
+    padded_text = f" {text} ".center(width - 2)
+    print(f"{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
+    print(f"{color}│{padded_text}│{Style.RESET_ALL}")
+    print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+
+def _topic_address(topic: str) -> str:
+    return "0x" + topic[-40:].lower()
+
+def connect(path: str = INDEX_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    # WAL: scripts can read the index while `--follow` keeps writing to it
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def get_meta(conn, key: str, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def register_contracts(conn, url: str, contracts: dict):
+    """Record the indexed contracts, reading each token's decimals once."""
+    import provider
+    tokens = [(name, address.lower()) for name, (address, kind) in contracts.items() if kind == "erc20"]
+    decimals = provider.rpc_batch(url, [("eth_call", [{"to": address, "data": DECIMALS}, "latest"]) for _, address in tokens])
+    by_address = {address: int(value, 16) for (_, address), value in zip(tokens, decimals)
+                  if isinstance(value, str) and value not in ("0x", "")}
+    with conn:
+        for name, (address, kind) in contracts.items():
+            conn.execute("INSERT OR REPLACE INTO contracts VALUES (?, ?, ?, ?)",
+                         (address.lower(), name, kind, by_address.get(address.lower(), 0)))
+
+def refused(error) -> bool:
+    """Whether an eth_getLogs error is the node declining the range size, rather than rate limiting or failing."""
+    message = str(error).lower()
+    if "rate limit" in message or "too many requests" in message:
+        return False
+    return any(fragment in message for fragment in REFUSALS)
+
+def fetch_logs(url: str, addresses: list, start: int, end: int) -> tuple:
+    """(logs, splits) for [start, end]; a range the node refuses (too many results, timeout) is halved.
+
+    Transport errors and other failures are raised as they are: splitting would only repeat them.
+    """
+    import provider
+    query = {"fromBlock": hex(start), "toBlock": hex(end), "address": addresses, "topics": [list(EVENTS)]}
+    try:
+        result = provider.rpc_batch(url, [("eth_getLogs", [query])])[0]
+    except provider.RpcError as e:
+        # Some nodes answer an oversized query with a single error object for the whole batch
+        result = e
+    if not isinstance(result, provider.RpcError):
+        return result, 0
+    if start == end or not refused(result):
+        raise result
+    middle = (start + end) // 2
+    first, first_splits = fetch_logs(url, addresses, start, middle)
+    second, second_splits = fetch_logs(url, addresses, middle + 1, end)
+    return first + second, 1 + first_splits + second_splits
+
+def decode(log: dict, kinds: dict) -> tuple:
+    """(row for the logs table, balance delta) for one raw log."""
+    topics = log["topics"]
+    contract = log["address"].lower()
+    event = EVENTS[topics[0]]
+    src = _topic_address(topics[1]) if len(topics) > 1 else None
+    dst = _topic_address(topics[2]) if len(topics) > 2 else None
+    if event == "Transfer" and kinds.get(contract) == "erc721":
+        value, delta = int(topics[3], 16), 1
+    elif event == "Transfer":
+        value = delta = int(log["data"], 16) if log["data"] not in ("0x", "") else 0
+    else:
+        # Approval amounts and Swap payloads are kept for history, not balances
+        value, delta = log["data"], 0
+    row = (int(log["blockNumber"], 16), log["transactionHash"], int(log["logIndex"], 16), contract, event, src, dst, str(value))
+    return row, delta
+
+def apply(conn, logs: list, kinds: dict, end: int) -> int:
+    """Store one range's logs and fold its transfers into the balances, atomically with the cursor."""
+    deltas = {}
+    stored = 0
+    with conn:
+        for log in logs:
+            if log.get("removed"):
+                continue
+            row, delta = decode(log, kinds)
+            if conn.execute("INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row).rowcount == 0:
+                continue
+            stored += 1
+            if row[4] == "Transfer" and delta:
+                contract, src, dst = row[3], row[5], row[6]
+                deltas[(contract, src)] = deltas.get((contract, src), 0) - delta
+                deltas[(contract, dst)] = deltas.get((contract, dst), 0) + delta
+        for (contract, wallet), delta in deltas.items():
+            # uint256 does not fit SQLite integers; balances are decimal strings
+            current = conn.execute("SELECT balance FROM balances WHERE contract = ? AND wallet = ?", (contract, wallet)).fetchone()
+            balance = (int(current[0]) if current else 0) + delta
+            conn.execute("INSERT OR REPLACE INTO balances VALUES (?, ?, ?)", (contract, wallet, str(balance)))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('cursor', ?)", (str(end),))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('updated', ?)", (str(time.time()),))
+    return stored
+
+def sync(conn, url: str, contracts: dict, start_block: int = START_BLOCK, workers: int = WORKERS,
+         chunk_size: int = CHUNK_SIZE, confirmations: int = CONFIRMATIONS) -> int:
+    """Index from the stored cursor up to head - confirmations; returns the new cursor."""
+    import provider
+    addresses = [address.lower() for address, _ in contracts.values()]
+    kinds = {address.lower(): kind for address, kind in contracts.values()}
+    cursor = int(get_meta(conn, "cursor", start_block - 1))
+    head = int(provider.rpc_batch(url, [("eth_blockNumber", [])])[0], 16) - confirmations
+    began = time.perf_counter()
+    stored = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while cursor < head:
+            ranges = []
+            start = cursor + 1
+            while len(ranges) < workers and start <= head:
+                ranges.append((start, min(start + chunk_size - 1, head)))
+                start = ranges[-1][1] + 1
+            results = list(executor.map(lambda r: fetch_logs(url, addresses, *r), ranges))
+            # Ranges are applied in block order, so the cursor never passes a gap
+            for (_, end), (logs, _) in zip(ranges, results):
+                stored += apply(conn, logs, kinds, end)
+                cursor = end
+            if any(splits for _, splits in results):
+                chunk_size = max(1, chunk_size // 2)
+            elif max(len(logs) for logs, _ in results) < SPARSE_LOGS:
+                chunk_size = min(MAX_CHUNK_SIZE, chunk_size * 2)
+            if sys.stdout.isatty():
+                rate = stored / max(time.perf_counter() - began, 1e-9)
+                print(f"\r{Fore.YELLOW}  ℹ Block {cursor}/{head} │ {stored} logs ({rate:,.0f}/s) │ "
+                      f"chunk {chunk_size}{Style.RESET_ALL}", end="", flush=True)
+    if sys.stdout.isatty() and stored:
+        print()
+    return cursor
+
+def _open():
+    if not USE_FOR_CHECKS or not os.path.exists(INDEX_PATH):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{INDEX_PATH}?mode=ro", uri=True)
+        if time.time() - float(get_meta(conn, "updated", 0)) > MAX_AGE:
+            conn.close()
+            return None
+        return conn
+    except sqlite3.Error:
+        return None
+
+def _indexed(conn, contract: str):
+    return conn.execute("SELECT kind, decimals FROM contracts WHERE address = ?", (contract.lower(),)).fetchone()
+
+def raw_balance(contract: str, wallet: str):
+    """Indexed balance in base units, or None when the index cannot answer (disabled, stale, not indexed)."""
+    conn = _open()
+    if conn is None:
+        return None
+    try:
+        if _indexed(conn, contract) is None:
+            return None
+        row = conn.execute("SELECT balance FROM balances WHERE contract = ? AND wallet = ?",
+                           (contract.lower(), wallet.lower())).fetchone()
+        return int(row[0]) if row else 0
+    finally:
+        conn.close()
+
+def token_balance(contract: str, wallet: str):
+    """Indexed ERC20 balance in whole tokens, or None."""
+    conn = _open()
+    if conn is None:
+        return None
+    try:
+        info = _indexed(conn, contract)
+        if info is None:
+            return None
+        row = conn.execute("SELECT balance FROM balances WHERE contract = ? AND wallet = ?",
+                           (contract.lower(), wallet.lower())).fetchone()
+        return (int(row[0]) if row else 0) / 10 ** info[1]
+    finally:
+        conn.close()
+
+def total_supply(contract: str):
+    """Indexed supply in whole tokens (everything minted from the zero address, less burns), or None."""
+    balance = token_balance(contract, ZERO_ADDRESS)
+    return -balance if balance is not None else None
+
+def has_minted(contract: str, wallet: str):
+    """Whether the index holds a mint (Transfer from the zero address) to wallet, or None."""
+    conn = _open()
+    if conn is None:
+        return None
+    try:
+        if _indexed(conn, contract) is None:
+            return None
+        row = conn.execute("SELECT 1 FROM logs WHERE dst = ? AND contract = ? AND event = 'Transfer' AND src = ? LIMIT 1",
+                           (wallet.lower(), contract.lower(), ZERO_ADDRESS)).fetchone()
+        return row is not None
+    finally:
+        conn.close()
+
+def activity(conn, wallet: str, limit: int = 20) -> list:
+    wallet = wallet.lower()
+    return conn.execute(
+        "SELECT l.block, l.tx, COALESCE(c.name, l.contract), l.event, l.src, l.dst, l.value FROM logs l "
+        "LEFT JOIN contracts c ON c.address = l.contract WHERE l.src = ? OR l.dst = ? "
+        "ORDER BY l.block DESC, l.log_index DESC LIMIT ?", (wallet, wallet, limit)).fetchall()
+
+def print_wallet(conn, wallet: str):
+    print_border(f"WALLET {wallet}", Fore.MAGENTA)
+    rows = conn.execute("SELECT c.name, c.kind, c.decimals, b.balance FROM balances b JOIN contracts c ON c.address = b.contract "
+                        "WHERE b.wallet = ? ORDER BY c.name", (wallet.lower(),)).fetchall()
+    for name, kind, decimals, balance in rows:
+        amount = f"{int(balance) / 10 ** decimals:,.4f}" if kind == "erc20" else f"{int(balance):,}"
+        print(f"{Fore.YELLOW}    {name:<10}: {amount}{Style.RESET_ALL}")
+    for block, tx, name, event, src, dst, value in activity(conn, wallet):
+        direction = "in " if dst == wallet.lower() else "out"
+        print(f"{Fore.CYAN}    {block:>10} {name:<10} {event:<9} {direction} {tx}{Style.RESET_ALL}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Index Transfer/Approval/Swap logs of the project's contracts into SQLite")
+    parser.add_argument("--db", default=INDEX_PATH, help=f"index file (default {INDEX_PATH})")
+    parser.add_argument("--from-block", type=int, default=START_BLOCK, help=f"first block for a new index (default {START_BLOCK})")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"eth_getLogs ranges fetched in parallel (default {WORKERS})")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"initial blocks per range (default {CHUNK_SIZE})")
+    parser.add_argument("--follow", action="store_true", help="keep indexing new blocks until interrupted")
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and start again from --from-block")
+    parser.add_argument("--wallet", default=None, help="print this wallet's indexed balances and recent activity, then exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.rebuild and os.path.exists(args.db):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+    conn = connect(args.db)
+    if args.wallet:
+        print_wallet(conn, args.wallet)
+        return
+    url = NETWORK_URL
+    print_border(f"INDEXER: {len(CONTRACTS)} CONTRACTS → {args.db}", Fore.CYAN)
+    register_contracts(conn, url, CONTRACTS)
+    try:
+        while True:
+            began = time.perf_counter()
+            before = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+            try:
+                cursor = sync(conn, url, CONTRACTS, args.from_block, args.workers, args.chunk_size)
+            except Exception as e:
+                if not args.follow:
+                    raise
+                # Ranges already applied stay applied; pick up from the cursor after a pause
+                print(f"{Fore.YELLOW}  ⚠ Sync failed, retrying in {FOLLOW_INTERVAL}s: {str(e)}{Style.RESET_ALL}")
+                time.sleep(FOLLOW_INTERVAL)
+                continue
+            stored = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0] - before
+            print(f"{Fore.GREEN}  ✔ Indexed to block {cursor}: {stored} new logs in {time.perf_counter() - began:.1f}s{Style.RESET_ALL}")
+            if not args.follow:
+                break
+            time.sleep(FOLLOW_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
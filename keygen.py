@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+import multiprocessing
+from colorama import init, Fore, Style
+from eth_hash.auto import keccak
+
+try:
+    import coincurve
+except ImportError:
+    coincurve = None
+
+init(autoreset=True)
+
+BORDER_WIDTH = 80
+DEFAULT_PATH = "m/44'/60'/0'/0/{}"
+CHUNK_SIZE = 5000
+
+def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
+    text = text.strip()
+    if len(text) > width - 4:
+        text = text[:width - 7] + "..."
+    padded_text = f" {text} ".center(width - 2)
+    print(f"{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
+    print(f"{color}│{padded_text}│{Style.RESET_ALL}")
+    print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+
+def _checksum(raw: bytes) -> str:
+    # EIP-55 on raw bytes; eth_utils re-validates and re-encodes its input first
+    text = raw.hex()
+    digest = keccak(text.encode()).hex()
+    return "0x" + "".join(c.upper() if d in "89abcdef" else c for c, d in zip(text, digest))
+
+def _address(key: bytes) -> str:
+    if coincurve is not None:
+        # The EC multiplication is nearly all of the cost; coincurve (libsecp256k1) is ~50x pure Python
+        return _checksum(keccak(coincurve.PublicKey.from_secret(key).format(compressed=False)[1:])[-20:])
+    from eth_keys import keys as eth_keys
+    return eth_keys.PrivateKey(key).public_key.to_checksum_address()
+
+def _format(keys: list) -> tuple:
+    addresses, secrets = [], []
+    for key in keys:
+        addresses.append(_address(key))
+        secrets.append("0x" + key.hex())
+    return "\n".join(addresses) + "\n", "\n".join(secrets) + "\n"
+
+def random_chunk(count: int) -> tuple:
+    return _format([os.urandom(32) for _ in range(count)])
+
+_seed = None
+
+def _init_hd(mnemonic: str, passphrase: str):
+    # PBKDF2 over the mnemonic is the slow part of HD derivation: once per worker, not per key
+    global _seed
+    from eth_account.hdaccount import seed_from_mnemonic
+    _seed = seed_from_mnemonic(mnemonic, passphrase)
+
+def hd_chunk(job: tuple) -> tuple:
+    from eth_account.hdaccount import key_from_seed
+    path, start, count = job
+    return _format([key_from_seed(_seed, path.format(index)) for index in range(start, start + count)])
+
+def _chunks(start: int, count: int, size: int):
+    for offset in range(0, count, size):
+        yield start + offset, min(size, count - offset)
+
+@contextlib.contextmanager
+def _open_outputs(addresses: str, keys: str, append: bool):
+    mode = "a" if append else "w"
+    files = []
+    try:
+        files.append(open(addresses, mode) if addresses else None)
+        if keys:
+            # Private keys: owner-only from the moment the file exists
+            fd = os.open(keys, os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC), 0o600)
+            files.append(os.fdopen(fd, mode))
+        else:
+            files.append(None)
+        yield files
+    finally:
+        for f in files:
+            if f is not None:
+                f.close()
+
+def generate(count: int, addresses: str = None, keys: str = None, mnemonic: str = None, passphrase: str = "",
+             path: str = DEFAULT_PATH, start: int = 0, workers: int = None, chunk_size: int = CHUNK_SIZE,
+             append: bool = False) -> int:
+    """Generate `count` keypairs across a process pool, streaming them to the output files in order."""
+    workers = workers or os.cpu_count() or 1
+    if mnemonic:
+        pool = multiprocessing.Pool(workers, initializer=_init_hd, initargs=(mnemonic, passphrase))
+        results = pool.imap(hd_chunk, ((path, first, size) for first, size in _chunks(start, count, chunk_size)))
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap(random_chunk, (size for _, size in _chunks(0, count, chunk_size)))
+    written = 0
+    began = time.perf_counter()
+    try:
+        with _open_outputs(addresses, keys, append) as (address_file, key_file):
+            for address_text, key_text in results:
+                if address_file is not None:
+                    address_file.write(address_text)
+                if key_file is not None:
+                    key_file.write(key_text)
+                written += address_text.count("\n")
+                if sys.stdout.isatty():
+                    rate = written / max(time.perf_counter() - began, 1e-9)
+                    print(f"\r{Fore.YELLOW}  ℹ {written}/{count} keypairs ({rate:,.0f}/s){Style.RESET_ALL}", end="", flush=True)
+    finally:
+        pool.close()
+        pool.join()
+    if sys.stdout.isatty():
+        print()
+    return written
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline bulk wallet / recipient generation (no network)")
+    parser.add_argument("count", type=int, help="number of keypairs to generate")
+    parser.add_argument("--addresses", default=None, help="address file to write, e.g. addressERC20.txt or address.txt")
+    parser.add_argument("--keys", default=None, help="private key file to write (pvkey.txt format, mode 0600)")
+    parser.add_argument("--append", action="store_true", help="append to the output files instead of replacing them")
+    parser.add_argument("--mnemonic", default=None, help="derive from this BIP-39 mnemonic instead of random keys "
+                                                         "(or set MNEMONIC)")
+    parser.add_argument("--new-mnemonic", action="store_true", help="derive from a freshly generated 12-word mnemonic")
+    parser.add_argument("--passphrase", default="", help="BIP-39 passphrase for --mnemonic")
+    parser.add_argument("--path", default=DEFAULT_PATH, help=f"derivation path with {{}} for the index (default {DEFAULT_PATH})")
+    parser.add_argument("--start", type=int, default=0, help="first derivation index (default 0)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"keypairs per worker task (default {CHUNK_SIZE})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.addresses and not args.keys:
+        print(f"{Fore.RED}  ✖ Nothing to write: pass --addresses and/or --keys{Style.RESET_ALL}")
+        sys.exit(2)
+    mnemonic = args.mnemonic or os.environ.get("MNEMONIC")
+    if args.new_mnemonic:
+        from eth_account.hdaccount import generate_mnemonic
+        mnemonic = generate_mnemonic(12, "english")
+        print(f"{Fore.YELLOW}  ⚠ New mnemonic, store it safely: {mnemonic}{Style.RESET_ALL}")
+    if mnemonic and "{}" not in args.path:
+        print(f"{Fore.RED}  ✖ --path needs a {{}} placeholder for the index{Style.RESET_ALL}")
+        sys.exit(2)
+
+    source = f"{args.path.format(f'{args.start}..{args.start + args.count - 1}')}" if mnemonic else "random keys"
+    print_border(f"KEYGEN: {args.count} FROM {source}", Fore.CYAN)
+    began = time.perf_counter()
+    written = generate(args.count, args.addresses, args.keys, mnemonic, args.passphrase, args.path,
+                       args.start, args.workers, args.chunk_size, args.append)
+    duration = time.perf_counter() - began
+    outputs = " and ".join(path for path in (args.addresses, args.keys) if path)
+    print(f"{Fore.GREEN}  ✔ {written} keypairs written to {outputs} in {duration:.2f}s "
+          f"({written / max(duration, 1e-9):,.0f}/s){Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import json
+import time
+import shutil
+import socket
+import threading
+import subprocess
+import http.client
+import urllib.request
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAIN_ID = 50312
+STARTUP_TIMEOUT = 30
+SOLC_VERSION = "0.8.22"
+WALLET_BALANCE = 100 * 10**18
+SEED_AMOUNT = 1_000_000 * 10**18
+
+PING = "0x33E7fAB0a8a5da1A923180989bD617c9c2D1C493"
+PONG = "0x9beaA0016c22B646Ac311Ab171270B0ECf23098F"
+SWAPPONG_PING = "0xbecd9b5f373877881d91cbdbaf013d97eb532154"
+SWAPPONG_PONG = "0x7968ac15a72629e05f41b8271e4e7292e0cc9f90"
+SUSDT = "0x65296738D4E5edB1515e40287B6FDf8320E6eE04"
+SOMI = "0x7a7045415f3682C3349E4b68d2940204b81fFF33"
+SMSM = "0x6756B4542d545270CacF1F15C3b7DefE589Ba1aa"
+SMI = "0xC9005DD5C562bDdEF1Cf3C90Ad5B1Bf54fB8aa9d"
+ROUTER = "0x6aac14f090a35eea150705f72d90e4cdc4a49b2c"
+CONFT_NFT = "0xFC79f0EaC5bEcf21fDcf037bAdb977b2b43DE497"
+# sendToken() on a deployed CustomToken is owner-only, so sendtoken gets an open stand-in
+SEND_TOKEN = "0x000000000000000000000000000000000000bE7C"
+
+# Stand-ins are constructor-free so their runtime code can be placed with anvil_setCode
+STAND_IN_SOURCE = """\
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.22;
+
+contract BenchToken {
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+    uint256 public totalSupply;
+
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+
+    function decimals() external pure returns (uint8) {
+        return 18;
+    }
+
+    function mint() external {
+        _mint(msg.sender, 1000 ether);
+    }
+
+    function mint(address to, uint256 amount) external {
+        _mint(to, amount);
+    }
+
+    function sendToken(address recipient, uint256 amount) external {
+        _mint(recipient, amount);
+    }
+
+    function approve(address spender, uint256 amount) external returns (bool) {
+        allowance[msg.sender][spender] = amount;
+        emit Approval(msg.sender, spender, amount);
+        return true;
+    }
+
+    function transfer(address to, uint256 amount) external returns (bool) {
+        _transfer(msg.sender, to, amount);
+        return true;
+    }
+
+    function transferFrom(address from, address to, uint256 amount) external returns (bool) {
+        require(allowance[from][msg.sender] >= amount, "allowance");
+        allowance[from][msg.sender] -= amount;
+        _transfer(from, to, amount);
+        return true;
+    }
+
+    function _transfer(address from, address to, uint256 amount) internal {
+        require(balanceOf[from] >= amount, "balance");
+        balanceOf[from] -= amount;
+        balanceOf[to] += amount;
+        emit Transfer(from, to, amount);
+    }
+
+    function _mint(address to, uint256 amount) internal {
+        totalSupply += amount;
+        balanceOf[to] += amount;
+        emit Transfer(address(0), to, amount);
+    }
+}
+
+contract BenchRouter {
+    struct ExactInputSingleParams {
+        address tokenIn;
+        address tokenOut;
+        uint24 fee;
+        address recipient;
+        uint256 amountIn;
+        uint256 amountOutMinimum;
+        uint160 sqrtPriceLimitX96;
+    }
+
+    function exactInputSingle(ExactInputSingleParams calldata params) external payable returns (uint256 amountOut) {
+        require(BenchToken(params.tokenIn).transferFrom(msg.sender, address(this), params.amountIn), "transferFrom");
+        amountOut = params.amountIn;
+        require(amountOut >= params.amountOutMinimum, "slippage");
+        BenchToken(params.tokenOut).mint(params.recipient, amountOut);
+    }
+}
+
+contract BenchNFT {
+    mapping(address => uint256) public balanceOf;
+
+    function mint() external payable {
+        require(msg.value > 0, "price");
+        balanceOf[msg.sender] += 1;
+    }
+}
+"""
+
+CONTRACT_LAYOUT = {
+    PING: "BenchToken",
+    PONG: "BenchToken",
+    SWAPPONG_PING: "BenchToken",
+    SWAPPONG_PONG: "BenchToken",
+    SUSDT: "BenchToken",
+    SOMI: "BenchToken",
+    SMSM: "BenchToken",
+    SMI: "BenchToken",
+    SEND_TOKEN: "BenchToken",
+    ROUTER: "BenchRouter",
+    CONFT_NFT: "BenchNFT",
+}
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _pad32(value: str) -> str:
+    return value.lower().replace("0x", "").rjust(64, "0")
+
+class LocalChain:
+    """Anvil dev node with the cheat-code RPCs the benchmark and the local network profile need."""
+
+    def __init__(self, chain_id: int = CHAIN_ID, block_time: float = None, port: int = None, anvil: str = "anvil"):
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.port = port or _free_port()
+        self.anvil = anvil
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+        self._id = 0
+
+    def start(self):
+        binary = shutil.which(self.anvil)
+        if binary is None:
+            raise RuntimeError(f"{self.anvil} not found in PATH (install Foundry: https://getfoundry.sh)")
+        cmd = [binary, "--port", str(self.port), "--chain-id", str(self.chain_id), "--silent",
+               "--gas-limit", "300000000", "--code-size-limit", "100000"]
+        if self.block_time:
+            cmd += ["--block-time", str(self.block_time)]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"anvil exited with code {self.process.returncode}")
+            try:
+                if int(self.rpc("eth_chainId"), 16) == self.chain_id:
+                    return self
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"anvil did not answer on {self.url} within {STARTUP_TIMEOUT}s")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def rpc(self, method: str, params: list = None):
+        self._id += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self._id, "method": method, "params": params or []}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data = json.loads(response.read())
+        if "error" in data:
+            raise RuntimeError(f"{method} failed: {data['error']}")
+        return data.get("result")
+
+    def set_code(self, address: str, runtime_code: str):
+        code = runtime_code if runtime_code.startswith("0x") else "0x" + runtime_code
+        self.rpc("anvil_setCode", [address, code])
+
+    def set_balance(self, address: str, wei: int):
+        self.rpc("anvil_setBalance", [address, hex(wei)])
+
+    def set_mapping(self, contract: str, slot: int, key: str, value: int):
+        # Solidity mapping(address => uint256) at `slot`: keccak256(pad(key) . pad(slot))
+        from eth_utils import keccak
+        location = "0x" + keccak(hexstr=_pad32(key) + _pad32(hex(slot))).hex().replace("0x", "")
+        self.rpc("anvil_setStorageAt", [contract, location, "0x" + _pad32(hex(value))])
+
+def compile_stand_ins() -> dict:
+    from solcx import compile_source, install_solc, get_installed_solc_versions
+    if not any(str(v) == SOLC_VERSION for v in get_installed_solc_versions()):
+        install_solc(SOLC_VERSION)
+    compiled = compile_source(STAND_IN_SOURCE, output_values=['bin-runtime'], solc_version=SOLC_VERSION)
+    return {contract_id.split(':')[-1]: data['bin-runtime'] for contract_id, data in compiled.items()}
+
+def deploy_stand_ins(chain: LocalChain):
+    runtime = compile_stand_ins()
+    for address, name in CONTRACT_LAYOUT.items():
+        chain.set_code(address, runtime[name])
+
+def fund_wallets(chain: LocalChain, addresses: list, balance: int = WALLET_BALANCE, tokens: int = SEED_AMOUNT):
+    """STT for every address, plus `tokens` of each stand-in token so swaps and sells have something to spend."""
+    token_addresses = [address for address, name in CONTRACT_LAYOUT.items() if name == "BenchToken"]
+    for address in addresses:
+        chain.set_balance(address, balance)
+        if tokens:
+            for token in token_addresses:
+                chain.set_mapping(token, 0, address, tokens)
+
+class RpcCounter:
+    """JSON-RPC pass-through that counts calls per method.
+
+    Counting in front of the node rather than in provider.py is the one
+    place that sees every call regardless of web3 version or middleware.
+    """
+
+    def __init__(self, upstream: str, port: int = None):
+        self.upstream = urlparse(upstream)
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._server = None
+
+    def reset(self) -> dict:
+        with self._lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+    def record(self, payload):
+        calls = payload if isinstance(payload, list) else [payload]
+        with self._lock:
+            for call in calls:
+                method = call.get("method", "?") if isinstance(call, dict) else "?"
+                self.counts[method] = self.counts.get(method, 0) + 1
+
+    def forward(self, body: bytes) -> bytes:
+        conn = getattr(self._local, "conn", None)
+        for attempt in range(2):
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.upstream.hostname, self.upstream.port, timeout=60)
+            try:
+                conn.request("POST", self.upstream.path or "/", body, {"Content-Type": "application/json"})
+                return conn.getresponse().read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                conn = self._local.conn = None
+                if attempt:
+                    raise
+
+    def start(self):
+        counter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    counter.record(json.loads(body))
+                except ValueError:
+                    pass
+                reply = counter.forward(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="rpc-counter", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,9 +1,8 @@
 import os
 import sys
 import asyncio
+import argparse
 from colorama import init, Fore, Style
-import inquirer
-from banner import display_banner
 
 init(autoreset=True)
 
@@ -113,7 +112,35 @@ def run_script(script_func):
     else:
         script_func()
 
+def run_selected(script_name: str, script_func, args):
+    import cli
+    cli.run_script(script_name, lambda: run_script(script_func), args)
+
+def parse_args(argv=None):
+    import cli
+    runnable = [name for name in SCRIPT_MAP if name != "exit"]
+    parser = argparse.ArgumentParser(description="Somnia Testnet Automation")
+    parser.add_argument("script", nargs="?", choices=runnable, metavar="script",
+                        help="run one script without the menu (see --list)")
+    parser.add_argument("--list", action="store_true", help="list script names and exit")
+    cli.add_arguments(parser)
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    if args.list:
+        for script in get_available_scripts():
+            if script["value"] != "exit":
+                print(f"{script['value']:<12} {script['name']}")
+        return
+    if args.script:
+        print_border(f"RUNNING: {args.script}", Fore.CYAN)
+        run_selected(args.script, SCRIPT_MAP[args.script], args)
+        return
+
+    # The menu is the only user of inquirer; headless runs skip it
+    import inquirer
+    from banner import display_banner
     _clear()
     display_banner()
     while True:
@@ -145,7 +172,7 @@ def main():
         try:
             print(f"{Fore.CYAN}{'═' * BORDER_WIDTH}{Style.RESET_ALL}")
             print_border(f"RUNNING: {selected_script_name}", Fore.CYAN)
-            run_script(script_func)
+            run_selected(selected_script_value, script_func, args)
             print(f"{Fore.GREEN}{'═' * BORDER_WIDTH}{Style.RESET_ALL}")
             print_border(f"Completed {selected_script_name}", Fore.GREEN)
             input(f"{Fore.YELLOW}⏎ Press Enter to continue...{Style.RESET_ALL:^76}")
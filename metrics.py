@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import random
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from colorama import Fore, Style
+
+import config
+
+METRICS_CONFIG = config.get_section("metrics")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", METRICS_CONFIG.get("port", 0)))
+METRICS_HOST = METRICS_CONFIG.get("host", "127.0.0.1")
+SUMMARY_DIR = METRICS_CONFIG.get("summaryDir", "metrics")
+RECEIPT_POLL_LATENCY = METRICS_CONFIG.get("receiptPollLatency", 0.1)
+
+# Stages of the send path, in the order a transaction goes through them
+STAGES = ("key_load", "read", "nonce", "fee", "gas_estimate", "sign", "submit", "inclusion", "receipt")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+MAX_SAMPLES = 10000
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        # Reservoir sample so percentiles stay exact-ish without unbounded memory
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(value)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = value
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(pick(0.50), 6),
+            "p90": round(pick(0.90), 6),
+            "p99": round(pick(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_run_started = {}
+_totals = {}
+_active = {}
+_server = None
+# Stages that are a round trip to the RPC node, for the dashboard's error rate
+RPC_STAGES = ("read", "nonce", "fee", "gas_estimate", "submit", "receipt")
+
+def start_run(script: str):
+    with _lock:
+        for key in [k for k in _histograms if k[0] == script]:
+            del _histograms[key]
+        for key in [k for k in _counters if k[0] == script]:
+            del _counters[key]
+        _run_started[script] = time.time()
+        _totals.pop(script, None)
+        _active[script] = 0
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT)
+
+def observe(script: str, stage: str, seconds: float):
+    with _lock:
+        histogram = _histograms.get((script, stage))
+        if histogram is None:
+            histogram = _histograms[(script, stage)] = Histogram()
+        histogram.observe(seconds)
+
+def inc(script: str, name: str, amount: int = 1):
+    with _lock:
+        _counters[(script, name)] = _counters.get((script, name), 0) + amount
+
+def get_counter(script: str, name: str) -> int:
+    with _lock:
+        return _counters.get((script, name), 0)
+
+def set_total(script: str, total: int):
+    with _lock:
+        _totals[script] = total
+
+def progress(script: str, ok, done: int = 1):
+    """Record finished work items, in the same units as the script's COMPLETED x/y line."""
+    ok = int(ok or 0)
+    with _lock:
+        _counters[(script, "done")] = _counters.get((script, "done"), 0) + done
+        _counters[(script, "succeeded")] = _counters.get((script, "succeeded"), 0) + ok
+        _counters[(script, "failed")] = _counters.get((script, "failed"), 0) + done - ok
+
+def _track_active(script: str, delta: int):
+    with _lock:
+        _active[script] = _active.get(script, 0) + delta
+
+def live(script: str) -> dict:
+    """Counters, per-stage counts and gauges only: O(stages), whatever the fleet size."""
+    with _lock:
+        return {
+            "started": _run_started.get(script),
+            "total": _totals.get(script),
+            "active": _active.get(script, 0),
+            "counters": {k[1]: v for k, v in _counters.items() if k[0] == script},
+            "stages": {k[1]: h.count for k, h in _histograms.items() if k[0] == script},
+        }
+
+@contextmanager
+def timer(script: str, stage: str):
+    _track_active(script, 1)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc(script, f"{stage}_errors")
+        raise
+    finally:
+        observe(script, stage, time.perf_counter() - start)
+        _track_active(script, -1)
+
+def wait_for_receipt(w3, script: str, tx_hash, timeout: float = 180, poll_latency: float = RECEIPT_POLL_LATENCY):
+    from web3.exceptions import TransactionNotFound, TimeExhausted
+    _track_active(script, 1)
+    start = time.perf_counter()
+    try:
+        while True:
+            call_start = time.perf_counter()
+            try:
+                receipt = w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                receipt = None
+            except Exception:
+                inc(script, "receipt_errors")
+                receipt = None
+            if receipt is not None:
+                now = time.perf_counter()
+                observe(script, "receipt", now - call_start)
+                observe(script, "inclusion", now - start)
+                inc(script, "tx_confirmed" if receipt.get('status') == 1 else "tx_reverted")
+                return receipt
+            if time.perf_counter() - start >= timeout:
+                inc(script, "tx_timeout")
+                raise TimeExhausted(f"Transaction {tx_hash.hex() if hasattr(tx_hash, 'hex') else tx_hash} is not in the chain after {timeout} seconds")
+            time.sleep(poll_latency)
+    finally:
+        _track_active(script, -1)
+
+def snapshot(script: str = None) -> dict:
+    with _lock:
+        histograms = {k: h.summary() for k, h in _histograms.items() if script is None or k[0] == script}
+        counters = {k: v for k, v in _counters.items() if script is None or k[0] == script}
+    result = {}
+    for (name, stage), data in histograms.items():
+        result.setdefault(name, {"stages": {}, "counters": {}})["stages"][stage] = data
+    for (name, counter), value in counters.items():
+        result.setdefault(name, {"stages": {}, "counters": {}})["counters"][counter] = value
+    return result
+
+def render_prometheus() -> str:
+    lines = [
+        "# HELP somnia_stage_seconds Time spent per send-path stage",
+        "# TYPE somnia_stage_seconds histogram",
+    ]
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+        for (script, stage), histogram in histograms:
+            labels = f'script="{script}",stage="{stage}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.buckets):
+                cumulative += count
+                lines.append(f'somnia_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'somnia_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"somnia_stage_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"somnia_stage_seconds_count{{{labels}}} {histogram.count}")
+    lines.append("# HELP somnia_events_total Transaction outcomes and stage errors")
+    lines.append("# TYPE somnia_events_total counter")
+    for (script, name), value in counters:
+        lines.append(f'somnia_events_total{{script="{script}",event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+def start_http_server(port: int):
+    global _server
+    if _server is not None:
+        return _server
+    # Only runs with metrics.port set, so http.server stays out of the import path
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ("/", "/metrics"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        _server = ThreadingHTTPServer((METRICS_HOST, port), _MetricsHandler)
+    except OSError as e:
+        print(f"{Fore.YELLOW}  ⚠ Metrics endpoint not started on port {port}: {str(e)}{Style.RESET_ALL}")
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"{Fore.YELLOW}  ℹ Prometheus metrics on http://{METRICS_HOST}:{port}/metrics{Style.RESET_ALL}")
+    return _server
+
+def _stage_order(stage: str):
+    return (STAGES.index(stage), stage) if stage in STAGES else (len(STAGES), stage)
+
+def write_summary(script: str, extra: dict = None) -> dict:
+    finished = time.time()
+    started = _run_started.get(script, finished)
+    data = snapshot(script).get(script, {"stages": {}, "counters": {}})
+    summary = {
+        "script": script,
+        "started": datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+        "duration": round(finished - started, 3),
+        "stages": {stage: data["stages"][stage] for stage in sorted(data["stages"], key=_stage_order)},
+        "counters": data["counters"],
+    }
+    if extra:
+        summary.update(extra)
+    try:
+        os.makedirs(SUMMARY_DIR, exist_ok=True)
+        path = os.path.join(SUMMARY_DIR, f"{script}-{datetime.fromtimestamp(started).strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        summary["path"] = path
+    except OSError as e:
+        print(f"{Fore.YELLOW}  ⚠ Could not write metrics summary: {str(e)}{Style.RESET_ALL}")
+    print_summary(summary)
+    return summary
+
+def print_summary(summary: dict):
+    if not summary["stages"]:
+        return
+    print(f"{Fore.CYAN}  {'stage':<14}{'count':>8}{'p50 (s)':>12}{'p99 (s)':>12}{'total (s)':>12}{Style.RESET_ALL}")
+    for stage, data in summary["stages"].items():
+        print(f"{Fore.CYAN}  {stage:<14}{data['count']:>8}{data['p50']:>12.3f}{data['p99']:>12.3f}{data['sum']:>12.2f}{Style.RESET_ALL}")
+    if summary.get("path"):
+        print(f"{Fore.YELLOW}  ℹ Metrics summary written to {summary['path']}{Style.RESET_ALL}")
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import socket
+import argparse
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from colorama import init, Fore, Style
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import config
+from localchain import RpcCounter
+
+init(autoreset=True)
+
+BORDER_WIDTH = 80
+# Per-request faults: the HTTP request fails as a whole
+REQUEST_FAULTS = ("http429", "disconnect")
+# Per-call faults: one call of a (batch) request gets a JSON-RPC error or a doctored result
+CALL_FAULTS = {
+    "error": (-32603, "internal error"),
+    "nonceTooLow": (-32000, "nonce too low"),
+    "underpriced": (-32000, "replacement transaction underpriced"),
+    "alreadyKnown": (-32000, "already known"),
+}
+# eth_sendRawTransaction goes through, but its receipt is never returned
+LOST_RECEIPT = "lostReceipt"
+
+def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
+    text = text.strip()
+    if len(text) > width - 4:
+        text = text[:width - 7] + "..."
+    padded_text = f" {text} ".center(width - 2)
+    print(f"{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
+    print(f"{color}│{padded_text}│{Style.RESET_ALL}")
+    print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+
+def sample_latency(spec: dict, rng: random.Random) -> float:
+    """Seconds of injected latency for one call.
+
+    spec: {"dist": "fixed", "value": s} | {"dist": "uniform", "min": s, "max": s} |
+    {"dist": "lognormal", "median": s, "sigma": x} | {"dist": "exponential", "mean": s};
+    an optional "max" caps lognormal/exponential tails.
+    """
+    if not spec:
+        return 0.0
+    dist = spec.get("dist", "fixed")
+    if dist == "fixed":
+        value = spec.get("value", 0.0)
+    elif dist == "uniform":
+        return rng.uniform(spec.get("min", 0.0), spec.get("max", 0.0))
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(spec["median"]), spec.get("sigma", 0.5))
+    elif dist == "exponential":
+        value = rng.expovariate(1 / spec["mean"])
+    else:
+        raise ValueError(f"Unknown latency distribution: {dist}")
+    return min(value, spec["max"]) if "max" in spec else value
+
+class FaultProxy(RpcCounter):
+    """JSON-RPC proxy in front of a node that injects latency and failures per method.
+
+    `faults` is {"seed": n, "methods": {"*" | method: {"latency": {...}, "http429": p,
+    "disconnect": p, "error": p, "nonceTooLow": p, "underpriced": p, "alreadyKnown": p,
+    "lostReceipt": p}}}; method entries override "*". Every draw comes from an RNG seeded
+    with (seed, method, n-th call of that method), so the n-th call of a method always gets
+    the same faults. Which caller makes the n-th call still depends on thread interleaving,
+    so only a single-threaded call sequence replays exactly.
+    """
+
+    def __init__(self, upstream: str, faults: dict, port: int = None):
+        super().__init__(upstream, port)
+        self.seed = faults.get("seed", 0)
+        self.methods = faults.get("methods", {})
+        self.injected = {}
+        self._calls = {}
+        self._lost = set()
+
+    def spec(self, method: str) -> dict:
+        return {**self.methods.get("*", {}), **self.methods.get(method, {})}
+
+    def _rng(self, method: str) -> random.Random:
+        with self._lock:
+            n = self._calls[method] = self._calls.get(method, 0) + 1
+        return random.Random(f"{self.seed}:{method}:{n}")
+
+    def _inject(self, kind: str):
+        with self._lock:
+            self.injected[kind] = self.injected.get(kind, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.injected)
+
+    def plan(self, calls: list) -> tuple:
+        """(delay seconds, request fault or None, {call index: call fault}) for one request."""
+        delay, request_fault, call_faults = 0.0, None, {}
+        for index, call in enumerate(calls):
+            method = call.get("method", "?") if isinstance(call, dict) else "?"
+            spec = self.spec(method)
+            rng = self._rng(method)
+            delay = max(delay, sample_latency(spec.get("latency"), rng))
+            for kind in REQUEST_FAULTS:
+                if request_fault is None and rng.random() < spec.get(kind, 0):
+                    request_fault = kind
+            for kind in (*CALL_FAULTS, LOST_RECEIPT):
+                if index not in call_faults and rng.random() < spec.get(kind, 0):
+                    if kind == LOST_RECEIPT and method != "eth_sendRawTransaction":
+                        continue
+                    call_faults[index] = kind
+        return delay, request_fault, call_faults
+
+    def handle(self, payload) -> tuple:
+        """(request fault or None, reply): forwards the calls that are not faulted and merges the
+        injected replies back in call order."""
+        calls = payload if isinstance(payload, list) else [payload]
+        delay, request_fault, call_faults = self.plan(calls)
+        if delay:
+            time.sleep(delay)
+        if request_fault is not None:
+            self._inject(request_fault)
+            return request_fault, None
+        replies = {}
+        forward = []
+        for index, call in enumerate(calls):
+            kind = call_faults.get(index)
+            # A node only says "already known" when it holds the bytes: forward, then answer with the error
+            if kind in CALL_FAULTS and kind != "alreadyKnown":
+                self._inject(kind)
+                code, message = CALL_FAULTS[kind]
+                replies[index] = {"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": code, "message": message}}
+            elif call.get("method") == "eth_getTransactionReceipt" and (call.get("params") or [None])[0] in self._lost:
+                replies[index] = {"jsonrpc": "2.0", "id": call.get("id"), "result": None}
+            else:
+                forward.append(index)
+        if forward:
+            upstream = json.loads(self.forward(json.dumps([calls[i] for i in forward]).encode()))
+            by_id = {reply.get("id"): reply for reply in upstream} if isinstance(upstream, list) else {}
+            for index in forward:
+                reply = by_id.get(calls[index].get("id"), {"jsonrpc": "2.0", "id": calls[index].get("id"),
+                                                          "error": {"code": -32603, "message": "no upstream reply"}})
+                if call_faults.get(index) == LOST_RECEIPT and "result" in reply:
+                    self._inject(LOST_RECEIPT)
+                    with self._lock:
+                        self._lost.add(reply["result"])
+                elif call_faults.get(index) == "alreadyKnown" and "result" in reply:
+                    self._inject("alreadyKnown")
+                    code, message = CALL_FAULTS["alreadyKnown"]
+                    reply = {"jsonrpc": "2.0", "id": reply.get("id"), "error": {"code": code, "message": message}}
+                replies[index] = reply
+        ordered = [replies[i] for i in range(len(calls))]
+        return None, ordered if isinstance(payload, list) else ordered[0]
+
+    def start(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self.send_error(400)
+                    return
+                proxy.record(payload)
+                fault, result = proxy.handle(payload)
+                if fault == "disconnect":
+                    # Dropped mid-request: no status line, the client sees a reset connection
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                if fault == "http429":
+                    reply, status = b'{"error":"Too Many Requests"}', 429
+                else:
+                    reply, status = json.dumps(result).encode(), 200
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mock-rpc", daemon=True).start()
+        return self
+
+def load_faults(path: str = None) -> dict:
+    if path:
+        with open(path, "r") as f:
+            return json.load(f)
+    return config.get_section("mockRpc")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JSON-RPC proxy with latency and fault injection for load testing")
+    parser.add_argument("--upstream", default=None, help="node to proxy (default: start a local anvil with stand-ins)")
+    parser.add_argument("--port", type=int, default=8545, help="port to listen on (default 8545)")
+    parser.add_argument("--faults", default=None, help="fault profile JSON (default: config.json → mockRpc)")
+    parser.add_argument("--seed", type=int, default=None, help="override the profile's seed")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    faults = load_faults(args.faults)
+    if args.seed is not None:
+        faults = {**faults, "seed": args.seed}
+    with contextlib.ExitStack() as stack:
+        upstream = args.upstream
+        if upstream is None:
+            import network
+            upstream = stack.enter_context(network.local_chain()).url
+        proxy = FaultProxy(upstream, faults, args.port).start()
+        stack.callback(proxy.stop)
+        print_border(f"MOCK RPC: {proxy.url} → {upstream}", Fore.CYAN)
+        for method, spec in sorted(proxy.methods.items()):
+            print(f"{Fore.CYAN}    {method}: {json.dumps(spec)}{Style.RESET_ALL}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    calls = proxy.reset()
+    print_border(f"{sum(calls.values())} CALLS, {sum(proxy.stats().values())} FAULTS INJECTED", Fore.GREEN)
+    for kind, count in sorted(proxy.stats().items()):
+        print(f"{Fore.YELLOW}  ℹ {kind}: {count}{Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import contextlib
+from colorama import Fore, Style
+
+import config
+
+NETWORK_CONFIG = config.get_section("network")
+# The endpoint every script has hard-coded; profiles redirect it, nothing else changes
+TESTNET_URL = "https://dream-rpc.somnia.network"
+# testnet: the live chain; local: a private anvil node with stand-ins at the testnet addresses;
+# any entry under network.profiles: {"url": ...} for a node (or mock server) that is already running
+PROFILES = {"testnet": {"url": TESTNET_URL}, "local": {}, **NETWORK_CONFIG.get("profiles", {})}
+PROFILE = os.environ.get("NETWORK", NETWORK_CONFIG.get("profile", "testnet"))
+LOCAL_CONFIG = NETWORK_CONFIG.get("local", {})
+LOCAL_BALANCE = LOCAL_CONFIG.get("balance", 100)
+LOCAL_TOKENS = LOCAL_CONFIG.get("tokens", 1_000_000)
+
+_url = None
+
+def add_arguments(parser):
+    parser.add_argument("--network", choices=sorted(PROFILES), default=None,
+                        help=f"network profile: testnet, local (private anvil node) or one from config.json (current: {PROFILE})")
+
+def resolve(endpoint_uri: str) -> str:
+    """The URL to actually use for `endpoint_uri` under the active profile."""
+    if _url is not None and endpoint_uri == TESTNET_URL:
+        return _url
+    return endpoint_uri
+
+def _wallet_addresses(file_path: str = "pvkey.txt") -> list:
+    from eth_account import Account
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, 'r') as f:
+        keys = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    addresses = []
+    for key in keys:
+        try:
+            addresses.append(Account.from_key(key if key.startswith('0x') else '0x' + key).address)
+        except ValueError:
+            pass
+    return addresses
+
+@contextlib.contextmanager
+def local_chain():
+    """A private anvil node with the stand-in contracts and the pvkey.txt wallets funded."""
+    import localchain
+    chain = localchain.LocalChain(localchain.CHAIN_ID, block_time=LOCAL_CONFIG.get("blockTime"))
+    try:
+        chain.start()
+        localchain.deploy_stand_ins(chain)
+        addresses = _wallet_addresses()
+        localchain.fund_wallets(chain, addresses, int(LOCAL_BALANCE * 10**18), int(LOCAL_TOKENS * 10**18))
+        print(f"{Fore.YELLOW}  ℹ Local network on {chain.url} (chain {localchain.CHAIN_ID}): stand-in contracts "
+              f"deployed, {len(addresses)} wallets from pvkey.txt funded{Style.RESET_ALL}")
+        yield chain
+    finally:
+        chain.stop()
+
+@contextlib.contextmanager
+def use(profile: str = None):
+    """Run the enclosed code against `profile`; local boots (and afterwards stops) a private chain."""
+    global _url
+    profile = profile or PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown network profile: {profile} (expected one of {', '.join(sorted(PROFILES))})")
+    previous = _url
+    try:
+        if profile == "local":
+            with local_chain() as chain:
+                _url = chain.url
+                yield profile
+        else:
+            _url = PROFILES[profile].get("url", TESTNET_URL)
+            yield profile
+    finally:
+        _url = previous
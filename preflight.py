@@ -0,0 +1,145 @@
+import os
+from colorama import Fore, Style
+
+import config
+import metrics
+
+PREFLIGHT_CONFIG = config.get_section("preflight")
+# off: send as before; drop: skip transactions whose eth_call reverts; flag: report them but send anyway
+MODES = ("off", "drop", "flag")
+MODE = os.environ.get("PREFLIGHT", PREFLIGHT_CONFIG.get("mode", "off"))
+
+ERROR_SELECTOR = "08c379a0"  # Error(string)
+PANIC_SELECTOR = "4e487b71"  # Panic(uint256)
+PANIC_CODES = {
+    0x01: "assertion failed",
+    0x11: "arithmetic overflow or underflow",
+    0x12: "division by zero",
+    0x21: "invalid enum value",
+    0x22: "invalid storage byte array",
+    0x31: "pop on empty array",
+    0x32: "array index out of bounds",
+    0x41: "out of memory",
+    0x51: "call to uninitialized function",
+}
+# The simulation failed for another reason (rate limit, node error, missing reply): send as usual
+UNKNOWN = object()
+
+def add_arguments(parser):
+    parser.add_argument("--preflight", choices=MODES, default=None,
+                        help=f"eth_call each transaction before signing: drop or flag reverts (current: {MODE})")
+
+def configure(mode: str):
+    global MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown preflight mode: {mode} (expected one of {', '.join(MODES)})")
+    MODE = mode
+
+def enabled() -> bool:
+    return MODE != "off"
+
+def _revert_data(error) -> str:
+    # Nodes put the revert payload in error.data as a hex string, or one level deeper
+    data = error.data
+    if isinstance(data, dict):
+        data = data.get("data") or data.get("result")
+    return data if isinstance(data, str) and data.startswith("0x") else ""
+
+def decode_revert(data: str) -> str:
+    """Readable reason from revert return data: Error(string), Panic(uint256) or a custom error selector."""
+    payload = data[2:] if data.startswith("0x") else data
+    selector, body = payload[:8], payload[8:]
+    if selector == ERROR_SELECTOR and len(body) >= 128:
+        length = int(body[64:128], 16)
+        return bytes.fromhex(body[128:128 + length * 2]).decode("utf-8", "replace")
+    if selector == PANIC_SELECTOR and len(body) >= 64:
+        code = int(body[:64], 16)
+        return f"panic 0x{code:02x} ({PANIC_CODES.get(code, 'unknown')})"
+    if selector:
+        return f"custom error 0x{selector}"
+    return "reverted without a reason"
+
+def is_revert(error) -> bool:
+    """Whether a failed eth_call is an execution revert, as opposed to the node failing to answer."""
+    if error.code == 3 or _revert_data(error):
+        return True
+    message = str(error).lower()
+    return "revert" in message or "insufficient funds" in message
+
+def reason_of(error) -> str:
+    data = _revert_data(error)
+    if data and data != "0x":
+        return decode_revert(data)
+    # No payload: the message carries it ("execution reverted: Ownable: caller is not the owner",
+    # "insufficient funds for gas * price + value", ...)
+    return str(error)
+
+def _quantity(value) -> str:
+    return value if isinstance(value, str) else hex(value)
+
+def as_call(tx: dict) -> dict:
+    """eth_call object for a built (unsigned) transaction; nonce and fee fields do not affect the outcome."""
+    call = {key: tx[key] for key in ("from", "to", "data") if tx.get(key)}
+    for key in ("value", "gas"):
+        if tx.get(key):
+            call[key] = _quantity(tx[key])
+    if isinstance(call.get("data"), (bytes, bytearray)):
+        call["data"] = "0x" + bytes(call["data"]).hex()
+    return call
+
+def simulate(endpoint_uri: str, txs: list, block=None) -> list:
+    """eth_call every transaction in JSON-RPC batches against one block.
+
+    Returns one entry per transaction: None if it would succeed, the decoded reason if it reverts,
+    or UNKNOWN if the call failed without an execution revert.
+    """
+    import provider
+    if block is None:
+        block = provider.rpc_batch(endpoint_uri, [("eth_blockNumber", [])])[0]
+    results = provider.rpc_batch(endpoint_uri, [("eth_call", [as_call(tx), block]) for tx in txs])
+    return [(reason_of(result) if is_revert(result) else UNKNOWN) if isinstance(result, provider.RpcError) else None
+            for result in results]
+
+def _report(script: str, label: str, reason: str) -> bool:
+    metrics.inc(script, "preflight_reverts")
+    action = "sending anyway" if MODE == "flag" else "dropped"
+    print(f"{Fore.YELLOW}  ⚠ {label}: would revert ({reason}), {action}{Style.RESET_ALL}")
+    return MODE == "flag"
+
+def gate(w3, script: str, txs: list, labels: list = None) -> list:
+    """Simulate `txs` in bulk and return which of them to send, per MODE.
+
+    Reverts are always reported with their reason; in flag mode they are kept. If the
+    simulation itself fails, everything is sent as it would have been without a preflight.
+    """
+    if not enabled() or not txs:
+        return [True] * len(txs)
+    labels = labels or [tx.get("from", f"#{i}") for i, tx in enumerate(txs, 1)]
+    try:
+        with metrics.timer(script, "preflight"):
+            reasons = simulate(w3.provider.endpoint_uri, txs)
+    except Exception as e:
+        print(f"{Fore.YELLOW}  ⚠ Preflight unavailable, sending without it: {str(e)}{Style.RESET_ALL}")
+        return [True] * len(txs)
+    unknown = sum(reason is UNKNOWN for reason in reasons)
+    if unknown:
+        metrics.inc(script, "preflight_unknown", unknown)
+    keep = [reason is None or reason is UNKNOWN or _report(script, label, reason) for label, reason in zip(labels, reasons)]
+    reverts = sum(reason is not None and reason is not UNKNOWN for reason in reasons)
+    print(f"{Fore.YELLOW}  ℹ Preflight: {len(txs) - reverts}/{len(txs)} transactions pass"
+          f"{f', {unknown} could not be simulated and are sent as usual' if unknown else ''}{Style.RESET_ALL}")
+    return keep
+
+def check(w3, script: str, tx: dict, label: str) -> bool:
+    """Single-transaction gate for a transaction that depends on an earlier one (e.g. a swap after its approve)."""
+    if not enabled():
+        return True
+    try:
+        with metrics.timer(script, "preflight"):
+            reason = simulate(w3.provider.endpoint_uri, [tx], "pending")[0]
+    except Exception:
+        return True
+    if reason is UNKNOWN:
+        metrics.inc(script, "preflight_unknown")
+        return True
+    return reason is None or _report(script, label, reason)
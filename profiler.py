@@ -0,0 +1,178 @@
+import os
+import io
+import re
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime
+from colorama import Fore, Style
+
+import config
+
+PROFILE_CONFIG = config.get_section("profile")
+PROFILE_DIR = PROFILE_CONFIG.get("dir", "profiles")
+SAMPLE_INTERVAL = PROFILE_CONFIG.get("sampleInterval", 0.005)
+TOP_N = PROFILE_CONFIG.get("top", 30)
+MODES = ("cprofile", "sample")
+
+# Scripts whose "wallets" come from somewhere other than pvkey.txt
+WALLET_FILES = {"faucetstt": "addressFaucet.txt"}
+
+def count_wallets(script: str) -> int:
+    try:
+        with open(WALLET_FILES.get(script, "pvkey.txt"), "r") as f:
+            return sum(1 for line in f if line.strip() and not line.strip().startswith('#'))
+    except OSError:
+        return 0
+
+def _thread_group(name: str) -> str:
+    # ThreadPoolExecutor-0_17 -> ThreadPoolExecutor-0, so 100 workers fold into one flame
+    return re.sub(r'_\d+$', '', name)
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples every thread's stack via sys._current_frames() into collapsed stacks."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.append(_thread_group(names.get(ident, str(ident))))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, path: str):
+        # Brendan Gregg's folded format: flamegraph.pl, speedscope and inferno all read it
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top(self, n: int) -> list:
+        own = Counter()
+        for stack, count in self.stacks.items():
+            own[stack.rsplit(";", 1)[-1]] += count
+        return own.most_common(n)
+
+class ThreadProfiler:
+    """cProfile for the calling thread plus every thread started while it is active."""
+
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.profiles = []
+        self._lock = threading.Lock()
+        self._original_run = None
+
+    def start(self):
+        self._original_run = original_run = threading.Thread.run
+        profiles, lock = self.profiles, self._lock
+
+        def run(thread):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler; the stack sampler still sees this thread
+                return original_run(thread)
+            try:
+                original_run(thread)
+            finally:
+                profile.disable()
+                with lock:
+                    profiles.append(profile)
+
+        threading.Thread.run = run
+        self.main.enable()
+        return self
+
+    def stop(self):
+        self.main.disable()
+        threading.Thread.run = self._original_run
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for profile in self.profiles:
+                stats.add(profile)
+        return stats
+
+def profile_run(script: str, func, *args, mode: str = "cprofile", top: int = TOP_N,
+                output_dir: str = PROFILE_DIR, **kwargs):
+    wallets = count_wallets(script)
+    key = f"{script}-{wallets}w-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    sampler = StackSampler().start()
+    tracer = ThreadProfiler().start() if mode == "cprofile" else None
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        duration = time.perf_counter() - start
+        if tracer is not None:
+            tracer.stop()
+        sampler.stop()
+        write_report(key, script, wallets, mode, duration, sampler, tracer, top, output_dir)
+
+def write_report(key: str, script: str, wallets: int, mode: str, duration: float,
+                 sampler: StackSampler, tracer: ThreadProfiler, top: int, output_dir: str):
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, key)
+        sampler.write_collapsed(base + ".collapsed")
+        report = io.StringIO()
+        report.write(f"script: {script}\nwallets: {wallets}\nmode: {mode}\n")
+        report.write(f"duration: {duration:.3f}s\nsamples: {sampler.samples} every {sampler.interval * 1000:.1f}ms\n\n")
+        report.write(f"Top {top} functions by sampled self time (all threads)\n")
+        for name, count in sampler.top(top):
+            report.write(f"{count:>8}  {name}\n")
+        if tracer is not None:
+            stats = tracer.stats()
+            stats.dump_stats(base + ".prof")
+            for sort in ("tottime", "cumulative"):
+                report.write(f"\ncProfile, top {top} by {sort} (all threads)\n")
+                stats.stream = report
+                stats.sort_stats(sort).print_stats(top)
+        with open(base + ".txt", "w") as f:
+            f.write(report.getvalue())
+    except OSError as e:
+        print(f"{Fore.YELLOW}  ⚠ Could not write profile: {str(e)}{Style.RESET_ALL}")
+        return
+    print(f"{Fore.CYAN}  Hot functions ({script}, {wallets} wallets, {duration:.1f}s):{Style.RESET_ALL}")
+    total = sum(sampler.stacks.values()) or 1
+    for name, count in sampler.top(10):
+        print(f"{Fore.CYAN}  {count * 100 / total:>6.1f}%  {name}{Style.RESET_ALL}")
+    print(f"{Fore.YELLOW}  ℹ Profile written to {base}.txt (flamegraph: {base}.collapsed"
+          f"{f', pstats: {base}.prof' if tracer is not None else ''}){Style.RESET_ALL}")
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=MODES, default=None,
+                        help="profile the run: cprofile (default, all threads) or sample (stack sampling only)")
+    parser.add_argument("--top", type=int, default=TOP_N, help=f"functions in the hot-function report (default {TOP_N})")
@@ -0,0 +1,189 @@
+import json
+import threading
+import concurrent.futures
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+import config
+import network
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PROVIDER_CONFIG = config.get_section("provider")
+MAX_WORKERS = config.get_section("threads").get("maxWorkers", 10)
+# One keep-alive connection per worker thread, plus headroom for the main thread and receipt polling
+POOL_SIZE = PROVIDER_CONFIG.get("poolSize") or MAX_WORKERS + 4
+CONNECT_TIMEOUT = PROVIDER_CONFIG.get("connectTimeout", 10)
+READ_TIMEOUT = PROVIDER_CONFIG.get("readTimeout", 30)
+RETRIES = PROVIDER_CONFIG.get("retries", 2)
+# Calls per JSON-RPC batch request; some public endpoints reject larger batches
+BATCH_SIZE = PROVIDER_CONFIG.get("batchSize", 100)
+BATCH_WORKERS = PROVIDER_CONFIG.get("batchWorkers", 8)
+# fast: pinned chain ID, trimmed middleware, orjson; default: stock web3 behaviour (still pooled)
+PROFILES = ("fast", "default")
+PROFILE = PROVIDER_CONFIG.get("profile", "fast")
+# The testnet's chain ID, pinned without asking; any other endpoint's is fetched once and then pinned
+CHAIN_ID = PROVIDER_CONFIG.get("chainId", 50312)
+# Per-call validation (an eth_chainId round trip on every estimate/call) and ENS name
+# resolution; the scripts pass checksummed addresses and sign locally
+LEAN_DROP_MIDDLEWARE = ("validation", "name_to_address", "ens_name_to_address")
+
+_lock = threading.Lock()
+_sessions = {}
+_instances = {}
+
+def _json_default(value):
+    # What web3's JSON encoder handles beyond plain JSON: HexBytes/bytes and AttributeDict
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if hasattr(value, "keys"):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=_json_default)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits; fall through to the stdlib
+            pass
+    return json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+
+def loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+class RpcError(Exception):
+    """A JSON-RPC error object from one call of a batch."""
+
+    def __init__(self, error: dict):
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(error.get("message", str(error)))
+
+def get_session(endpoint_uri: str) -> requests.Session:
+    """One requests session per endpoint, shared by every thread in the process."""
+    with _lock:
+        session = _sessions.get(endpoint_uri)
+        if session is None:
+            # pool_block: a thread beyond POOL_SIZE waits for a pooled socket instead of
+            # opening a throwaway connection (and a fresh TLS handshake) of its own
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE,
+                                  max_retries=RETRIES, pool_block=True)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[endpoint_uri] = session
+        return session
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that posts through the shared, pooled session for its endpoint.
+
+    web3's own session cache is keyed per thread and capped, so 100 workers either
+    open 100 sessions or evict each other's; here all of them share one pool. With
+    pin_chain_id, eth_chainId is answered locally: with `chain_id` if given, else with
+    the node's own answer to the first eth_chainId. With fast_json, payloads go
+    through orjson when it is installed.
+    """
+
+    def __init__(self, endpoint_uri: str, pin_chain_id: bool = False, chain_id: int = None, fast_json: bool = False):
+        super().__init__(endpoint_uri)
+        self.pin_chain_id = pin_chain_id
+        self.chain_id = chain_id
+        self.fast_json = fast_json
+        self._chain_id_lock = threading.Lock()
+
+    def encode_rpc_request(self, method, params) -> bytes:
+        if not self.fast_json:
+            return super().encode_rpc_request(method, params)
+        return dumps({"jsonrpc": "2.0", "method": method, "params": params or [], "id": next(self.request_counter)})
+
+    def decode_rpc_response(self, raw_response: bytes):
+        if not self.fast_json:
+            return super().decode_rpc_response(raw_response)
+        return loads(raw_response)
+
+    def make_request(self, method, params):
+        if self.pin_chain_id and method == "eth_chainId":
+            with self._chain_id_lock:
+                if self.chain_id is None:
+                    response = self._post(method, params)
+                    if "result" not in response:
+                        return response
+                    self.chain_id = int(response["result"], 16)
+            return {"jsonrpc": "2.0", "id": 0, "result": hex(self.chain_id)}
+        return self._post(method, params)
+
+    def _post(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = get_session(self.endpoint_uri).post(
+            self.endpoint_uri,
+            data=request_data,
+            headers=self.get_request_headers(),
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+def _build(endpoint_uri: str, profile: str) -> Web3:
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown provider profile: {profile} (expected one of {', '.join(PROFILES)})")
+    if profile == "default":
+        return Web3(PooledHTTPProvider(endpoint_uri))
+    # A network profile can point the scripts at another chain, whose ID only its node knows
+    chain_id = CHAIN_ID if endpoint_uri == network.TESTNET_URL else None
+    w3 = Web3(PooledHTTPProvider(endpoint_uri, pin_chain_id=True, chain_id=chain_id, fast_json=True))
+    for name in LEAN_DROP_MIDDLEWARE:
+        try:
+            w3.middleware_onion.remove(name)
+        except ValueError:
+            # Named differently (or absent) in this web3 version
+            pass
+    return w3
+
+def get_web3(endpoint_uri: str, profile: str = None) -> Web3:
+    """Process-wide Web3 instance for endpoint_uri, safe to share across worker threads."""
+    endpoint_uri = network.resolve(endpoint_uri)
+    profile = profile or PROFILE
+    with _lock:
+        w3 = _instances.get((endpoint_uri, profile))
+        if w3 is None:
+            w3 = _instances[(endpoint_uri, profile)] = _build(endpoint_uri, profile)
+        return w3
+
+def _post_batch(endpoint_uri: str, calls: list) -> list:
+    payload = [{"jsonrpc": "2.0", "id": i, "method": method, "params": params} for i, (method, params) in enumerate(calls)]
+    response = get_session(endpoint_uri).post(
+        endpoint_uri,
+        data=dumps(payload),
+        headers={"Content-Type": "application/json"},
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    )
+    response.raise_for_status()
+    replies = loads(response.content)
+    if isinstance(replies, dict):
+        # The whole batch was rejected (e.g. batches disabled or too large)
+        raise RpcError(replies.get("error") or {"message": str(replies)})
+    by_id = {reply.get("id"): reply for reply in replies}
+    results = []
+    for i in range(len(calls)):
+        reply = by_id.get(i, {"error": {"message": "missing from batch response"}})
+        results.append(RpcError(reply["error"]) if "error" in reply else reply.get("result"))
+    return results
+
+def rpc_batch(endpoint_uri: str, calls: list, batch_size: int = BATCH_SIZE, workers: int = BATCH_WORKERS) -> list:
+    """Run (method, params) calls as JSON-RPC batches over the pooled session.
+
+    Results come back in call order as raw JSON-RPC results (hex strings, dicts); a call
+    that failed is an RpcError in its slot, so one bad call does not sink the batch.
+    """
+    endpoint_uri = network.resolve(endpoint_uri)
+    chunks = [calls[i:i + batch_size] for i in range(0, len(calls), batch_size)]
+    if len(chunks) <= 1:
+        return _post_batch(endpoint_uri, chunks[0]) if chunks else []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+        return [result for results in executor.map(lambda chunk: _post_batch(endpoint_uri, chunk), chunks)
+                for result in results]
@@ -1,5 +1,8 @@
-import requests
-import concurrent.futures
+import os
+import json
+import time
+import asyncio
+import aiohttp
 
 # Sumber proxy publik (format IP:PORT)
 PROXY_SOURCES = [
@@ -8,54 +11,209 @@ PROXY_SOURCES = [
     "https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt",
 ]
 
-def ambil_proxies():
-    proxies = []
-    for url in PROXY_SOURCES:
-        print(f"🔽 Mengambil dari: {url}")
-        try:
-            res = requests.get(url, timeout=10)
-            lines = res.text.strip().splitlines()
-            proxies += [line.strip() for line in lines if ":" in line]
-            print(f"✅ {len(lines)} proxy ditemukan")
-        except Exception as e:
-            print(f"⚠️ Gagal mengambil: {e}")
-    return list(set(proxies))
-
-def cek_proxy(proxy):
-    proxies = {
-        "http": f"http://{proxy}",
-        "https": f"http://{proxy}",  # pakai HTTP meskipun koneksi HTTPS
-    }
+CHECK_URL = "https://httpbin.org/ip"
+CHECK_TIMEOUT = 5
+CONCURRENCY = 2000
+DEADLINE = 120
+PROGRESS_EVERY = 1000
+CACHE_FILE = "proxy_cache.json"
+CACHE_TTL = int(os.environ.get("PROXY_CACHE_TTL", 3600))
+
+def muat_cache(filename=CACHE_FILE):
+    if not os.path.exists(filename):
+        return {"sources": {}, "proxies": {}}
     try:
-        res = requests.get("https://httpbin.org/ip", proxies=proxies, timeout=5)
-        if res.status_code == 200:
-            return proxy
-    except:
-        return None
+        with open(filename, "r") as f:
+            cache = json.load(f)
+        cache.setdefault("sources", {})
+        cache.setdefault("proxies", {})
+        return cache
+    except Exception as e:
+        print(f"⚠️ Cache rusak, mulai dari awal: {e}")
+        return {"sources": {}, "proxies": {}}
 
-def filter_proxy(proxies, max_ok=1000):
-    print(f"🔎 Mengecek {len(proxies)} proxy...")
-    valid = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
-        futures = {executor.submit(cek_proxy, proxy): proxy for proxy in proxies}
-        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
-            result = future.result()
-            if result:
-                print(f"✅ VALID: {result}")
-                valid.append(result)
-            else:
-                print(f"❌ Invalid ({i}/{len(proxies)})")
-            if len(valid) >= max_ok:
-                break
-    return valid
+def tulis_proxy(f, proxy):
+    f.write(f"https://{proxy}\n")
 
 def simpan_proxy(valid_proxies, filename="valid_proxies.txt"):
     with open(filename, "w") as f:
         for proxy in valid_proxies:
-            f.write(f"https://{proxy}\n")
+            tulis_proxy(f, proxy)
     print(f"📁 Disimpan: {len(valid_proxies)} proxy valid di '{filename}'.")
 
+def pangkas_cache(cache, proxies, ttl=CACHE_TTL):
+    # Buang proxy yang sudah tidak ada di daftar sumber dan hasil ceknya sudah kedaluwarsa,
+    # supaya file cache tidak tumbuh tanpa batas
+    masih_ada = set(proxies)
+    batas = time.time() - ttl
+    cache["proxies"] = {proxy: entry for proxy, entry in cache["proxies"].items()
+                        if proxy in masih_ada or entry.get("last_checked", 0) >= batas}
+
+def simpan_cache(cache, filename=CACHE_FILE):
+    tmp = filename + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, filename)
+
+async def ambil_sumber(session, url, entry):
+    print(f"🔽 Mengambil dari: {url}")
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as res:
+            if res.status == 304 and "proxies" in entry:
+                print(f"♻️ Tidak berubah, pakai {len(entry['proxies'])} proxy dari cache: {url}")
+                return entry
+            text = await res.text()
+            lines = text.strip().splitlines()
+            print(f"✅ {len(lines)} proxy ditemukan")
+            return {
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "proxies": [line.strip() for line in lines if ":" in line],
+            }
+    except Exception as e:
+        print(f"⚠️ Gagal mengambil: {e}")
+        return entry
+
+async def ambil_proxies_async(cache):
+    async with aiohttp.ClientSession() as session:
+        entries = await asyncio.gather(*(
+            ambil_sumber(session, url, cache["sources"].get(url, {})) for url in PROXY_SOURCES
+        ))
+    # Sumber yang sudah dihapus dari PROXY_SOURCES ikut hilang dari cache
+    cache["sources"] = dict(zip(PROXY_SOURCES, entries))
+    proxies = set()
+    for entry in entries:
+        proxies.update(entry.get("proxies", []))
+    return list(proxies)
+
+def ambil_proxies(cache=None):
+    cache = cache if cache is not None else muat_cache()
+    return asyncio.run(ambil_proxies_async(cache))
+
+def urutkan_kandidat(proxies, cache, ttl=CACHE_TTL):
+    # Proxy yang masih segar tidak dicek ulang; sisanya diurutkan: yang dulu valid dulu, lalu yang baru, terakhir yang dulu gagal
+    now = time.time()
+    segar = []
+    prioritas = ([], [], [])
+    for proxy in proxies:
+        entry = cache["proxies"].get(proxy)
+        if entry is None:
+            prioritas[1].append(proxy)
+        elif now - entry.get("last_checked", 0) < ttl:
+            if entry.get("status") == "ok":
+                segar.append(proxy)
+        elif entry.get("status") == "ok":
+            prioritas[0].append(proxy)
+        else:
+            prioritas[2].append(proxy)
+    segar.sort(key=lambda p: cache["proxies"][p].get("latency") or CHECK_TIMEOUT)
+    prioritas[0].sort(key=lambda p: cache["proxies"][p].get("latency") or CHECK_TIMEOUT)
+    return segar, prioritas[0] + prioritas[1] + prioritas[2]
+
+async def cek_proxy(session, proxy, timeout=CHECK_TIMEOUT):
+    # pakai HTTP meskipun koneksi HTTPS
+    started = time.monotonic()
+    result = {"last_checked": time.time(), "latency": None, "status": "fail", "ip": None}
+    try:
+        async with session.get(CHECK_URL, proxy=f"http://{proxy}", timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+            if res.status == 200:
+                data = await res.json(content_type=None)
+                result["status"] = "ok"
+                result["latency"] = round(time.monotonic() - started, 3)
+                result["ip"] = data.get("origin")
+    except Exception:
+        pass
+    return result
+
+def naikkan_batas_file(concurrency):
+    # Ribuan koneksi bersamaan butuh batas file descriptor yang cukup
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    target = concurrency * 2 + 256
+    if hard != resource.RLIM_INFINITY:
+        target = min(target, hard)
+    if soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return soft
+
+async def filter_proxy_async(proxies, max_ok, filename, concurrency, deadline, cache, segar=()):
+    limit = naikkan_batas_file(concurrency)
+    if limit and concurrency * 2 > limit:
+        concurrency = max(limit // 2 - 64, 1)
+    print(f"🔎 Mengecek {len(proxies)} proxy ({concurrency} koneksi, batas waktu {deadline} detik)...")
+    valid = list(segar[:max_ok])
+    checked = 0
+    started = time.monotonic()
+    candidates = iter(proxies)
+    selesai = asyncio.Event()
+    connector = aiohttp.TCPConnector(limit=0, force_close=True)
+
+    with open(filename, "w") as f:
+        for proxy in valid:
+            tulis_proxy(f, proxy)
+        if valid:
+            print(f"♻️ {len(valid)} proxy valid dari cache (TTL {CACHE_TTL} detik)")
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def worker():
+                nonlocal checked
+                # Semua worker menarik dari iterator yang sama, jadi tidak ada future yang menumpuk
+                for proxy in candidates:
+                    result = await cek_proxy(session, proxy)
+                    cache["proxies"][proxy] = result
+                    checked += 1
+                    if result["status"] == "ok" and len(valid) < max_ok:
+                        valid.append(proxy)
+                        tulis_proxy(f, proxy)
+                        f.flush()
+                        print(f"✅ VALID: {proxy} ({result['latency']:.2f} detik, IP {result['ip']})")
+                        if len(valid) >= max_ok:
+                            selesai.set()
+                            return
+                    if checked % PROGRESS_EVERY == 0:
+                        print(f"⏳ {checked}/{len(proxies)} dicek, {len(valid)} valid ({time.monotonic() - started:.1f} detik)")
+
+            jumlah_worker = min(concurrency, len(proxies)) if len(valid) < max_ok else 0
+            workers = [asyncio.create_task(worker()) for _ in range(jumlah_worker)]
+            semua = asyncio.gather(*workers)
+            tunggu = asyncio.create_task(selesai.wait())
+            await asyncio.wait([semua, tunggu], timeout=deadline, return_when=asyncio.FIRST_COMPLETED)
+            if not semua.done():
+                alasan = f"{max_ok} proxy valid tercapai" if selesai.is_set() else "batas waktu habis"
+                print(f"⏹️ Berhenti: {alasan}, membatalkan sisa pengecekan...")
+            for task in workers:
+                task.cancel()
+            tunggu.cancel()
+            await asyncio.gather(semua, tunggu, return_exceptions=True)
+
+    print(f"📊 {checked} proxy dicek dalam {time.monotonic() - started:.1f} detik")
+    return valid
+
+def filter_proxy(proxies, max_ok=1000, filename="valid_proxies.txt", concurrency=CONCURRENCY, deadline=DEADLINE, cache=None):
+    cache = cache if cache is not None else muat_cache()
+    segar, kandidat = urutkan_kandidat(proxies, cache)
+    try:
+        valid = asyncio.run(filter_proxy_async(kandidat, max_ok, filename, concurrency, deadline, cache, segar))
+    finally:
+        pangkas_cache(cache, proxies)
+        simpan_cache(cache)
+    print(f"📁 Disimpan: {len(valid)} proxy valid di '{filename}'.")
+    return valid
+
 if __name__ == "__main__":
-    all_proxies = ambil_proxies()
-    valid = filter_proxy(all_proxies, max_ok=1000)
-    simpan_proxy(valid)
+    cache = muat_cache()
+    all_proxies = ambil_proxies(cache)
+    filter_proxy(all_proxies, max_ok=1000, cache=cache)
@@ -0,0 +1,209 @@
+import os
+import time
+import asyncio
+import aiohttp
+from aiohttp_socks import ProxyConnector, ProxyError, ProxyConnectionError, ProxyTimeoutError
+from colorama import Fore, Style
+
+import config
+
+IP_CHECK_URL = "https://api.ipify.org?format=json"
+CHECKER_OUTPUT = "valid_proxies.txt"
+
+POOL_CONFIG = config.get_section("proxyPool")
+MAX_PER_PROXY = POOL_CONFIG.get("maxPerProxy", 2)
+MAX_FAILURES = POOL_CONFIG.get("maxFailures", 3)
+COOLDOWN_SECONDS = POOL_CONFIG.get("cooldownSeconds", 60)
+REQUEST_TIMEOUT = POOL_CONFIG.get("requestTimeout", 30)
+EWMA_ALPHA = 0.3
+
+# Errors that say something about the proxy itself rather than the API behind it
+PROXY_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    ProxyError,
+    ProxyConnectionError,
+    ProxyTimeoutError,
+    OSError,
+)
+
+def normalize_proxy(proxy: str) -> str:
+    proxy = proxy.strip()
+    if proxy.startswith('https://'):
+        # proxies.py writes https:// but the checked proxies speak plain HTTP CONNECT
+        return 'http://' + proxy[len('https://'):]
+    if proxy.startswith(('socks5://', 'socks4://', 'http://')):
+        return proxy
+    parts = proxy.split(':')
+    if len(parts) == 4:
+        return f"socks5://{parts[2]}:{parts[3]}@{parts[0]}:{parts[1]}"
+    if len(parts) == 3 and '@' in proxy:
+        return f"socks5://{proxy}"
+    if len(parts) == 2:
+        return f"http://{proxy}"
+    raise ValueError(f"Invalid proxy format: {proxy}")
+
+def load_proxy_file(file_path: str) -> list:
+    if not os.path.exists(file_path):
+        return []
+    proxies = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            proxy = line.strip()
+            if proxy and not proxy.startswith('#'):
+                proxies.append(proxy)
+    return proxies
+
+class ProxyStats:
+    def __init__(self, url: str = None, max_in_flight: int = MAX_PER_PROXY):
+        self.url = url
+        self.max_in_flight = max_in_flight
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None
+        self.exit_ip = None
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.retired = False
+        self.session = None
+
+    @property
+    def display(self) -> str:
+        return self.url if self.url else "None"
+
+    @property
+    def success_rate(self) -> float:
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def score(self) -> float:
+        latency = self.latency if self.latency is not None else 1.0
+        return self.success_rate / (latency + 0.05) / (self.in_flight + 1)
+
+    def available(self, now: float) -> bool:
+        if self.retired or self.cooldown_until > now:
+            return False
+        return self.max_in_flight <= 0 or self.in_flight < self.max_in_flight
+
+class ProxyPool:
+    def __init__(self, proxies: list, max_per_proxy: int = MAX_PER_PROXY,
+                 max_failures: int = MAX_FAILURES, cooldown: float = COOLDOWN_SECONDS):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.entries = {}
+        self._sticky = {}
+        self._condition = None
+        for proxy in proxies:
+            try:
+                url = normalize_proxy(proxy)
+            except ValueError as e:
+                print(f"{Fore.YELLOW} ⚠ {str(e)}{Style.RESET_ALL}")
+                continue
+            if url not in self.entries:
+                self.entries[url] = ProxyStats(url, max_per_proxy)
+        if not self.entries:
+            # No proxies configured: a single direct entry that never retires
+            self.entries[None] = ProxyStats(None, 0)
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def cool_down(self, url: str, seconds: float):
+        stats = self.entries.get(url)
+        if stats is not None and seconds > 0:
+            stats.cooldown_until = max(stats.cooldown_until, time.monotonic() + seconds)
+
+    def unstick(self, key):
+        self._sticky.pop(key, None)
+
+    def healthy_count(self) -> int:
+        return sum(1 for stats in self.entries.values() if not stats.retired)
+
+    def _pick(self, key, now: float):
+        sticky = self.entries.get(self._sticky.get(key)) if key is not None else None
+        if sticky is not None and sticky.available(now):
+            return sticky
+        candidates = [stats for stats in self.entries.values() if stats.available(now)]
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda stats: stats.score())
+        if key is not None:
+            self._sticky[key] = best.url
+        return best
+
+    async def acquire(self, key=None):
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                now = time.monotonic()
+                stats = self._pick(key, now)
+                if stats is not None:
+                    stats.in_flight += 1
+                    return stats
+                if not self.healthy_count():
+                    return None
+                cooling = [s.cooldown_until for s in self.entries.values() if not s.retired and s.cooldown_until > now]
+                timeout = max(min(cooling) - now, 0.05) if cooling else None
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, stats: ProxyStats, ok: bool, latency: float = None, cooldown: float = None):
+        condition = self._get_condition()
+        async with condition:
+            stats.in_flight -= 1
+            if ok:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                if latency is not None:
+                    stats.latency = latency if stats.latency is None else (
+                        EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * stats.latency
+                    )
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                if stats.url is not None and stats.consecutive_failures >= self.max_failures:
+                    stats.retired = True
+                    print(f"{Fore.RED} ✖ Retiring proxy after {stats.consecutive_failures} failures: {stats.display}{Style.RESET_ALL}")
+            if cooldown:
+                stats.cooldown_until = max(stats.cooldown_until, time.monotonic() + cooldown)
+            condition.notify_all()
+
+    async def session(self, stats: ProxyStats) -> aiohttp.ClientSession:
+        if stats.session is None or stats.session.closed:
+            if stats.url is None:
+                connector = aiohttp.TCPConnector(limit=0, keepalive_timeout=60)
+            else:
+                connector = ProxyConnector.from_url(stats.url)
+            stats.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+        return stats.session
+
+    async def exit_ip(self, stats: ProxyStats, headers: dict = None) -> str:
+        if stats.exit_ip is None:
+            session = await self.session(stats)
+            try:
+                async with session.get(IP_CHECK_URL, headers=headers) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        stats.exit_ip = data.get('ip', "Unknown")
+            except PROXY_ERRORS:
+                return "Unknown"
+        return stats.exit_ip or "Unknown"
+
+    def print_summary(self):
+        retired = len(self.entries) - self.healthy_count()
+        ranked = sorted((s for s in self.entries.values() if not s.retired), key=lambda s: s.score(), reverse=True)
+        print(f"{Fore.YELLOW} ℹ Proxy pool: {self.healthy_count()} healthy, {retired} retired{Style.RESET_ALL}")
+        for stats in ranked[:5]:
+            latency = f"{stats.latency:.2f}s" if stats.latency is not None else "n/a"
+            print(f"{Fore.YELLOW}   {stats.display} │ ok {stats.successes} / fail {stats.failures} │ latency {latency}{Style.RESET_ALL}")
+
+    async def close(self):
+        sessions = [s.session for s in self.entries.values() if s.session is not None and not s.session.closed]
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
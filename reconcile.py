@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from colorama import init, Fore, Style
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import config
+import metrics
+import network
+
+init(autoreset=True)
+
+RECONCILE_CONFIG = config.get_section("reconcile")
+# Cap on a worker's own receipt wait; whatever is still out by then is settled at the end of the run
+RECEIPT_TIMEOUT = RECONCILE_CONFIG.get("receiptTimeout", 60)
+# How long the end-of-run pass keeps polling the outstanding hashes, all of them at once
+SETTLE_TIMEOUT = RECONCILE_CONFIG.get("settleTimeout", 180)
+POLL_INTERVAL = RECONCILE_CONFIG.get("pollInterval", 2.0)
+# Append every broadcast hash and its outcome to metrics/<script>-<timestamp>.txs.jsonl
+JOURNAL = RECONCILE_CONFIG.get("journal", True)
+
+_lock = threading.Lock()
+# script -> {hash: (endpoint uri, units)}: only transactions whose receipt wait timed out
+_outstanding = {}
+_journals = {}
+
+def tx_hex(tx_hash) -> str:
+    """The 0x-prefixed hex string a hash is journaled and settled under."""
+    value = tx_hash.hex() if hasattr(tx_hash, "hex") else str(tx_hash)
+    return value if value.startswith("0x") else "0x" + value
+
+def journal_path(script: str) -> str:
+    # Named after the run like its metrics summary; fixed on first use for scripts that never call start_run
+    started = metrics.live(script)["started"]
+    path = _journals.get((script, started))
+    if path is None:
+        stamp = datetime.fromtimestamp(started or time.time()).strftime('%Y%m%d-%H%M%S')
+        path = _journals[(script, started)] = os.path.join(metrics.SUMMARY_DIR, f"{script}-{stamp}.txs.jsonl")
+    return path
+
+def _journal(script: str, entry: dict):
+    if not JOURNAL:
+        return
+    try:
+        with _lock:
+            os.makedirs(metrics.SUMMARY_DIR, exist_ok=True)
+            with open(journal_path(script), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+def receipt_timeout(timeout: float, units: int) -> float:
+    """The wait a worker should spend on a receipt: capped when a late receipt can still be counted."""
+    return min(timeout, RECEIPT_TIMEOUT) if units and RECEIPT_TIMEOUT else timeout
+
+def record(script: str, w3, tx_hash, units: int = 1):
+    """Note a broadcast transaction; `units` is what it adds to the script's COMPLETED count if it succeeds."""
+    _journal(script, {"hash": tx_hex(tx_hash), "url": w3.provider.endpoint_uri, "units": units})
+
+def resolved(script: str, tx_hash, status: str):
+    _journal(script, {"hash": tx_hex(tx_hash), "status": status})
+
+def timed_out(script: str, w3, tx_hash, units: int = 1):
+    resolved(script, tx_hash, "timeout")
+    with _lock:
+        _outstanding.setdefault(script, {})[tx_hex(tx_hash)] = (w3.provider.endpoint_uri, units)
+
+def wait_for_receipt(w3, script: str, tx_hash, timeout: float = 180, units: int = 1):
+    """metrics.wait_for_receipt with the transaction journaled and a timeout left to settle().
+
+    `units` is what the transaction adds to the script's COMPLETED count if it succeeds: 1 for a
+    wallet's own transaction, the recipient count for a batch, 0 for an approve ahead of the real
+    action. Waits that can be counted late are capped at RECEIPT_TIMEOUT.
+    """
+    from web3.exceptions import TimeExhausted
+    record(script, w3, tx_hash, units)
+    try:
+        receipt = metrics.wait_for_receipt(w3, script, tx_hash, timeout=receipt_timeout(timeout, units))
+    except TimeExhausted:
+        timed_out(script, w3, tx_hash, units)
+        raise
+    resolved(script, tx_hash, "confirmed" if receipt.get('status') == 1 else "reverted")
+    return receipt
+
+def outstanding(script: str) -> int:
+    with _lock:
+        return len(_outstanding.get(script, {}))
+
+def poll(pending: dict, timeout: float = SETTLE_TIMEOUT, poll_interval: float = POLL_INTERVAL) -> dict:
+    """Batch-query receipts for {hash: endpoint uri} until every one is mined or `timeout` runs out.
+
+    Returns {hash: "confirmed" | "reverted" | "pending" | "dropped"}; a hash still without a receipt is
+    "pending" if the node knows the transaction and "dropped" if it does not.
+    """
+    import provider
+    pending = dict(pending)
+    outcome = {}
+    deadline = time.monotonic() + timeout
+    while pending:
+        for url in set(pending.values()):
+            hashes = [h for h, u in pending.items() if u == url]
+            try:
+                receipts = provider.rpc_batch(url, [("eth_getTransactionReceipt", [h]) for h in hashes])
+            except Exception:
+                continue
+            for h, receipt in zip(hashes, receipts):
+                if isinstance(receipt, dict):
+                    outcome[h] = "confirmed" if int(receipt.get("status", "0x0"), 16) == 1 else "reverted"
+                    del pending[h]
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(poll_interval)
+    for url in set(pending.values()):
+        hashes = [h for h, u in pending.items() if u == url]
+        try:
+            txs = provider.rpc_batch(url, [("eth_getTransactionByHash", [h]) for h in hashes])
+        except Exception as e:
+            txs = [provider.RpcError({"message": str(e)})] * len(hashes)
+        for h, tx in zip(hashes, txs):
+            # Only a definite null is a drop; a failed lookup leaves the transaction pending
+            outcome[h] = "dropped" if tx is None else "pending"
+    return outcome
+
+def settle(script: str, timeout: float = SETTLE_TIMEOUT, confirmed: set = None) -> int:
+    """Reconcile the run's timed-out transactions and return the COMPLETED units they add.
+
+    Late successes move from failed to succeeded in the run's progress counters and are counted as
+    tx_late_confirmed; the rest as tx_late_reverted, or tx_unresolved if still not mined (or dropped).
+    Hashes confirmed late are added to `confirmed` when given, for callers that act on them.
+    """
+    with _lock:
+        entries = _outstanding.pop(script, {})
+    if not entries:
+        return 0
+    print(f"{Fore.YELLOW}  ℹ Reconciling {len(entries)} transactions whose receipt wait timed out...{Style.RESET_ALL}")
+    with metrics.timer(script, "reconcile"):
+        outcome = poll({h: url for h, (url, _) in entries.items()}, timeout)
+    units = 0
+    for h, status in outcome.items():
+        resolved(script, h, status)
+        if status == "confirmed":
+            metrics.inc(script, "tx_late_confirmed")
+            units += entries[h][1]
+            if confirmed is not None:
+                confirmed.add(h)
+        elif status == "reverted":
+            metrics.inc(script, "tx_late_reverted")
+        else:
+            metrics.inc(script, "tx_unresolved")
+    if units:
+        metrics.inc(script, "succeeded", units)
+        metrics.inc(script, "failed", -units)
+    counts = {status: list(outcome.values()).count(status) for status in ("confirmed", "reverted", "pending", "dropped")}
+    print(f"{Fore.GREEN if units else Fore.YELLOW}  ℹ Reconciled: {counts['confirmed']} confirmed late, "
+          f"{counts['reverted']} reverted, {counts['pending']} still pending, {counts['dropped']} dropped{Style.RESET_ALL}")
+    return units
+
+def load_journal(path: str) -> dict:
+    """{hash: {"url", "units", "status"}} with the last status each hash reached (None: never settled)."""
+    txs = {}
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            tx = txs.setdefault(entry["hash"], {"url": None, "units": 1, "status": None})
+            if "url" in entry:
+                tx["url"], tx["units"] = entry["url"], entry.get("units", 1)
+            if "status" in entry:
+                tx["status"] = entry["status"]
+    return txs
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Settle the transactions of an earlier run from its journal")
+    parser.add_argument("journal", help="metrics/<script>-<timestamp>.txs.jsonl")
+    parser.add_argument("--timeout", type=float, default=0, help="seconds to keep polling unmined transactions (default 0: one pass)")
+    parser.add_argument("--all", action="store_true", help="re-check every transaction, not just unsettled ones")
+    network.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    txs = load_journal(args.journal)
+    unsettled = {h: tx["url"] for h, tx in txs.items()
+                 if tx["url"] and (args.all or tx["status"] in (None, "timeout", "pending"))}
+    print(f"{Fore.CYAN}  ℹ {len(txs)} transactions in {args.journal}, {len(unsettled)} to check{Style.RESET_ALL}")
+    with network.use(args.network):
+        outcome = poll(unsettled, args.timeout)
+    with open(args.journal, "a") as f:
+        for h, status in outcome.items():
+            f.write(json.dumps({"hash": h, "status": status}) + "\n")
+            txs[h]["status"] = status
+    statuses = {}
+    units = 0
+    for tx in txs.values():
+        statuses[tx["status"]] = statuses.get(tx["status"], 0) + 1
+        if tx["status"] == "confirmed":
+            units += tx["units"]
+    for status, count in sorted(statuses.items(), key=lambda item: str(item[0])):
+        print(f"{Fore.YELLOW}  ℹ {status or 'unsettled'}: {count}{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}  ✔ {units} successful units across {len(txs)} transactions{Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,18 @@ from web3 import Web3
 from eth_account import Account
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+import indexer
+import preflight
+
 init(autoreset=True)
 
 BORDER_WIDTH = 80
@@ -29,6 +41,7 @@ CHAIN_ID = 50312
 EXPLORER_URL = "https://shannon-explorer.somnia.network/tx/0x"
 CONFT_NFT_ADDRESS = "0xFC79f0EaC5bEcf21fDcf037bAdb977b2b43DE497"
 AMOUNT = 0.1
+SCRIPT_NAME = "conftnft"
 
 def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
     text = text.strip()
@@ -83,7 +96,7 @@ def load_private_keys(file_path: str = "pvkey.txt") -> list:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(NETWORK_URL))
+        w3 = provider.get_web3(NETWORK_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -96,7 +109,8 @@ def connect_web3():
 def get_fee(w3: Web3) -> dict:
     tx_params = {}
     try:
-        fee_history = w3.eth.fee_history(20, 'latest', [40])
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            fee_history = w3.eth.fee_history(20, 'latest', [40])
         is_eip1559 = any(fee_history.get('baseFeePerGas', [0]))
         if not is_eip1559:
             gas_price = int(w3.eth.gas_price * random.uniform(1.03, 1.1))
@@ -121,7 +135,8 @@ def get_fee(w3: Web3) -> dict:
 
 def estimate_gas(w3: Web3, tx_params: dict) -> dict:
     try:
-        gas_estimate = int(w3.eth.estimate_gas(tx_params) * random.uniform(1.03, 1.1))
+        with metrics.timer(SCRIPT_NAME, "gas_estimate"):
+            gas_estimate = int(w3.eth.estimate_gas(tx_params) * random.uniform(1.03, 1.1))
         tx_params['gas'] = gas_estimate
         print(f"{Fore.YELLOW}  ℹ Gas Estimated: {gas_estimate}{Style.RESET_ALL}")
     except Exception as e:
@@ -139,16 +154,21 @@ def has_minted(w3: Web3, address: str) -> bool:
             "type": "function"
         }
     ]
+    minted = indexer.has_minted(CONFT_NFT_ADDRESS, address)
+    if minted is not None:
+        return minted
     contract = w3.eth.contract(address=Web3.to_checksum_address(CONFT_NFT_ADDRESS), abi=nft_abi)
     try:
-        balance = contract.functions.balanceOf(address).call()
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balance = contract.functions.balanceOf(address).call()
         return balance > 0
     except Exception as e:
         print(f"{Fore.YELLOW}  ⚠ Failed to check NFT balance: {str(e)}{Style.RESET_ALL}")
         return False
 
 async def buy_conft_nft(w3: Web3, private_key: str, wallet_index: int):
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     sender_address = account.address
 
     if has_minted(w3, sender_address):
@@ -157,13 +177,15 @@ async def buy_conft_nft(w3: Web3, private_key: str, wallet_index: int):
 
     try:
         print(f"{Fore.CYAN}  > Checking balance...{Style.RESET_ALL}")
-        balance = float(w3.from_wei(w3.eth.get_balance(sender_address), 'ether'))
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balance = float(w3.from_wei(w3.eth.get_balance(sender_address), 'ether'))
         if balance < AMOUNT:
             print(f"{Fore.RED}  ✖ Insufficient balance: {balance:.4f} STT < {AMOUNT:.4f} STT{Style.RESET_ALL}")
             return False
         
         print(f"{Fore.CYAN}  > Preparing transaction...{Style.RESET_ALL}")
-        nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = w3.eth.get_transaction_count(sender_address)
         tx_params = {
             'nonce': nonce,
             'to': Web3.to_checksum_address(CONFT_NFT_ADDRESS),
@@ -175,12 +197,11 @@ async def buy_conft_nft(w3: Web3, private_key: str, wallet_index: int):
         tx_params = estimate_gas(w3, tx_params)
         
         print(f"{Fore.CYAN}  > Sending transaction...{Style.RESET_ALL}")
-        signed_tx = w3.eth.account.sign_transaction(tx_params, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(w3, SCRIPT_NAME, tx_params, private_key)
         tx_link = f"{EXPLORER_URL}{tx_hash.hex()}"
         
         loop = asyncio.get_event_loop()
-        receipt = await loop.run_in_executor(None, lambda: w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180))
+        receipt = await loop.run_in_executor(None, lambda: reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=180))
         
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Transaction successful! │ Tx: {tx_link}{Style.RESET_ALL}")
@@ -216,6 +237,7 @@ def run_conftnft():
     print()
     print_border("MINT NFT CONFT - SOMNIA TESTNET", Fore.CYAN)
     print()
+    metrics.start_run(SCRIPT_NAME)
     private_keys = load_private_keys('pvkey.txt')
     print(f"{Fore.YELLOW}  ℹ Info: Found {len(private_keys)} wallets{Style.RESET_ALL}")
     print()
@@ -227,21 +249,30 @@ def run_conftnft():
     random.shuffle(private_keys)
     successful_txs = 0
 
+    metrics.set_total(SCRIPT_NAME, total_txs)
+    jobs = enumerate(private_keys, start=1)
+    if preflight.enabled():
+        jobs = list(jobs)
+        # One mint per wallet: wallets that already minted (or cannot pay) would only revert
+        senders = [Account.from_key(pkey).address for _, (_, pkey) in jobs]
+        calls = [{'from': sender, 'to': Web3.to_checksum_address(CONFT_NFT_ADDRESS),
+                  'value': w3.to_wei(AMOUNT, 'ether'), 'data': '0x1249c58b'} for sender in senders]
+        keep = preflight.gate(w3, SCRIPT_NAME, calls, [f"Wallet {profile_num} ({sender})"
+                                                       for (_, (profile_num, _)), sender in zip(jobs, senders)])
+        metrics.progress(SCRIPT_NAME, False, keep.count(False))
+        jobs = [job for job, ok in zip(jobs, keep) if ok]
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for idx, (profile_num, pkey) in enumerate(private_keys, start=1):
-            futures.append(
-                executor.submit(
-                    process_one_wallet_sync,
-                    w3, idx, total_txs, profile_num, pkey
-                )
-            )
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
+        jobs = ((w3, idx, total_txs, profile_num, pkey) for idx, (profile_num, pkey) in jobs)
+        for ok in taskqueue.stream(executor, process_one_wallet_sync, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 successful_txs += 1
 
+    successful_txs += reconcile.settle(SCRIPT_NAME)
     print()
     print_border(f"COMPLETED: {successful_txs}/{total_txs} TRANSACTIONS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful_txs, "total": total_txs})
 
 if __name__ == "__main__":
-    run_conftnft()
+    import cli
+    cli.run(SCRIPT_NAME, run_conftnft)
@@ -8,9 +8,18 @@ import asyncio
 
 from web3 import Web3
 from eth_account import Account
-from solcx import compile_source, install_solc, get_solc_version
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+
 init(autoreset=True)
 
 BORDER_WIDTH = 80
@@ -20,6 +29,7 @@ NETWORK_URL = "https://dream-rpc.somnia.network"
 CHAIN_ID = 50312
 EXPLORER_URL = "https://shannon-explorer.somnia.network"
 SOLC_VERSION = "0.8.22"
+SCRIPT_NAME = "deploytoken"
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
 try:
@@ -128,6 +138,18 @@ contract CustomToken {
     function sendToken(address recipient, uint256 amount) external onlyOwner {
         _transfer(address(this), recipient, amount);
     }
+
+    function batchSendToken(address[] calldata recipients, uint256 amount) external onlyOwner {
+        uint256 total = amount * recipients.length;
+        require(_balances[address(this)] >= total, "ERC20: transfer amount exceeds balance");
+        _balances[address(this)] -= total;
+        for (uint256 i = 0; i < recipients.length; i++) {
+            address to = recipients[i];
+            require(to != address(0), "ERC20: transfer to the zero address");
+            _balances[to] += amount;
+            emit Transfer(address(this), to, amount);
+        }
+    }
 }
 """
 
@@ -184,7 +206,7 @@ def load_private_keys(file_path: str = "pvkey.txt") -> list:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(NETWORK_URL))
+        w3 = provider.get_web3(NETWORK_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -195,6 +217,8 @@ def connect_web3():
         sys.exit(1)
 
 def ensure_solc_installed():
+    # solcx is only needed here; importing it at module level slowed every startup
+    from solcx import install_solc, get_solc_version
     try:
         current_version = get_solc_version()
         if str(current_version) != SOLC_VERSION:
@@ -205,33 +229,38 @@ def ensure_solc_installed():
         print(f"{Fore.GREEN}  ✔ Installed solc version {SOLC_VERSION}{Style.RESET_ALL}")
 
 def compile_contract():
+    from solcx import compile_source
     ensure_solc_installed()
     compiled_sol = compile_source(CONTRACT_SOURCE, output_values=['abi', 'bin'], solc_version=SOLC_VERSION)
     contract_id, contract_interface = compiled_sol.popitem()
     return contract_interface['abi'], contract_interface['bin']
 
 async def deploy_contract(w3: Web3, private_key: str, wallet_index: int, name: str, symbol: str, decimals: int, total_supply: int):
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     sender_address = account.address
     try:
-        abi, bytecode = compile_contract()
+        with metrics.timer(SCRIPT_NAME, "compile"):
+            abi, bytecode = compile_contract()
         contract = w3.eth.contract(abi=abi, bytecode=bytecode)
         print(f"{Fore.CYAN}  > Preparing transaction...{Style.RESET_ALL}")
-        nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = w3.eth.gas_price
         total_supply_wei = w3.to_wei(total_supply, 'ether')
         tx = contract.constructor(name, symbol, decimals, total_supply_wei).build_transaction({
             'from': sender_address,
             'nonce': nonce,
             'chainId': CHAIN_ID,
             'gas': 2000000,
-            'gasPrice': w3.eth.gas_price
+            'gasPrice': gas_price
         })
         print(f"{Fore.CYAN}  > Sending transaction...{Style.RESET_ALL}\n")
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(w3, SCRIPT_NAME, tx, private_key)
         tx_link = f"{EXPLORER_URL}/tx/0x{tx_hash.hex()}"
         loop = asyncio.get_event_loop()
-        receipt = await loop.run_in_executor(None, lambda: w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180))
+        receipt = await loop.run_in_executor(None, lambda: reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=180))
         if receipt.status == 1:
             contract_address = receipt.get('contractAddress')
             print(f"{Fore.GREEN}  ✔ Deployment successful! │ Tx: {tx_link}{Style.RESET_ALL}")
@@ -272,6 +301,7 @@ def run_deploytoken():
     print()
     print_border("DEPLOY ERC20 TOKEN - SOMNIA TESTNET", Fore.CYAN)
     print()
+    metrics.start_run(SCRIPT_NAME)
     private_keys = load_private_keys('pvkey.txt')
     print(f"{Fore.YELLOW}  ℹ Info: Found {len(private_keys)} wallets{Style.RESET_ALL}")
     print()
@@ -296,22 +326,20 @@ def run_deploytoken():
     random.shuffle(private_keys)
     successful_deploys = 0
 
+    metrics.set_total(SCRIPT_NAME, total_wallets)
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for idx, (profile_num, pkey) in enumerate(private_keys, start=1):
-            futures.append(
-                executor.submit(
-                    process_one_wallet_sync,
-                    w3, idx, total_wallets, profile_num, pkey,
-                    name, symbol, decimals, total_supply
-                )
-            )
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
+        jobs = ((w3, idx, total_wallets, profile_num, pkey, name, symbol, decimals, total_supply)
+                for idx, (profile_num, pkey) in enumerate(private_keys, start=1))
+        for ok in taskqueue.stream(executor, process_one_wallet_sync, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 successful_deploys += 1
 
+    successful_deploys += reconcile.settle(SCRIPT_NAME)
     print()
     print_border(f"COMPLETED: {successful_deploys}/{total_wallets} TRANSACTIONS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful_deploys, "total": total_wallets})
 
 if __name__ == "__main__":
-    run_deploytoken()
+    import cli
+    cli.run(SCRIPT_NAME, run_deploytoken)
@@ -5,10 +5,14 @@ import json
 import time
 import asyncio
 import aiohttp
-from aiohttp_socks import ProxyConnector
 from colorama import init, Fore, Style
 from web3 import Web3
-import concurrent.futures
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from proxypool import ProxyPool, PROXY_ERRORS, CHECKER_OUTPUT, load_proxy_file
 
 init(autoreset=True)
 
@@ -23,7 +27,15 @@ THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
 
 # Constants
 FAUCET_API_URL = "https://testnet.somnia.network/api/faucet"
-IP_CHECK_URL = "https://api.ipify.org?format=json"
+LEDGER_FILE = "faucet_ledger.json"
+MAX_RETRIES = 3
+# Seconds before an address is scheduled again, by outcome of its last attempt
+ADDRESS_COOLDOWNS = {
+    "claimed": 24 * 3600,
+    "cooldown": 3 * 3600,
+    "unregistered": 3600,
+    "failed": 0,
+}
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
     "accept": "*/*",
@@ -88,124 +100,139 @@ def load_proxies(file_path: str = "proxies.txt") -> list:
         print(f"{Fore.RED} ✖ Error: {str(e)}{Style.RESET_ALL}")
         return []
 
-async def get_proxy_ip(proxy: str = None) -> str:
+def load_ledger(file_path: str = LEDGER_FILE) -> dict:
+    ledger = {"addresses": {}, "proxies": {}}
+    if not os.path.exists(file_path):
+        return ledger
     try:
-        if proxy:
-            if proxy.startswith(('socks5://', 'socks4://', 'http://', 'https://')):
-                connector = ProxyConnector.from_url(proxy)
-            else:
-                parts = proxy.split(':')
-                if len(parts) == 4:
-                    proxy_url = f"socks5://{parts[2]}:{parts[3]}@{parts[0]}:{parts[1]}"
-                    connector = ProxyConnector.from_url(proxy_url)
-                elif len(parts) == 3 and '@' in proxy:
-                    connector = ProxyConnector.from_url(f"socks5://{proxy}")
-                else:
-                    print(f"{Fore.YELLOW} ⚠ Invalid proxy: {proxy}{Style.RESET_ALL}")
-                    return "Unknown"
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(IP_CHECK_URL, headers=HEADERS) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('ip', "Unknown")
-                    return "Unknown"
-        else:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(IP_CHECK_URL, headers=HEADERS) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('ip', "Unknown")
-                    return "Unknown"
+        with open(file_path, 'r') as f:
+            ledger.update(json.load(f))
     except Exception as e:
-        print(f"{Fore.YELLOW} Error: {str(e)}{Style.RESET_ALL}")
-        return "Unknown"
+        print(f"{Fore.YELLOW} ⚠ Could not read {file_path}, starting a new ledger: {str(e)}{Style.RESET_ALL}")
+    return ledger
 
-async def claim_faucet(address: str, proxy: str = None, max_retries: int = 3):
-    for attempt in range(max_retries):
+def save_ledger(ledger: dict, file_path: str = LEDGER_FILE):
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(ledger, f, indent=2)
+    os.replace(tmp_path, file_path)
+
+def record_claim(ledger: dict, address: str, outcome: str):
+    now = time.time()
+    ledger["addresses"][address] = {
+        "last_attempt": now,
+        "outcome": outcome,
+        "next_eligible": now + ADDRESS_COOLDOWNS.get(outcome, 0),
+    }
+
+def claimable(ledger: dict, address: str) -> bool:
+    entry = ledger["addresses"].get(address)
+    return entry is None or entry.get("next_eligible", 0) <= time.time()
+
+async def claim_faucet(session: aiohttp.ClientSession, address: str):
+    async with session.post(FAUCET_API_URL, json={"address": address}, headers=HEADERS) as response:
+        # An HTML or plain-text error page is the API's answer, not a proxy failure: never let it
+        # surface as aiohttp.ContentTypeError, which PROXY_ERRORS would count against the proxy
+        text = await response.text()
         try:
-            if proxy:
-                if proxy.startswith(('socks5://', 'socks4://', 'http://', 'https://')):
-                    connector = ProxyConnector.from_url(proxy)
-                else:
-                    parts = proxy.split(':')
-                    if len(parts) == 4:
-                        proxy_url = f"socks5://{parts[2]}:{parts[3]}@{parts[0]}:{parts[1]}"
-                        connector = ProxyConnector.from_url(proxy_url)
-                    elif len(parts) == 3 and '@' in proxy:
-                        connector = ProxyConnector.from_url(f"socks5://{proxy}")
-                    else:
-                        raise ValueError(f"Invalid proxy format: {proxy}")
-                async with aiohttp.ClientSession(connector=connector) as session:
-                    async with session.post(FAUCET_API_URL, json={"address": address}, headers=HEADERS) as response:
-                        data = await response.json()
-                        if response.status == 200:
-                            return data
-                        elif response.status == 403:
-                            raise Exception(403, "First register an account with Somnia")
-                        elif "error" in data:
-                            if "24 hours" in data["error"]:
-                                raise Exception(response.status, "Please wait 24 hours between requests")
-                            elif "Rate limit exceeded" in data["error"]:
-                                raise Exception(response.status, "Rate limit exceeded")
-                            else:
-                                raise Exception(response.status, data.get("details", str(data)))
-                        else:
-                            raise Exception(response.status, await response.text())
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if response.status == 200:
+            return data if data is not None else text
+        elif response.status == 403:
+            raise Exception(403, "First register an account with Somnia")
+        elif response.status == 429 and not isinstance(data, dict):
+            raise Exception(429, "Rate limit exceeded")
+        elif isinstance(data, dict) and "error" in data:
+            if "24 hours" in data["error"]:
+                raise Exception(response.status, "Please wait 24 hours between requests")
+            elif "Rate limit exceeded" in data["error"]:
+                raise Exception(response.status, "Rate limit exceeded")
             else:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(FAUCET_API_URL, json={"address": address}, headers=HEADERS) as response:
-                        data = await response.json()
-                        if response.status == 200:
-                            return data
-                        elif response.status == 403:
-                            raise Exception(403, "First register an account with Somnia")
-                        elif "error" in data:
-                            if "24 hours" in data["error"]:
-                                raise Exception(response.status, "Please wait 24 hours between requests")
-                            elif "Rate limit exceeded" in data["error"]:
-                                raise Exception(response.status, "Rate limit exceeded")
-                            else:
-                                raise Exception(response.status, data.get("details", str(data)))
-                        else:
-                            raise Exception(response.status, await response.text())
+                raise Exception(response.status, data.get("details", str(data)))
+        else:
+            raise Exception(response.status, text)
+
+async def process_address(semaphore: asyncio.Semaphore, pool: ProxyPool, ledger: dict, address: str) -> str:
+    async with semaphore:
+        print(f"{Fore.CYAN} 🚀 Initializing Faucet for address - [{address}]{Style.RESET_ALL}")
+        proxy = await pool.acquire(address)
+        if proxy is None:
+            print(f"{Fore.RED} ✖ No healthy proxy left for address - [{address}]{Style.RESET_ALL}")
+            return "failed"
+        ok, cooldown, latency = True, None, None
+        try:
+            session = await pool.session(proxy)
+            public_ip = await pool.exit_ip(proxy, HEADERS)
+            print(f"{Fore.CYAN} 🔄 Using Proxy - [{proxy.display}] with Public IP - [{public_ip}]{Style.RESET_ALL}")
+            start = time.monotonic()
+            api_response = await claim_faucet(session, address)
+            latency = time.monotonic() - start
+            print(f"{Fore.GREEN} ✅ Faucet successfully claimed for address - [{address}]{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW} 🔗 API Response: {json.dumps(api_response)}{Style.RESET_ALL}")
+            record_claim(ledger, address, "claimed")
+            return "claimed"
+        except PROXY_ERRORS as e:
+            ok = False
+            pool.unstick(address)
+            print(f"{Fore.RED} ⚠️ Proxy error via [{proxy.display}]: {str(e) or type(e).__name__}{Style.RESET_ALL}")
+            return "retry"
         except Exception as e:
             code = e.args[0] if len(e.args) > 0 else "Unknown"
             response_text = e.args[1] if len(e.args) > 1 else str(e)
-            if "try again" in response_text.lower() and attempt < max_retries - 1:
-                delay = random.uniform(5, 15)
-                print(f"{Fore.YELLOW} Retrying after {delay:.2f} seconds...{Style.RESET_ALL}")
-                await asyncio.sleep(delay)
-                continue
-            raise Exception(code, response_text)
-
-async def process_address(address: str, proxy: str = None):
-    print(f"{Fore.CYAN} 🚀 Initializing Faucet for address - [{address}]{Style.RESET_ALL}")
-    public_ip = await get_proxy_ip(proxy)
-    proxy_display = proxy if proxy else "None"
-    print(f"{Fore.CYAN} 🔄 Using Proxy - [{proxy_display}] with Public IP - [{public_ip}]{Style.RESET_ALL}")
-    try:
-        api_response = await claim_faucet(address, proxy)
-        print(f"{Fore.GREEN} ✅ Faucet successfully claimed for address - [{address}]{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW} 🔗 API Response: {json.dumps(api_response)}{Style.RESET_ALL}")
-    except Exception as e:
-        code = e.args[0] if len(e.args) > 0 else "Unknown"
-        response_text = e.args[1] if len(e.args) > 1 else str(e)
-        if code == 403:
-            print(f"{Fore.RED} ⚠️ Register an account with Somnia first, then request tokens{Style.RESET_ALL}")
-        elif "24 hours" in response_text:
-            print(f"{Fore.YELLOW} ⚠️ Please wait 24 hours between requests{Style.RESET_ALL}")
-        elif "Rate limit" in response_text:
-            print(f"{Fore.YELLOW} ⚠️ Rate limit exceeded, try again later{Style.RESET_ALL}")
-        else:
-            print(f"{Fore.RED} ⚠️ Faucet request failed with code - [{code}] API Response: {response_text}{Style.RESET_ALL}")
+            if code == 403:
+                print(f"{Fore.RED} ⚠️ Register an account with Somnia first, then request tokens{Style.RESET_ALL}")
+                record_claim(ledger, address, "unregistered")
+                return "unregistered"
+            elif "24 hours" in response_text:
+                print(f"{Fore.YELLOW} ⚠️ Please wait 24 hours between requests{Style.RESET_ALL}")
+                record_claim(ledger, address, "cooldown")
+                return "cooldown"
+            elif "Rate limit" in response_text:
+                cooldown = pool.cooldown
+                pool.unstick(address)
+                if proxy.url is not None:
+                    ledger["proxies"][proxy.url] = {"limited_until": time.time() + cooldown}
+                print(f"{Fore.YELLOW} ⚠️ Rate limit exceeded, try again later{Style.RESET_ALL}")
+                return "retry"
+            elif "try again" in response_text.lower():
+                print(f"{Fore.YELLOW} ⚠️ Faucet asked to try again - [{address}]{Style.RESET_ALL}")
+                return "retry"
+            else:
+                print(f"{Fore.RED} ⚠️ Faucet request failed with code - [{code}] API Response: {response_text}{Style.RESET_ALL}")
+                record_claim(ledger, address, "failed")
+                return "failed"
+        finally:
+            await pool.release(proxy, ok, latency, cooldown)
+
+async def claim_with_retries(semaphore: asyncio.Semaphore, pool: ProxyPool, ledger: dict, address: str,
+                             max_retries: int = MAX_RETRIES) -> bool:
+    for attempt in range(max_retries):
+        outcome = await process_address(semaphore, pool, ledger, address)
+        if outcome != "retry":
+            return outcome == "claimed"
+        if attempt < max_retries - 1:
+            # Back off outside the semaphore so the slot and the proxy go to claimable addresses meanwhile
+            delay = random.uniform(5, 15) * (2 ** attempt)
+            print(f"{Fore.YELLOW} Rescheduled [{address}] in {delay:.2f} seconds...{Style.RESET_ALL}")
+            await asyncio.sleep(delay)
+    record_claim(ledger, address, "failed")
+    return False
 
-def process_address_sync(address: str, proxy: str):
+async def run_faucet_async(addresses: list, proxies: list, ledger: dict) -> int:
+    semaphore = asyncio.Semaphore(THREADS)
+    pool = ProxyPool(proxies)
+    now = time.time()
+    for url, state in ledger["proxies"].items():
+        pool.cool_down(url, state.get("limited_until", 0) - now)
     try:
-        asyncio.run(process_address(address, proxy))
-        return True
-    except Exception as e:
-        print(f"{Fore.RED} Error: {str(e)}{Style.RESET_ALL}")
-        return False
+        tasks = [claim_with_retries(semaphore, pool, ledger, address) for address in addresses]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return sum(1 for result in results if result is True)
+    finally:
+        pool.print_summary()
+        await pool.close()
 
 def run_faucetstt():
     print()
@@ -215,18 +242,23 @@ def run_faucetstt():
     if not addresses:
         return
     proxies = load_proxies('proxies.txt')
+    checked = load_proxy_file(CHECKER_OUTPUT)
+    if checked:
+        print(f"{Fore.YELLOW} ℹ Found {len(checked)} proxies in {CHECKER_OUTPUT}{Style.RESET_ALL}")
+        proxies += checked
+    ledger = load_ledger()
+    pending = [address for address in addresses if claimable(ledger, address)]
+    skipped = len(addresses) - len(pending)
+    if skipped:
+        print(f"{Fore.YELLOW} ℹ Skipping {skipped} addresses still in cooldown ({LEDGER_FILE}){Style.RESET_ALL}")
     print()
-    total_addresses = len(addresses)
-    successful = 0
-    with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for idx, address in enumerate(addresses, start=1):
-            proxy = proxies[idx-1] if idx-1 < len(proxies) else None
-            futures.append(executor.submit(process_address_sync, address, proxy))
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
-                successful += 1
-    print_border("✅ Faucet claim completed!", Fore.GREEN)
+    total_addresses = len(pending)
+    try:
+        successful = asyncio.run(run_faucet_async(pending, proxies, ledger))
+    finally:
+        save_ledger(ledger)
+    print_border(f"✅ Faucet claim completed! {successful}/{total_addresses}", Fore.GREEN)
 
 if __name__ == "__main__":
-    run_faucetstt()
+    import cli
+    cli.run("faucetstt", run_faucetstt)
@@ -8,6 +8,16 @@ from web3 import Web3
 from colorama import init, Fore, Style
 import concurrent.futures
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+
 init(autoreset=True)
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
@@ -21,10 +31,12 @@ except Exception as e:
 THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
 SHUFFLE_WALLETS = True
 MINT_PONGPING_SLEEP_RANGE = [100, 300]
+SCRIPT_NAME = "mintping"
 
 # Constants
 SOMNIA_TESTNET_RPC_URL = 'https://dream-rpc.somnia.network'
 SOMNIA_TESTNET_EXPLORER_URL = 'https://shannon-explorer.somnia.network'
+CHAIN_ID = 50312
 CONTRACT_ADDRESS = "0x33E7fAB0a8a5da1A923180989bD617c9c2D1C493"
 
 def print_border(text: str, color=Fore.CYAN, width=80):
@@ -73,7 +85,7 @@ def load_private_keys(file_path="pvkey.txt", language='en') -> List[str]:
 
 def connect_web3(language: str):
     try:
-        w3 = Web3(Web3.HTTPProvider(SOMNIA_TESTNET_RPC_URL))
+        w3 = provider.get_web3(SOMNIA_TESTNET_RPC_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Could not connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -83,12 +95,13 @@ def connect_web3(language: str):
         print(f"{Fore.RED}  ✖ Web3 connection error: {str(e)}{Style.RESET_ALL}")
         sys.exit(1)
 
-def mint_ping_sync(private_key: str, wallet_index: int, language: str = 'en') -> bool:
+def mint_ping_sync(w3: Web3, private_key: str, wallet_index: int, language: str = 'en') -> bool:
     try:
-        w3 = connect_web3(language)
-        account = w3.eth.account.from_key(private_key)
+        with metrics.timer(SCRIPT_NAME, "key_load"):
+            account = w3.eth.account.from_key(private_key)
         address = account.address
-        balance = w3.eth.get_balance(address)
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balance = w3.eth.get_balance(address)
 
         print(f"{Fore.YELLOW}  ℹ Wallet {wallet_index}: {w3.from_wei(balance, 'ether'):.4f} STT{Style.RESET_ALL}")
         if balance < w3.to_wei(0.002, 'ether'):
@@ -108,19 +121,22 @@ def mint_ping_sync(private_key: str, wallet_index: int, language: str = 'en') ->
         contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=abi)
 
         # ساخت تراکنش
-        nonce = w3.eth.get_transaction_count(address)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = w3.eth.get_transaction_count(address)
         min_gas_price = w3.to_wei('36', 'gwei')  # مشابه تراکنش دستی
-        gas_price = max(int(w3.eth.gas_price * 1.5), min_gas_price)  # حاشیه برای شبکه شلوغ
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = max(int(w3.eth.gas_price * 1.5), min_gas_price)  # حاشیه برای شبکه شلوغ
         tx = contract.functions.mint().build_transaction({
             'from': address,
             'nonce': nonce,
             'gasPrice': gas_price,
-            'chainId': w3.eth.chain_id,
+            'chainId': CHAIN_ID,
         })
 
         # تنظیم گس لیمیت
         try:
-            estimated_gas = w3.eth.estimate_gas(tx)
+            with metrics.timer(SCRIPT_NAME, "gas_estimate"):
+                estimated_gas = w3.eth.estimate_gas(tx)
             tx['gas'] = min(int(estimated_gas * 1.5), 79124)  # حاشیه 50%، حداکثر 79124 مثل تراکنش دستی
         except Exception as gas_error:
             print(f"{Fore.RED}  ✖ Wallet {wallet_index}: Gas estimation failed: {str(gas_error)}{Style.RESET_ALL}")
@@ -130,10 +146,9 @@ def mint_ping_sync(private_key: str, wallet_index: int, language: str = 'en') ->
         print(f"{Fore.YELLOW}  ℹ Wallet {wallet_index}: Gas Price: {w3.from_wei(gas_price, 'gwei')} Gwei, Gas Limit: {tx['gas']}, Data: {tx['data']}{Style.RESET_ALL}")
 
         # امضا و ارسال
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(w3, SCRIPT_NAME, tx, private_key)
         print(f"{Fore.GREEN}  ✔ Wallet {wallet_index}: Transaction sent: {SOMNIA_TESTNET_EXPLORER_URL}/tx/0x{tx_hash.hex()}{Style.RESET_ALL}")
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
+        receipt = reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=180)
 
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Wallet {wallet_index}: Mint successful{Style.RESET_ALL}")
@@ -157,21 +172,26 @@ def mint_ping_sync(private_key: str, wallet_index: int, language: str = 'en') ->
 
 def run_mintping(language: str = 'en'):
     print_border("STARTING $PING MINT", Fore.CYAN)
+    metrics.start_run(SCRIPT_NAME)
     private_keys = load_private_keys(language=language)
     if SHUFFLE_WALLETS:
         random.shuffle(private_keys)
 
     print(f"{Fore.YELLOW}  ℹ Found {len(private_keys)} valid wallet(s){Style.RESET_ALL}\n")
+    w3 = connect_web3(language)
     success = 0
+    metrics.set_total(SCRIPT_NAME, len(private_keys))
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for idx, pk in enumerate(private_keys, 1):
-            futures.append(executor.submit(mint_ping_sync, pk, idx, language))
-        for f in concurrent.futures.as_completed(futures):
-            if f.result():
+        jobs = ((w3, pk, idx, language) for idx, pk in enumerate(private_keys, 1))
+        for ok in taskqueue.stream(executor, mint_ping_sync, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 success += 1
 
+    success += reconcile.settle(SCRIPT_NAME)
     print_border(f"COMPLETED: {success}/{len(private_keys)} wallets minted successfully", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": success, "total": len(private_keys)})
 
 if __name__ == "__main__":
-    run_mintping('en')
\ No newline at end of file
+    import cli
+    cli.run(SCRIPT_NAME, run_mintping)
\ No newline at end of file
@@ -8,6 +8,16 @@ from web3 import Web3
 from colorama import init, Fore, Style
 import concurrent.futures
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+
 init(autoreset=True)
 
 BORDER_WIDTH = 80
@@ -24,8 +34,10 @@ THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
 
 SOMNIA_TESTNET_RPC_URL = 'https://dream-rpc.somnia.network'
 SOMNIA_TESTNET_EXPLORER_URL = 'https://shannon-explorer.somnia.network'
+CHAIN_ID = 50312
 SHUFFLE_WALLETS = True
 MINT_PONGPING_SLEEP_RANGE = [100, 300] 
+SCRIPT_NAME = "mintpong"
 
 
 def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
@@ -81,7 +93,7 @@ def shuffle_wallets(keys: List[str]) -> List[str]:
 
 def connect_web3(language: str):
     try:
-        web3 = Web3(Web3.HTTPProvider(SOMNIA_TESTNET_RPC_URL))
+        web3 = provider.get_web3(SOMNIA_TESTNET_RPC_URL)
         if not web3.is_connected():
             print(f"{Fore.RED}  ✖ Unable to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -97,20 +109,23 @@ def bytecode_mint_pongping(address: str) -> str:
     return f"0x40c10f19000000000000000000000000{address_clean}00000000000000000000000000000000000000000000003635c9adc5dea00000"
 
 
-def mint_worker(index: int, private_key: str, language: str) -> bool:
+def mint_worker(web3: Web3, index: int, private_key: str, language: str) -> bool:
     try:
-        web3 = connect_web3(language)
-        account = web3.eth.account.from_key(private_key)
+        with metrics.timer(SCRIPT_NAME, "key_load"):
+            account = web3.eth.account.from_key(private_key)
         address = account.address
         contract_address = "0x9beaA0016c22B646Ac311Ab171270B0ECf23098F"
 
-        balance = web3.eth.get_balance(address)
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balance = web3.eth.get_balance(address)
         if balance < web3.to_wei(0.001, 'ether'):
             print(f"{Fore.YELLOW}  ⚠ Wallet {index}: Insufficient STT balance │ {address}{Style.RESET_ALL}")
             return False
 
-        nonce = web3.eth.get_transaction_count(address)
-        gas_price = web3.eth.gas_price
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = web3.eth.get_transaction_count(address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = web3.eth.gas_price
         tx = {
             'to': Web3.to_checksum_address(contract_address),
             'value': 0,
@@ -118,21 +133,21 @@ def mint_worker(index: int, private_key: str, language: str) -> bool:
             'nonce': nonce,
             'gas': 200000,
             'gasPrice': gas_price,
-            'chainId': web3.eth.chain_id
+            'chainId': CHAIN_ID
         }
 
         try:
-            gas_estimate = web3.eth.estimate_gas(tx)
+            with metrics.timer(SCRIPT_NAME, "gas_estimate"):
+                gas_estimate = web3.eth.estimate_gas(tx)
             tx['gas'] = gas_estimate + 10000
         except:
             pass
 
-        signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(web3, SCRIPT_NAME, tx, private_key)
 
         print(f"{Fore.GREEN}  ✔ Wallet {index}: Tx sent - {SOMNIA_TESTNET_EXPLORER_URL}/tx/{tx_hash.hex()}{Style.RESET_ALL}")
 
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        receipt = reconcile.wait_for_receipt(web3, SCRIPT_NAME, tx_hash, timeout=120)
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Wallet {index}: Successfully minted $PONG{Style.RESET_ALL}")
             return True
@@ -146,6 +161,7 @@ def mint_worker(index: int, private_key: str, language: str) -> bool:
 
 def run_mintpong(language: str = 'en'):
     print_border("START MINTING $PONG", Fore.CYAN)
+    metrics.start_run(SCRIPT_NAME)
 
     private_keys = load_private_keys(language=language)
     if SHUFFLE_WALLETS:
@@ -153,17 +169,21 @@ def run_mintpong(language: str = 'en'):
 
     print(f"{Fore.YELLOW}  ℹ Found {len(private_keys)} wallet(s){Style.RESET_ALL}")
 
+    web3 = connect_web3(language)
     successful = 0
+    metrics.set_total(SCRIPT_NAME, len(private_keys))
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for i, key in enumerate(private_keys, start=1):
-            futures.append(executor.submit(mint_worker, i, key, language))
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
+        jobs = ((web3, i, key, language) for i, key in enumerate(private_keys, start=1))
+        for ok in taskqueue.stream(executor, mint_worker, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 successful += 1
 
+    successful += reconcile.settle(SCRIPT_NAME)
     print_border(f"COMPLETED: {successful}/{len(private_keys)} wallet(s) succeeded", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful, "total": len(private_keys)})
 
 
 if __name__ == "__main__":
-    run_mintpong("en")
+    import cli
+    cli.run(SCRIPT_NAME, run_mintpong)
@@ -9,6 +9,17 @@ from web3 import Web3
 from eth_account import Account
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+import indexer
+
 init(autoreset=True)
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
@@ -29,6 +40,7 @@ EXPLORER_URL = "https://shannon-explorer.somnia.network/tx/0x"
 CONTRACT_ADDRESS = "0x65296738D4E5edB1515e40287B6FDf8320E6eE04"
 MINT_AMOUNT = 1000
 MINT_DATA = "0x1249c58b"
+SCRIPT_NAME = "mintsusdt"
 
 def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
     text = text.strip()
@@ -83,7 +95,7 @@ def load_private_keys(file_path: str = "pvkey.txt") -> list:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(NETWORK_URL))
+        w3 = provider.get_web3(NETWORK_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -103,16 +115,21 @@ def has_minted_susdt(w3: Web3, address: str) -> bool:
             "type": "function"
         }
     ]
+    minted = indexer.has_minted(CONTRACT_ADDRESS, address)
+    if minted is not None:
+        return minted
     contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=susdt_abi)
     try:
-        balance = contract.functions.balanceOf(address).call()
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balance = contract.functions.balanceOf(address).call()
         return balance > 0
     except Exception as e:
         print(f"{Fore.YELLOW}  ⚠ Failed to check sUSDT balance: {str(e)}{Style.RESET_ALL}")
         return False
 
 async def mint_susdt(w3: Web3, private_key: str, wallet_index: int):
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     sender_address = account.address
 
     if has_minted_susdt(w3, sender_address):
@@ -121,13 +138,17 @@ async def mint_susdt(w3: Web3, private_key: str, wallet_index: int):
 
     try:
         print(f"{Fore.CYAN}  > Checking balance...{Style.RESET_ALL}")
-        balance = float(w3.from_wei(w3.eth.get_balance(sender_address), 'ether'))
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balance = float(w3.from_wei(w3.eth.get_balance(sender_address), 'ether'))
         if balance < 0.001:
             print(f"{Fore.RED}  ✖ Insufficient balance: {balance:.4f} STT < 0.001 STT{Style.RESET_ALL}")
             return False
 
         print(f"{Fore.CYAN}  > Preparing transaction...{Style.RESET_ALL}")
-        nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = int(w3.eth.gas_price * random.uniform(1.03, 1.1))
         tx_params = {
             'nonce': nonce,
             'to': Web3.to_checksum_address(CONTRACT_ADDRESS),
@@ -135,15 +156,14 @@ async def mint_susdt(w3: Web3, private_key: str, wallet_index: int):
             'data': MINT_DATA,
             'chainId': CHAIN_ID,
             'gas': 200000,
-            'gasPrice': int(w3.eth.gas_price * random.uniform(1.03, 1.1))
+            'gasPrice': gas_price
         }
 
         print(f"{Fore.CYAN}  > Sending transaction...{Style.RESET_ALL}")
-        signed_tx = w3.eth.account.sign_transaction(tx_params, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(w3, SCRIPT_NAME, tx_params, private_key)
         tx_link = f"{EXPLORER_URL}{tx_hash.hex()}"
 
-        receipt = await asyncio.get_event_loop().run_in_executor(None, lambda: w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180))
+        receipt = await asyncio.get_event_loop().run_in_executor(None, lambda: reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=180))
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Successfully minted 1000 sUSDT! │ Tx: {tx_link}{Style.RESET_ALL}")
             return True
@@ -161,6 +181,7 @@ def run_mintsusdt():
     print()
     print_border("MINT sUSDT - SOMNIA TESTNET", Fore.CYAN)
     print()
+    metrics.start_run(SCRIPT_NAME)
 
     private_keys = load_private_keys('pvkey.txt')
     print(f"{Fore.YELLOW}  ℹ Info: Found {len(private_keys)} wallets{Style.RESET_ALL}")
@@ -174,15 +195,18 @@ def run_mintsusdt():
     successful_mints = 0
     total_wallets = len(private_keys)
 
+    metrics.set_total(SCRIPT_NAME, total_wallets)
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for i, (line_num, privkey) in enumerate(private_keys, start=1):
-            futures.append(executor.submit(mint_susdt_sync, w3, privkey, i))
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
+        jobs = ((w3, privkey, i) for i, (line_num, privkey) in enumerate(private_keys, start=1))
+        for ok in taskqueue.stream(executor, mint_susdt_sync, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 successful_mints += 1
 
+    successful_mints += reconcile.settle(SCRIPT_NAME)
     print_border(f"COMPLETED: {successful_mints}/{total_wallets} TRANSACTIONS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful_mints, "total": total_wallets})
 
 if __name__ == "__main__":
-    run_mintsusdt()
+    import cli
+    cli.run(SCRIPT_NAME, run_mintsusdt)
@@ -9,6 +9,18 @@ from web3 import Web3
 from eth_account import Account
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+import indexer
+import preflight
+
 init(autoreset=True)
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
@@ -20,6 +32,7 @@ except Exception as e:
     sys.exit(1)
 
 THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
+SCRIPT_NAME = "sellmeme"
 
 BORDER_WIDTH = 80
 
@@ -115,7 +128,7 @@ def load_private_keys(file_path: str = "pvkey.txt") -> list:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(NETWORK_URL))
+        w3 = provider.get_web3(NETWORK_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -128,12 +141,17 @@ def connect_web3():
 def get_token_info(w3: Web3, token_symbol: str, wallet_address: str):
     contract = w3.eth.contract(address=Web3.to_checksum_address(TOKENS[token_symbol]["address"]), abi=TOKEN_ABI)
     try:
-        balance = contract.functions.balanceOf(wallet_address).call() / 10**contract.functions.decimals().call()
+        balance = indexer.token_balance(TOKENS[token_symbol]["address"], wallet_address)
+        if balance is None:
+            with metrics.timer(SCRIPT_NAME, "read"):
+                balance = contract.functions.balanceOf(wallet_address).call() / 10**contract.functions.decimals().call()
         price = TOKENS[token_symbol]["price"]
         print(f"{Fore.YELLOW}    Balance       : {balance:,.2f} {token_symbol}{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}    Price         : {price:,.5f} sUSDT/{token_symbol}{Style.RESET_ALL}")
         if token_symbol != "sUSDT":
-            total_supply = contract.functions.totalSupply().call() / 10**contract.functions.decimals().call()
+            total_supply = indexer.total_supply(TOKENS[token_symbol]["address"])
+            if total_supply is None:
+                total_supply = contract.functions.totalSupply().call() / 10**contract.functions.decimals().call()
             market_cap = price * total_supply
             print(f"{Fore.YELLOW}    Market Cap   : {market_cap:,.2f} sUSDT{Style.RESET_ALL}")
         print()
@@ -171,23 +189,28 @@ def get_amount(token_symbol: str):
             print(f"{Fore.RED}  ✖ Error: Invalid number{Style.RESET_ALL}")
 
 async def approve_token(w3: Web3, private_key: str, token_address: str, spender_address: str, amount: float, token_symbol: str):
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     token_contract = w3.eth.contract(address=Web3.to_checksum_address(token_address), abi=TOKEN_ABI)
-    decimals = token_contract.functions.decimals().call()
+    with metrics.timer(SCRIPT_NAME, "read"):
+        decimals = token_contract.functions.decimals().call()
     amount_wei = int(amount * (10 ** decimals))
+    with metrics.timer(SCRIPT_NAME, "nonce"):
+        nonce = w3.eth.get_transaction_count(account.address)
+    with metrics.timer(SCRIPT_NAME, "fee"):
+        gas_price = w3.eth.gas_price
 
     tx = token_contract.functions.approve(
         Web3.to_checksum_address(spender_address),
         amount_wei
     ).build_transaction({
         'from': account.address,
-        'nonce': w3.eth.get_transaction_count(account.address),
+        'nonce': nonce,
         'gas': 200000,
-        'gasPrice': w3.eth.gas_price
+        'gasPrice': gas_price
     })
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+    tx_hash = txerrors.send(w3, SCRIPT_NAME, tx, private_key)
+    receipt = reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=120, units=0)
 
     if receipt.status == 1:
         print(f"{Fore.GREEN}  ✔ Successfully approved {amount:,.2f} {token_symbol}!{Style.RESET_ALL}")
@@ -197,15 +220,21 @@ async def approve_token(w3: Web3, private_key: str, token_address: str, spender_
         return False
 
 async def sell_token(w3: Web3, private_key: str, token_symbol: str, amount: float):
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     token_in = TOKENS[token_symbol]["address"]
     token_out = SUSDT_ADDRESS
     swap_router = w3.eth.contract(address=Web3.to_checksum_address(ROUTER_ADDRESS), abi=SWAP_ROUTER_ABI)
 
     token_contract = w3.eth.contract(address=Web3.to_checksum_address(token_in), abi=TOKEN_ABI)
-    decimals = token_contract.functions.decimals().call()
+    with metrics.timer(SCRIPT_NAME, "read"):
+        decimals = token_contract.functions.decimals().call()
     amount_in_wei = int(amount * (10 ** decimals))
     amount_out_minimum = int(amount * 0.95 * (10 ** decimals))
+    with metrics.timer(SCRIPT_NAME, "nonce"):
+        nonce = w3.eth.get_transaction_count(account.address)
+    with metrics.timer(SCRIPT_NAME, "fee"):
+        gas_price = w3.eth.gas_price
 
     tx_data = swap_router.functions.exactInputSingle(
         (
@@ -219,15 +248,16 @@ async def sell_token(w3: Web3, private_key: str, token_symbol: str, amount: floa
         )
     ).build_transaction({
         'from': account.address,
-        'nonce': w3.eth.get_transaction_count(account.address),
+        'nonce': nonce,
         'gas': 300000,
-        'gasPrice': w3.eth.gas_price,
+        'gasPrice': gas_price,
         'chainId': CHAIN_ID
     })
-    signed_tx = w3.eth.account.sign_transaction(tx_data, private_key)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    if not preflight.check(w3, SCRIPT_NAME, tx_data, f"Sell {token_symbol} ({account.address})"):
+        return False
+    tx_hash = txerrors.send(w3, SCRIPT_NAME, tx_data, private_key)
     tx_link = f"{EXPLORER_URL}{tx_hash.hex()}"
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+    receipt = reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=120)
 
     if receipt.status == 1:
         print(f"{Fore.GREEN}  ✔ Successfully sold {amount:,.2f} {token_symbol} for sUSDT │ Tx: {tx_link}{Style.RESET_ALL}")
@@ -255,6 +285,7 @@ def handle_sell_sync(w3: Web3, private_key: str, token_symbol: str, amount: floa
 def run_sellmeme():
     print()
     print_border("SELL MEME TOKEN - SOMNIA TESTNET", Fore.CYAN)
+    metrics.start_run(SCRIPT_NAME)
 
     private_keys = load_private_keys('pvkey.txt')
     print(f"{Fore.YELLOW}  ℹ Info: Found {len(private_keys)} wallets{Style.RESET_ALL}")
@@ -274,16 +305,19 @@ def run_sellmeme():
 
     random.shuffle(private_keys)
 
+    metrics.set_total(SCRIPT_NAME, total_wallets)
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for i, (profile_num, privkey) in enumerate(private_keys, 1):
-            futures.append(executor.submit(handle_sell_sync, w3, privkey, token_symbol, amount))
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
+        jobs = ((w3, privkey, token_symbol, amount) for profile_num, privkey in private_keys)
+        for ok in taskqueue.stream(executor, handle_sell_sync, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 successful_sells += 1
 
+    successful_sells += reconcile.settle(SCRIPT_NAME)
     print()
     print_border(f"COMPLETED: {successful_sells}/{total_wallets} TRANSACTIONS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful_sells, "total": total_wallets})
 
 if __name__ == "__main__":
-    run_sellmeme()
+    import cli
+    cli.run(SCRIPT_NAME, run_sellmeme)
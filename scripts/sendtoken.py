@@ -9,6 +9,18 @@ from web3 import Web3
 from eth_account import Account
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+import preflight
+import disperse
+
 init(autoreset=True)
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
@@ -20,11 +32,18 @@ except Exception as e:
     sys.exit(1)
 
 THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
+BATCH_CONFIG = config_data.get("batchSend", {})
+# Gas per batchSendToken transaction; capped at 80% of the block gas limit
+BATCH_GAS_TARGET = BATCH_CONFIG.get("gasTarget", 10_000_000)
+BATCH_MAX_RECIPIENTS = BATCH_CONFIG.get("maxRecipients", 500)
+# Chunks in flight from the owner wallet before waiting on the oldest receipt
+BATCH_PIPELINE_DEPTH = BATCH_CONFIG.get("pipelineDepth", 8)
 
 # Constants
 NETWORK_URL = "https://dream-rpc.somnia.network"
 CHAIN_ID = 50312
 EXPLORER_URL = "https://shannon-explorer.somnia.network"
+SCRIPT_NAME = "sendtoken"
 
 CONTRACT_ABI = [
     {
@@ -143,6 +162,16 @@ CONTRACT_ABI = [
         "stateMutability": "nonpayable",
         "type": "function"
     },
+    {
+        "inputs": [
+            {"internalType": "address[]", "name": "recipients", "type": "address[]"},
+            {"internalType": "uint256", "name": "amount", "type": "uint256"}
+        ],
+        "name": "batchSendToken",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
     {
         "inputs": [],
         "name": "owner",
@@ -223,7 +252,7 @@ def load_addresses(file_path: str = "addressERC20.txt") -> list:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(NETWORK_URL))
+        w3 = provider.get_web3(NETWORK_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -234,30 +263,34 @@ def connect_web3():
         sys.exit(1)
 
 async def send_token(w3: Web3, private_key: str, wallet_index: int, contract_address: str, destination: str, amount: float) -> bool:
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     sender_address = account.address
     try:
         contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=CONTRACT_ABI)
-        decimals = contract.functions.decimals().call()
+        with metrics.timer(SCRIPT_NAME, "read"):
+            decimals = contract.functions.decimals().call()
         amount_wei = int(amount * 10 ** decimals)
 
         print(f"{Fore.CYAN}  > Preparing transaction...{Style.RESET_ALL}")
-        nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = w3.eth.gas_price
 
         tx = contract.functions.sendToken(Web3.to_checksum_address(destination), amount_wei).build_transaction({
             'from': sender_address,
             'nonce': nonce,
             'chainId': CHAIN_ID,
             'gas': 200000,
-            'gasPrice': w3.eth.gas_price
+            'gasPrice': gas_price
         })
 
         print(f"{Fore.CYAN}  > Sending transaction...{Style.RESET_ALL}")
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(w3, SCRIPT_NAME, tx, private_key)
         tx_link = f"{EXPLORER_URL}/tx/0x{tx_hash.hex()}"
 
-        receipt = await asyncio.get_event_loop().run_in_executor(None, lambda: w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180))
+        receipt = await asyncio.get_event_loop().run_in_executor(None, lambda: reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=180))
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Token sent successfully! │ Tx: {tx_link}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}    Wallet address: {sender_address}{Style.RESET_ALL}")
@@ -273,6 +306,74 @@ async def send_token(w3: Web3, private_key: str, wallet_index: int, contract_add
         print(f"{Fore.RED}  ✖ Failed: {str(e)}{Style.RESET_ALL}")
         return False
 
+def batch_call(contract, amount_wei: int):
+    # batchSendToken sends the same amount to every recipient and no STT with it
+    return lambda recipients, values: (contract.functions.batchSendToken(recipients, amount_wei), 0)
+
+def plan_batches(w3: Web3, contract, owner: str, recipients: list, amount_wei: int) -> dict:
+    # A new balance slot dominates the cost, and the first real recipients may already hold one:
+    # disperse.estimate sizes for the worse of them and two fresh addresses
+    base_gas, per_recipient = disperse.estimate(contract, owner, recipients, amount_wei, SCRIPT_NAME,
+                                                call=batch_call(contract, amount_wei))
+    chunk_size, gas_target = disperse.chunk_size(w3, base_gas, per_recipient, SCRIPT_NAME,
+                                                 BATCH_GAS_TARGET, BATCH_MAX_RECIPIENTS)
+    chunks = [(recipients[i:i + chunk_size], [amount_wei] * len(recipients[i:i + chunk_size]))
+              for i in range(0, len(recipients), chunk_size)]
+    return {
+        "recipients": len(recipients),
+        "base_gas": base_gas,
+        "gas_per_recipient": per_recipient,
+        "gas_target": gas_target,
+        "chunk_size": chunk_size,
+        "transactions": len(chunks),
+        "chunks": chunks,
+    }
+
+def send_batches(w3: Web3, contract, private_key: str, plan: dict, amount_wei: int) -> tuple:
+    """(confirmed transactions, delivered recipients): the plan's chunks from the owner, pipelined."""
+    with metrics.timer(SCRIPT_NAME, "fee"):
+        gas_price = w3.eth.gas_price
+    confirmed, delivered, _ = disperse.send_lane(
+        w3, contract, private_key, plan["chunks"], plan["base_gas"], plan["gas_per_recipient"],
+        {'chainId': CHAIN_ID, 'gasPrice': gas_price}, SCRIPT_NAME, f"{EXPLORER_URL}/tx/0x",
+        BATCH_PIPELINE_DEPTH, call=batch_call(contract, amount_wei))
+    return confirmed, delivered
+
+def run_batch_send(w3: Web3, private_keys: list, contract_address: str, amount: float):
+    recipients = load_addresses('addressERC20.txt')
+    if not recipients:
+        return
+    contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=CONTRACT_ABI)
+    # batchSendToken is onlyOwner: the deploying wallet sends every chunk
+    with metrics.timer(SCRIPT_NAME, "read"):
+        owner = contract.functions.owner().call()
+        decimals = contract.functions.decimals().call()
+    owner_key = next((key for _, key in private_keys if Account.from_key(key).address == owner), None)
+    if owner_key is None:
+        print(f"{Fore.RED}  ✖ Contract owner {owner} is not in pvkey.txt{Style.RESET_ALL}")
+        return
+    amount_wei = int(amount * 10 ** decimals)
+    try:
+        plan = plan_batches(w3, contract, owner, recipients, amount_wei)
+    except Exception as e:
+        print(f"{Fore.RED}  ✖ batchSendToken failed to estimate (deployed before batch support? redeploy with deploytoken): {str(e)}{Style.RESET_ALL}")
+        return
+
+    print(f"{Fore.YELLOW}  ℹ {plan['recipients']} recipients × {plan['gas_per_recipient']} gas + {plan['base_gas']} base, "
+          f"gas target {plan['gas_target']} → {plan['chunk_size']} per tx → {plan['transactions']} transactions{Style.RESET_ALL}")
+    print()
+    metrics.set_total(SCRIPT_NAME, plan["recipients"])
+    _, delivered = send_batches(w3, contract, owner_key, plan, amount_wei)
+    delivered += reconcile.settle(SCRIPT_NAME)
+
+    print()
+    print_border(f"COMPLETED: {delivered}/{plan['recipients']} RECIPIENTS IN {plan['transactions']} TRANSACTIONS", Fore.GREEN)
+    print(f"{Fore.YELLOW}  ℹ Chunking: ({plan['recipients']} recipients / {plan['chunk_size']} per tx) = {plan['transactions']} transactions "
+          f"instead of {plan['recipients']}; {plan['chunk_size']} × {plan['gas_per_recipient']} gas × {disperse.GAS_MARGIN} margin "
+          f"+ {plan['base_gas']} base ≤ {plan['gas_target']} gas target{Style.RESET_ALL}")
+    batch = {key: value for key, value in plan.items() if key != "chunks"}
+    metrics.write_summary(SCRIPT_NAME, {"successful": delivered, "total": plan["recipients"], "batch": batch})
+
 def send_token_sync(w3: Web3, private_key: str, wallet_index: int, contract_address: str, destination: str, amount: float) -> bool:
     return asyncio.run(send_token(w3, private_key, wallet_index, contract_address, destination, amount))
 
@@ -280,6 +381,7 @@ def run_sendtoken():
     print()
     print_border("SEND ERC20 TOKEN - SOMNIA TESTNET", Fore.CYAN)
     print()
+    metrics.start_run(SCRIPT_NAME)
 
     private_keys = load_private_keys()
     print(f"{Fore.YELLOW}  ℹ Info: Found {len(private_keys)} wallets{Style.RESET_ALL}")
@@ -306,22 +408,26 @@ def run_sendtoken():
     print()
     print(f"{Fore.CYAN}  ✦ Choose token sending method:{Style.RESET_ALL}")
     print(f"{Fore.GREEN}    ├─ 1. Send randomly{Style.RESET_ALL}")
-    print(f"{Fore.GREEN}    └─ 2. Send from addressERC20.txt{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}    ├─ 2. Send from addressERC20.txt{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}    └─ 3. Batch send to addressERC20.txt (owner wallet, batchSendToken){Style.RESET_ALL}")
     print()
-    print(f"{Fore.YELLOW}  ➤ Enter your choice (1 or 2): {Style.RESET_ALL}", end="")
+    print(f"{Fore.YELLOW}  ➤ Enter your choice (1, 2 or 3): {Style.RESET_ALL}", end="")
     choice = input().strip()
 
     destinations = []
     if choice == '1':
         destinations = []
         for _ in range(len(private_keys)):
-            new_account = Web3(Web3.HTTPProvider(NETWORK_URL)).eth.account.create()
+            new_account = Account.create()
             destinations.append(new_account.address)
     elif choice == '2':
         addresses = load_addresses('addressERC20.txt')
         if not addresses:
             return
         destinations = addresses
+    elif choice == '3':
+        run_batch_send(w3, private_keys, contract_address, amount)
+        return
     else:
         print(f"{Fore.RED}  ✖ Invalid choice{Style.RESET_ALL}")
         return
@@ -330,25 +436,36 @@ def run_sendtoken():
     total_wallets = len(private_keys)
 
     random.shuffle(private_keys)
+    jobs = ((i, privkey, destinations[i-1] if i-1 < len(destinations) else random.choice(destinations))
+            for i, (line_num, privkey) in enumerate(private_keys, 1))
+
+    metrics.set_total(SCRIPT_NAME, total_wallets)
+    if preflight.enabled():
+        jobs = list(jobs)
+        # sendToken is onlyOwner: without this every other wallet pays for a revert
+        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=CONTRACT_ABI)
+        with metrics.timer(SCRIPT_NAME, "read"):
+            amount_wei = int(amount * 10 ** contract.functions.decimals().call())
+        senders = [Account.from_key(privkey).address for _, privkey, _ in jobs]
+        calls = [{'from': sender, 'to': contract.address,
+                  'data': contract.encode_abi("sendToken", args=[Web3.to_checksum_address(dest), amount_wei])}
+                 for sender, (_, _, dest) in zip(senders, jobs)]
+        keep = preflight.gate(w3, SCRIPT_NAME, calls, [f"Wallet {i} ({sender})" for (i, _, _), sender in zip(jobs, senders)])
+        metrics.progress(SCRIPT_NAME, False, keep.count(False))
+        jobs = [job for job, ok in zip(jobs, keep) if ok]
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for i, (line_num, privkey) in enumerate(private_keys, 1):
-            if i-1 < len(destinations):
-                dest = destinations[i-1]
-            else:
-                dest = random.choice(destinations)
-
-            futures.append(
-                executor.submit(send_token_sync, w3, privkey, i, contract_address, dest, amount)
-            )
-
-        for future in concurrent.futures.as_completed(futures):
-            if future.result():
+        jobs = ((w3, privkey, i, contract_address, dest, amount) for i, privkey, dest in jobs)
+        for ok in taskqueue.stream(executor, send_token_sync, jobs):
+            metrics.progress(SCRIPT_NAME, ok)
+            if ok:
                 successful_sends += 1
 
+    successful_sends += reconcile.settle(SCRIPT_NAME)
     print()
     print_border(f"COMPLETED: {successful_sends}/{total_wallets} TRANSACTIONS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful_sends, "total": total_wallets})
 
 if __name__ == "__main__":
-    run_sendtoken()
+    import cli
+    cli.run(SCRIPT_NAME, run_sendtoken)
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import time
 import random
 import asyncio
 import concurrent.futures
@@ -9,6 +10,17 @@ from web3 import Web3
 from eth_account import Account
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+import disperse
+
 init(autoreset=True)
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
@@ -20,6 +32,7 @@ except Exception as e:
     sys.exit(1)
 
 THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
+SCRIPT_NAME = "sendtx"
 
 BORDER_WIDTH = 80
 
@@ -106,7 +119,7 @@ def load_addresses(file_path: str = "address.txt") -> list:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(NETWORK_URL))
+        w3 = provider.get_web3(NETWORK_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -117,11 +130,14 @@ def connect_web3():
         sys.exit(1)
 
 async def send_transaction(w3: Web3, private_key: str, to_address: str, amount: float):
-    account = Account.from_key(private_key)
+    with metrics.timer(SCRIPT_NAME, "key_load"):
+        account = Account.from_key(private_key)
     sender_address = account.address
     try:
-        nonce = w3.eth.get_transaction_count(sender_address)
-        latest_block = w3.eth.get_block('latest')
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = w3.eth.get_transaction_count(sender_address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            latest_block = w3.eth.get_block('latest')
         base_fee_per_gas = latest_block.get('baseFeePerGas', w3.to_wei(2, 'gwei'))
         max_priority_fee_per_gas = w3.to_wei(2, 'gwei')
         max_fee_per_gas = base_fee_per_gas + max_priority_fee_per_gas
@@ -136,11 +152,10 @@ async def send_transaction(w3: Web3, private_key: str, to_address: str, amount:
             'chainId': CHAIN_ID
         }
 
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = txerrors.send(w3, SCRIPT_NAME, tx, private_key)
         tx_link = f"{EXPLORER_URL}{tx_hash.hex()}"
 
-        receipt = await asyncio.get_event_loop().run_in_executor(None, lambda: w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180))
+        receipt = await asyncio.get_event_loop().run_in_executor(None, lambda: reconcile.wait_for_receipt(w3, SCRIPT_NAME, tx_hash, timeout=180))
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Transaction successful! │ Tx: {tx_link}{Style.RESET_ALL}")
             return True
@@ -200,10 +215,79 @@ def send_file_tx(w3: Web3, private_key: str, wallet_index: int, addresses: list,
             success += 1
     return success
 
+def run_batch_tx(w3: Web3, private_keys: list, amount: float):
+    addresses = load_addresses('address.txt')
+    if not addresses:
+        return
+    value = w3.to_wei(amount, 'ether')
+    with metrics.timer(SCRIPT_NAME, "fee"):
+        latest_block = w3.eth.get_block('latest')
+    max_priority_fee_per_gas = w3.to_wei(2, 'gwei')
+    tx_fields = {
+        'chainId': CHAIN_ID,
+        'maxFeePerGas': latest_block.get('baseFeePerGas', w3.to_wei(2, 'gwei')) + max_priority_fee_per_gas,
+        'maxPriorityFeePerGas': max_priority_fee_per_gas
+    }
+    keys = {Account.from_key(pk).address: pk for pk in private_keys}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+        with metrics.timer(SCRIPT_NAME, "read"):
+            balances = dict(zip(keys, executor.map(w3.eth.get_balance, keys)))
+    richest = max(balances, key=balances.get)
+    try:
+        contract = disperse.get_contract(w3, keys[richest], tx_fields, SCRIPT_NAME)
+        base_gas, per_recipient = disperse.estimate(contract, richest, addresses, value, SCRIPT_NAME)
+    except Exception as e:
+        print(f"{Fore.RED}  ✖ Disperse contract unavailable: {str(e)}{Style.RESET_ALL}")
+        return
+    size, gas_target = disperse.chunk_size(w3, base_gas, per_recipient, SCRIPT_NAME)
+    chunks = [(addresses[i:i + size], [value] * len(addresses[i:i + size])) for i in range(0, len(addresses), size)]
+
+    def cost(chunk):
+        return sum(chunk[1]) + disperse.gas_limit(base_gas, per_recipient, len(chunk[0])) * tx_fields['maxFeePerGas']
+
+    lanes, unfunded = disperse.assign(chunks, balances, cost)
+    print(f"{Fore.YELLOW}  ℹ {len(addresses)} transfers × {per_recipient} gas + {base_gas} base, gas target {gas_target} "
+          f"→ {size} per tx → {len(chunks)} transactions over {len(lanes)} sender lanes "
+          f"(≤{max((len(lane) for lane in lanes.values()), default=0)} per lane){Style.RESET_ALL}")
+    metrics.set_total(SCRIPT_NAME, len(addresses))
+    if unfunded:
+        skipped = sum(len(chunk[0]) for chunk in unfunded)
+        print(f"{Fore.YELLOW}  ⚠ {skipped} transfers in {len(unfunded)} batches skipped: no wallet has enough STT{Style.RESET_ALL}")
+        metrics.progress(SCRIPT_NAME, False, skipped)
+    print()
+
+    confirmed = delivered = 0
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(THREADS, len(lanes)))) as executor:
+        futures = [executor.submit(disperse.send_lane, w3, contract, keys[sender], lane, base_gas, per_recipient,
+                                   tx_fields, SCRIPT_NAME, EXPLORER_URL) for sender, lane in lanes.items()]
+        for future in concurrent.futures.as_completed(futures):
+            lane_confirmed, lane_delivered, _ = future.result()
+            confirmed += lane_confirmed
+            delivered += lane_delivered
+    landed = set()
+    delivered += reconcile.settle(SCRIPT_NAME, confirmed=landed)
+    confirmed += len(landed)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+
+    print()
+    print_border(f"COMPLETED: {delivered}/{len(addresses)} TRANSFERS IN {confirmed} TRANSACTIONS", Fore.GREEN)
+    print(f"{Fore.YELLOW}  ℹ {confirmed / elapsed:.2f} tx/s, {delivered / elapsed:.2f} transfers/s over {elapsed:.1f}s{Style.RESET_ALL}")
+    metrics.write_summary(SCRIPT_NAME, {
+        "successful": delivered,
+        "total": len(addresses),
+        "transactions": confirmed,
+        "tx_per_sec": round(confirmed / elapsed, 3),
+        "transfers_per_sec": round(delivered / elapsed, 3),
+        "batch": {"base_gas": base_gas, "gas_per_recipient": per_recipient, "gas_target": gas_target,
+                  "chunk_size": size, "transactions": len(chunks), "lanes": len(lanes)},
+    })
+
 def run_sendtx():
     print()
     print_border("SEND TX - SOMNIA TESTNET", Fore.CYAN)
     print()
+    metrics.start_run(SCRIPT_NAME)
 
     private_keys = load_private_keys()
     print(f"{Fore.YELLOW}  ℹ Info: Found {len(private_keys)} wallets{Style.RESET_ALL}")
@@ -222,7 +306,8 @@ def run_sendtx():
         print_border("SELECT TRANSACTION TYPE", Fore.YELLOW)
         print(f"{Fore.CYAN}  1. Send to random SOMNIA DEV address{Style.RESET_ALL}")
         print(f"{Fore.CYAN}  2. Send to addresses from file (address.txt){Style.RESET_ALL}")
-        choice = input(f"{Fore.YELLOW}  > Enter choice (1/2): {Style.RESET_ALL}")
+        print(f"{Fore.CYAN}  3. Batch send to addresses from file (address.txt) via disperse contract{Style.RESET_ALL}")
+        choice = input(f"{Fore.YELLOW}  > Enter choice (1/2/3): {Style.RESET_ALL}")
 
         total_txs = 0
         successful = 0
@@ -231,12 +316,12 @@ def run_sendtx():
             print_border(f"STARTING {tx_count} RANDOM TRANSACTIONS", Fore.CYAN)
             print()
             total_txs = tx_count * len(private_keys)
+            metrics.set_total(SCRIPT_NAME, total_txs)
             with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-                futures = []
-                for idx, pk in enumerate(private_keys, 1):
-                    futures.append(executor.submit(send_random_tx, w3, pk, idx, tx_count, amount))
-                for f in concurrent.futures.as_completed(futures):
-                    successful += f.result()
+                jobs = ((w3, pk, idx, tx_count, amount) for idx, pk in enumerate(private_keys, 1))
+                for result in taskqueue.stream(executor, send_random_tx, jobs):
+                    metrics.progress(SCRIPT_NAME, result, tx_count)
+                    successful += result
             break
 
         elif choice == '2':
@@ -246,20 +331,28 @@ def run_sendtx():
             print_border(f"STARTING TRANSACTIONS TO {len(addresses)} ADDRESSES FROM FILE", Fore.CYAN)
             print()
             total_txs = len(private_keys) * len(addresses)
+            metrics.set_total(SCRIPT_NAME, total_txs)
             with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-                futures = []
-                for idx, pk in enumerate(private_keys, 1):
-                    futures.append(executor.submit(send_file_tx, w3, pk, idx, addresses, amount))
-                for f in concurrent.futures.as_completed(futures):
-                    successful += f.result()
+                jobs = ((w3, pk, idx, addresses, amount) for idx, pk in enumerate(private_keys, 1))
+                for result in taskqueue.stream(executor, send_file_tx, jobs):
+                    metrics.progress(SCRIPT_NAME, result, len(addresses))
+                    successful += result
             break
 
+        elif choice == '3':
+            print_border("STARTING BATCH TRANSFERS FROM FILE", Fore.CYAN)
+            run_batch_tx(w3, private_keys, amount)
+            return
+
         else:
             print(f"{Fore.RED}  ✖ Invalid choice{Style.RESET_ALL}")
             continue
 
+    successful += reconcile.settle(SCRIPT_NAME)
     print()
     print_border(f"COMPLETED: {successful}/{total_txs} TRANSACTIONS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful, "total": total_txs})
 
 if __name__ == "__main__":
-    run_sendtx()
+    import cli
+    cli.run(SCRIPT_NAME, run_sendtx)
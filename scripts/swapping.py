@@ -10,6 +10,17 @@ from web3 import Web3
 from eth_account import Account
 from colorama import init, Fore, Style
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import metrics
+import taskqueue
+import txerrors
+import reconcile
+import provider
+import preflight
+
 init(autoreset=True)
 
 CONFIG_PATH = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(__file__), "..", "config.json"))
@@ -25,7 +36,9 @@ THREADS = config_data.get("threads", {}).get("maxWorkers", 10)
 BORDER_WIDTH = 80
 SOMNIA_TESTNET_RPC_URL = 'https://dream-rpc.somnia.network'
 SOMNIA_TESTNET_EXPLORER_URL = 'https://shannon-explorer.somnia.network'
+CHAIN_ID = 50312
 SHUFFLE_WALLETS = True
+SCRIPT_NAME = "swapping"
 
 TOKEN_ABI = [
     {
@@ -103,7 +116,7 @@ def shuffle_wallets(keys: List[str]) -> List[str]:
 
 def connect_web3():
     try:
-        w3 = Web3(Web3.HTTPProvider(SOMNIA_TESTNET_RPC_URL))
+        w3 = provider.get_web3(SOMNIA_TESTNET_RPC_URL)
         if not w3.is_connected():
             print(f"{Fore.RED}  ✖ Error: Failed to connect to RPC{Style.RESET_ALL}")
             sys.exit(1)
@@ -149,23 +162,28 @@ def get_swap_times() -> int:
 async def approve_token(web3: Web3, private_key: str, token_address: str, spender_address: str,
                        amount: float, wallet_index: int) -> bool:
     try:
-        account = Account.from_key(private_key)
+        with metrics.timer(SCRIPT_NAME, "key_load"):
+            account = Account.from_key(private_key)
         contract = web3.eth.contract(address=Web3.to_checksum_address(token_address), abi=TOKEN_ABI)
-        decimals = contract.functions.decimals().call()
+        with metrics.timer(SCRIPT_NAME, "read"):
+            decimals = contract.functions.decimals().call()
         amount_wei = int(amount * 10**decimals)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = web3.eth.get_transaction_count(account.address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = web3.eth.gas_price
 
         tx = contract.functions.approve(
             Web3.to_checksum_address(spender_address),
             amount_wei
         ).build_transaction({
             'from': account.address,
-            'nonce': web3.eth.get_transaction_count(account.address),
+            'nonce': nonce,
             'gas': 200000,
-            'gasPrice': web3.eth.gas_price
+            'gasPrice': gas_price
         })
-        signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        tx_hash = txerrors.send(web3, SCRIPT_NAME, tx, private_key)
+        receipt = reconcile.wait_for_receipt(web3, SCRIPT_NAME, tx_hash, timeout=120, units=0)
 
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Wallet {wallet_index} Approved {amount} $PING: {SOMNIA_TESTNET_EXPLORER_URL}/tx/0x{tx_hash.hex()}{Style.RESET_ALL}")
@@ -180,7 +198,8 @@ async def approve_token(web3: Web3, private_key: str, token_address: str, spende
 async def swap_token(web3: Web3, private_key: str, token_in: str, token_out: str,
                      amount_in: float, recipient: str, wallet_index: int) -> bool:
     try:
-        account = Account.from_key(private_key)
+        with metrics.timer(SCRIPT_NAME, "key_load"):
+            account = Account.from_key(private_key)
         swap_router_address = "0x6aac14f090a35eea150705f72d90e4cdc4a49b2c"
         fee = 500
         amount_out_min = int(amount_in * 0.97 * 10**18)
@@ -210,6 +229,10 @@ async def swap_token(web3: Web3, private_key: str, token_in: str, token_out: str
             }
         ]
         swap_router = web3.eth.contract(address=Web3.to_checksum_address(swap_router_address), abi=SWAP_ROUTER_ABI)
+        with metrics.timer(SCRIPT_NAME, "nonce"):
+            nonce = web3.eth.get_transaction_count(account.address)
+        with metrics.timer(SCRIPT_NAME, "fee"):
+            gas_price = web3.eth.gas_price
 
         tx_data = swap_router.functions.exactInputSingle(
             (
@@ -223,14 +246,15 @@ async def swap_token(web3: Web3, private_key: str, token_in: str, token_out: str
             )
         ).build_transaction({
             'from': account.address,
-            'nonce': web3.eth.get_transaction_count(account.address),
+            'nonce': nonce,
             'gas': 300000,
-            'gasPrice': web3.eth.gas_price,
-            'chainId': web3.eth.chain_id
+            'gasPrice': gas_price,
+            'chainId': CHAIN_ID
         })
-        signed_tx = web3.eth.account.sign_transaction(tx_data, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+        if not preflight.check(web3, SCRIPT_NAME, tx_data, f"Wallet {wallet_index}"):
+            return False
+        tx_hash = txerrors.send(web3, SCRIPT_NAME, tx_data, private_key)
+        receipt = reconcile.wait_for_receipt(web3, SCRIPT_NAME, tx_hash, timeout=120)
         if receipt.status == 1:
             print(f"{Fore.GREEN}  ✔ Wallet {wallet_index} Swapped {amount_in} $PING -> $PONG: {SOMNIA_TESTNET_EXPLORER_URL}/tx/0x{tx_hash.hex()}{Style.RESET_ALL}")
             return True
@@ -272,6 +296,7 @@ def run_swapping():
     print()
     print_border("START SWAPPING $PING -> $PONG")
     print()
+    metrics.start_run(SCRIPT_NAME)
 
     private_keys = load_private_keys()
     if SHUFFLE_WALLETS:
@@ -292,16 +317,17 @@ def run_swapping():
     successful_swaps = 0
     total_swaps = len(private_keys) * swap_times
 
+    metrics.set_total(SCRIPT_NAME, total_swaps)
     with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
-        futures = []
-        for idx, pk in enumerate(private_keys, 1):
-            futures.append(
-                executor.submit(process_one_wallet_sync, w3, pk, idx, amount, swap_times)
-            )
-        for f in concurrent.futures.as_completed(futures):
-            successful_swaps += f.result()
+        jobs = ((w3, pk, idx, amount, swap_times) for idx, pk in enumerate(private_keys, 1))
+        for result in taskqueue.stream(executor, process_one_wallet_sync, jobs):
+            metrics.progress(SCRIPT_NAME, result, swap_times)
+            successful_swaps += result
 
+    successful_swaps += reconcile.settle(SCRIPT_NAME)
     print_border(f"COMPLETED: {successful_swaps}/{total_swaps} SWAPS SUCCESSFUL", Fore.GREEN)
+    metrics.write_summary(SCRIPT_NAME, {"successful": successful_swaps, "total": total_swaps})
 
 if __name__ == "__main__":
-    run_swapping()
+    import cli
+    cli.run(SCRIPT_NAME, run_swapping)
@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import argparse
+from colorama import init, Fore, Style
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import config
+import metrics
+import txerrors
+import reconcile
+
+init(autoreset=True)
+
+BORDER_WIDTH = 80
+SCRIPT_NAME = "sweep"
+NETWORK_URL = "https://dream-rpc.somnia.network"
+CHAIN_ID = 50312
+EXPLORER_URL = "https://shannon-explorer.somnia.network/tx/"
+SWEEP_CONFIG = config.get_section("sweep")
+# Signed transactions submitted before waiting for their receipts
+IN_FLIGHT = SWEEP_CONFIG.get("inFlight", 1000)
+RECEIPT_TIMEOUT = SWEEP_CONFIG.get("receiptTimeout", 180)
+POLL_INTERVAL = SWEEP_CONFIG.get("pollInterval", 1.0)
+# Gas limit reserved per token transfer; unused gas stays behind as dust
+TOKEN_GAS = SWEEP_CONFIG.get("tokenGas", 100_000)
+NATIVE_GAS = 21_000
+GAS_PRICE_MARGIN = 1.2
+
+TOKENS = {
+    "PING": "0x33E7fAB0a8a5da1A923180989bD617c9c2D1C493",
+    "PONG": "0x9beaA0016c22B646Ac311Ab171270B0ECf23098F",
+    "SWAP_PING": "0xbecd9b5f373877881d91cbdbaf013d97eb532154",
+    "SWAP_PONG": "0x7968ac15a72629e05f41b8271e4e7292e0cc9f90",
+    "sUSDT": "0x65296738D4E5edB1515e40287B6FDf8320E6eE04",
+    "SOMI": "0x7a7045415f3682C3349E4b68d2940204b81fFF33",
+    "SMSM": "0x6756B4542d545270CacF1F15C3b7DefE589Ba1aa",
+    "SMI": "0xC9005DD5C562bDdEF1Cf3C90Ad5B1Bf54fB8aa9d",
+}
+BALANCE_OF = "0x70a08231"
+TRANSFER = "0xa9059cbb"
+
+def print_border(text: str, color=Fore.CYAN, width=BORDER_WIDTH):
+    text = text.strip()
+    if len(text) > width - 4:
+        text = text[:width - 7] + "..."
+    padded_text = f" {text} ".center(width - 2)
+    print(f"{color}┌{'─' * (width - 2)}┐{Style.RESET_ALL}")
+    print(f"{color}│{padded_text}│{Style.RESET_ALL}")
+    print(f"{color}└{'─' * (width - 2)}┘{Style.RESET_ALL}")
+
+def load_keys(file_path: str) -> list:
+    keys = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            key = line.strip()
+            if key and not key.startswith('#'):
+                keys.append(key if key.startswith('0x') else '0x' + key)
+    return keys
+
+def _pad(address: str) -> str:
+    return address.lower().replace("0x", "").rjust(64, "0")
+
+def _int(value) -> int:
+    # "0x" is what eth_call returns for an address without code: nothing to sweep
+    return int(value, 16) if isinstance(value, str) and value not in ("0x", "") else 0
+
+def read_balances(url: str, addresses: list, tokens: dict) -> tuple:
+    """STT balances and nonces as of the pending state, token balances pinned to one block.
+
+    Wallets with any failed read are left out: a missing nonce would sign everything at nonce 0,
+    and a missing balance would plan transfers the wallet cannot cover.
+    """
+    import provider
+    block = provider.rpc_batch(url, [("eth_blockNumber", [])])[0]
+    calls = []
+    for address in addresses:
+        # Balance and nonce from the same (pending) state, so earlier unmined spends are accounted for
+        calls.append(("eth_getBalance", [address, "pending"]))
+        calls.append(("eth_getTransactionCount", [address, "pending"]))
+        for token in tokens.values():
+            calls.append(("eth_call", [{"to": token, "data": BALANCE_OF + _pad(address)}, block]))
+    with metrics.timer(SCRIPT_NAME, "read"):
+        results = provider.rpc_batch(url, calls)
+    stride = 2 + len(tokens)
+    wallets = []
+    for i, address in enumerate(addresses):
+        row = results[i * stride:(i + 1) * stride]
+        failed = [value for value in row if isinstance(value, provider.RpcError)]
+        if failed:
+            metrics.inc(SCRIPT_NAME, "read_errors", len(failed))
+            print(f"{Fore.YELLOW}  ⚠ {address}: skipped, balance read failed: {str(failed[0])}{Style.RESET_ALL}")
+            continue
+        wallets.append({
+            "address": address,
+            "stt": _int(row[0]),
+            "nonce": _int(row[1]),
+            "tokens": {name: _int(value) for name, value in zip(tokens, row[2:])},
+        })
+    return block, wallets
+
+def plan_wallet(wallet: dict, destination: str, tokens: dict, gas_price: int) -> list:
+    """Transactions that move everything out of one wallet: token transfers first, then STT net of all fees."""
+    held = [(name, amount) for name, amount in wallet["tokens"].items() if amount > 0]
+    # Keep the token sweeps the wallet can pay gas for, largest first
+    held.sort(key=lambda item: -item[1])
+    while held and wallet["stt"] < len(held) * TOKEN_GAS * gas_price:
+        held.pop()
+    txs = [{
+        'to': tokens[name],
+        'value': 0,
+        'data': TRANSFER + _pad(destination) + hex(amount)[2:].rjust(64, "0"),
+        'gas': TOKEN_GAS,
+    } for name, amount in held]
+    rest = wallet["stt"] - (len(txs) * TOKEN_GAS + NATIVE_GAS) * gas_price
+    if rest > 0:
+        txs.append({'to': destination, 'value': rest, 'data': '0x', 'gas': NATIVE_GAS})
+    for offset, tx in enumerate(txs):
+        tx.update({'nonce': wallet["nonce"] + offset, 'gasPrice': gas_price, 'chainId': CHAIN_ID})
+    return txs
+
+def submit(w3, url: str, txs: list) -> dict:
+    """Send (address, tx, private key) in bounded windows and wait for each window's receipts; returns outcome counts.
+
+    Each window goes out as one JSON-RPC batch through txerrors.send_batch, so a refused or lost
+    transaction gets the same recovery as a single send.
+    """
+    import provider
+    outcome = {"confirmed": 0, "reverted": 0, "rejected": 0, "timeout": 0}
+    for start in range(0, len(txs), IN_FLIGHT):
+        window = txs[start:start + IN_FLIGHT]
+        results = txerrors.send_batch(w3, SCRIPT_NAME, [(tx, key) for _, tx, key in window],
+                                      labels=[address for address, _, _ in window])
+        pending = {}
+        for (address, _, _), result in zip(window, results):
+            if isinstance(result, Exception):
+                outcome["rejected"] += 1
+                metrics.inc(SCRIPT_NAME, "submit_errors")
+                metrics.progress(SCRIPT_NAME, False)
+                print(f"{Fore.RED}  ✖ {address}: {str(result) or type(result).__name__}{Style.RESET_ALL}")
+            else:
+                reconcile.record(SCRIPT_NAME, w3, result)
+                pending[result] = address
+        submitted = time.perf_counter()
+        while pending and time.perf_counter() - submitted < RECEIPT_TIMEOUT:
+            time.sleep(POLL_INTERVAL)
+            hashes = list(pending)
+            try:
+                with metrics.timer(SCRIPT_NAME, "receipt"):
+                    receipts = provider.rpc_batch(url, [("eth_getTransactionReceipt", [h]) for h in hashes])
+            except Exception:
+                continue
+            for tx_hash, receipt in zip(hashes, receipts):
+                if not isinstance(receipt, dict):
+                    continue
+                pending.pop(tx_hash)
+                metrics.observe(SCRIPT_NAME, "inclusion", time.perf_counter() - submitted)
+                ok = _int(receipt.get("status")) == 1
+                reconcile.resolved(SCRIPT_NAME, tx_hash, "confirmed" if ok else "reverted")
+                outcome["confirmed" if ok else "reverted"] += 1
+                metrics.progress(SCRIPT_NAME, ok)
+                if not ok:
+                    print(f"{Fore.RED}  ✖ Reverted │ Tx: {EXPLORER_URL}{tx_hash}{Style.RESET_ALL}")
+        if pending:
+            # Left to reconcile.settle() at the end of the level
+            for tx_hash in pending:
+                reconcile.timed_out(SCRIPT_NAME, w3, tx_hash)
+            outcome["timeout"] += len(pending)
+            metrics.inc(SCRIPT_NAME, "receipt_timeouts", len(pending))
+            metrics.progress(SCRIPT_NAME, False, len(pending))
+        print(f"{Fore.YELLOW}  ℹ {min(start + IN_FLIGHT, len(txs))}/{len(txs)} transactions settled{Style.RESET_ALL}")
+    return outcome
+
+def sweep_level(w3, url: str, keys: dict, destinations: dict, tokens: dict, dry_run: bool = False) -> dict:
+    """One level: every wallet in `destinations` sweeps to its destination."""
+    block, wallets = read_balances(url, list(destinations), tokens)
+    with metrics.timer(SCRIPT_NAME, "fee"):
+        gas_price = int(w3.eth.gas_price * GAS_PRICE_MARGIN)
+    txs = [(wallet["address"], tx, keys[wallet["address"]]) for wallet in wallets
+           for tx in plan_wallet(wallet, destinations[wallet["address"]], tokens, gas_price)]
+    stt = sum(wallet["stt"] for wallet in wallets)
+    print(f"{Fore.YELLOW}  ℹ Block {int(block, 16)}: {len(wallets)} wallets hold {w3.from_wei(stt, 'ether'):.6f} STT, "
+          f"{len(txs)} transactions at {w3.from_wei(gas_price, 'gwei'):.2f} gwei{Style.RESET_ALL}")
+    if dry_run:
+        return {}
+    metrics.set_total(SCRIPT_NAME, metrics.get_counter(SCRIPT_NAME, "done") + len(txs))
+    return submit(w3, url, txs)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep STT and known tokens from many wallets back to one address")
+    parser.add_argument("--to", default=os.environ.get("MASTER_ADDRESS"), help="destination address (or set MASTER_ADDRESS)")
+    parser.add_argument("--keys", default="pvkey.txt", help="wallets to sweep (default pvkey.txt)")
+    parser.add_argument("--tokens", default=",".join(TOKENS),
+                        help="comma-separated tokens to sweep before STT (default: all known; empty for STT only)")
+    parser.add_argument("--fanin", type=int, default=None,
+                        help="reverse tree: wallets sweep to one collector per FANIN wallets, level by level, then to --to")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="read balances and print what would be swept without sending anything")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    import provider
+    from eth_account import Account
+    w3 = provider.get_web3(NETWORK_URL)
+    if args.fanin is not None and args.fanin < 2:
+        print(f"{Fore.RED}  ✖ --fanin must be at least 2{Style.RESET_ALL}")
+        sys.exit(2)
+    if not args.to or not w3.is_address(args.to):
+        print(f"{Fore.RED}  ✖ Pass a valid --to address (or set MASTER_ADDRESS){Style.RESET_ALL}")
+        sys.exit(2)
+    unknown = [name for name in args.tokens.split(",") if name and name not in TOKENS]
+    if unknown:
+        print(f"{Fore.RED}  ✖ Unknown tokens: {', '.join(unknown)} (known: {', '.join(TOKENS)}){Style.RESET_ALL}")
+        sys.exit(2)
+    tokens = {name: TOKENS[name] for name in args.tokens.split(",") if name}
+    destination = w3.to_checksum_address(args.to)
+    keys = {Account.from_key(key).address: key for key in load_keys(args.keys)}
+    keys.pop(destination, None)
+
+    print_border(f"SWEEP: {len(keys)} WALLETS → {destination}", Fore.CYAN)
+    metrics.start_run(SCRIPT_NAME)
+    started = time.perf_counter()
+    totals = {}
+    level = list(keys)
+    depth = 0
+    while level:
+        if args.fanin and len(level) > args.fanin:
+            # Each group's first wallet collects the rest of its group, then moves up a level
+            groups = [level[i:i + args.fanin] for i in range(0, len(level), args.fanin)]
+            destinations = {member: group[0] for group in groups for member in group[1:]}
+            next_level = [group[0] for group in groups]
+        else:
+            destinations = {address: destination for address in level}
+            next_level = []
+        print_border(f"LEVEL {depth}: {len(destinations)} WALLETS → {len(next_level) or 1} DESTINATION(S)", Fore.MAGENTA)
+        for name, count in sweep_level(w3, NETWORK_URL, keys, destinations, tokens, args.dry_run).items():
+            totals[name] = totals.get(name, 0) + count
+        # Sweeps that land after their receipt wait still count, and still fund the next level's collectors
+        late = reconcile.settle(SCRIPT_NAME)
+        if late:
+            totals["confirmed"] = totals.get("confirmed", 0) + late
+            totals["timeout"] -= late
+        level, depth = next_level, depth + 1
+        if args.dry_run:
+            # Later levels depend on balances this level has not moved yet
+            return
+
+    duration = time.perf_counter() - started
+    print_border(f"COMPLETED: {totals.get('confirmed', 0)} SWEEP TRANSACTIONS IN {duration:.1f}s", Fore.GREEN)
+    print(f"{Fore.YELLOW}  ℹ reverted {totals.get('reverted', 0)}, rejected {totals.get('rejected', 0)}, "
+          f"timed out {totals.get('timeout', 0)}{Style.RESET_ALL}")
+    metrics.write_summary(SCRIPT_NAME, {"successful": totals.get("confirmed", 0), "levels": depth, **totals})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import itertools
+import concurrent.futures
+
+import config
+
+THREADS_CONFIG = config.get_section("threads")
+MAX_WORKERS = THREADS_CONFIG.get("maxWorkers", 10)
+# Jobs queued ahead of the workers. Each one holds its arguments, and then its result until it is consumed,
+# so this (not the number of wallets) is what bounds memory
+IN_FLIGHT = THREADS_CONFIG.get("maxInFlight", MAX_WORKERS * 2)
+
+def stream(executor, fn, jobs, window: int = None):
+    """Run fn(*args) on `executor` for every args tuple drawn from the iterable `jobs`, yielding each
+    result as it completes.
+
+    At most `window` jobs are submitted at a time, and `jobs` is only advanced as they finish, so a
+    generator is consumed at the workers' pace instead of being expanded into one future per job.
+    """
+    window = max(1, window or IN_FLIGHT)
+    jobs = iter(jobs)
+    pending = {executor.submit(fn, *args) for args in itertools.islice(jobs, window)}
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        # Refill before handing results back, so the workers stay busy while the caller aggregates
+        pending.update(executor.submit(fn, *args) for args in itertools.islice(jobs, len(done)))
+        for future in done:
+            yield future.result()
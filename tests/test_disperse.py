@@ -0,0 +1,14 @@
+import disperse
+
+def test_assign_balances_lanes():
+    chunks = [("a", 5), ("b", 4), ("c", 3), ("d", 2)]
+    lanes, unfunded = disperse.assign(chunks, {"x": 100, "y": 100}, cost=lambda chunk: chunk[1])
+    assert unfunded == []
+    assert sorted(len(lane) for lane in lanes.values()) == [2, 2]
+    assert sorted(chunk for lane in lanes.values() for chunk in lane) == sorted(chunks)
+
+def test_assign_respects_balances():
+    chunks = [("big", 50), ("small", 5)]
+    lanes, unfunded = disperse.assign(chunks, {"rich": 40, "poor": 6, "empty": 0}, cost=lambda chunk: chunk[1])
+    assert unfunded == [("big", 50)]
+    assert lanes == {"rich": [("small", 5)]}
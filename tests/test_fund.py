@@ -0,0 +1,25 @@
+import disperse
+import fund
+
+def test_children_heap_layout():
+    assert fund.children(-1, 7, 3) == [0, 1, 2]
+    assert fund.children(0, 7, 3) == [3, 4, 5]
+    assert fund.children(1, 7, 3) == [6]
+    assert fund.children(2, 7, 3) == []
+
+def test_plan_tree_amounts_and_levels():
+    plan = fund.plan_tree([10] * 5, 2, 100, 5, 2)
+    gas_two = disperse.gas_limit(100, 5, 2) * 2
+    gas_one = disperse.gas_limit(100, 5, 1) * 2
+    assert plan["sends"][2:] == [10, 10, 10]
+    assert plan["sends"][0] == 10 + 20 + gas_two
+    assert plan["sends"][1] == 10 + 10 + gas_one
+    assert plan["levels"] == [[-1], [0, 1]]
+    assert plan["transactions"] == 3
+    assert plan["total"] == plan["sends"][0] + plan["sends"][1] + gas_two
+
+def test_plan_tree_single_level():
+    plan = fund.plan_tree([1, 2], 5, 100, 5, 1)
+    assert plan["levels"] == [[-1]]
+    assert plan["sends"] == [1, 2]
+    assert plan["total"] == 3 + disperse.gas_limit(100, 5, 2)
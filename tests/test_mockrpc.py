@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+import mockrpc
+
+def test_no_spec_no_latency():
+    assert mockrpc.sample_latency({}, random.Random(1)) == 0.0
+    assert mockrpc.sample_latency(None, random.Random(1)) == 0.0
+
+def test_fixed():
+    assert mockrpc.sample_latency({"dist": "fixed", "value": 0.25}, random.Random(1)) == 0.25
+    assert mockrpc.sample_latency({"value": 0.25, "max": 0.1}, random.Random(1)) == 0.1
+
+def test_uniform_bounds():
+    rng = random.Random(1)
+    samples = [mockrpc.sample_latency({"dist": "uniform", "min": 0.1, "max": 0.2}, rng) for _ in range(200)]
+    assert all(0.1 <= s <= 0.2 for s in samples)
+
+@pytest.mark.parametrize("spec", [
+    {"dist": "lognormal", "median": 0.05, "sigma": 2.0, "max": 0.3},
+    {"dist": "exponential", "mean": 0.5, "max": 0.3},
+])
+def test_tails_are_capped(spec):
+    rng = random.Random(1)
+    samples = [mockrpc.sample_latency(spec, rng) for _ in range(500)]
+    assert all(0 < s <= 0.3 for s in samples)
+    assert max(samples) == 0.3
+
+def test_same_seed_same_samples():
+    spec = {"dist": "lognormal", "median": 0.05}
+    first = [mockrpc.sample_latency(spec, random.Random(7)) for _ in range(3)]
+    second = [mockrpc.sample_latency(spec, random.Random(7)) for _ in range(3)]
+    assert first == second
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        mockrpc.sample_latency({"dist": "pareto"}, random.Random(1))
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("aiohttp_socks")
+
+from proxypool import ProxyStats
+
+def test_success_rate_starts_neutral():
+    stats = ProxyStats("http://proxy:8080")
+    assert stats.success_rate == 0.5
+    stats.successes, stats.failures = 8, 0
+    assert stats.success_rate == 0.9
+
+def test_score_prefers_fast_reliable_idle():
+    fast, slow = ProxyStats("http://a"), ProxyStats("http://b")
+    fast.latency, slow.latency = 0.1, 1.0
+    assert fast.score() > slow.score()
+    fast.in_flight = 20
+    assert fast.score() < slow.score()
+    slow.failures = 50
+    assert fast.score() > slow.score()
+
+def test_available():
+    stats = ProxyStats("http://a", max_in_flight=2)
+    assert stats.available(now=100.0)
+    stats.in_flight = 2
+    assert not stats.available(now=100.0)
+    stats.in_flight = 0
+    stats.cooldown_until = 150.0
+    assert not stats.available(now=100.0)
+    assert stats.available(now=150.0)
+    stats.retired = True
+    assert not stats.available(now=200.0)
+
+def test_unlimited_in_flight():
+    stats = ProxyStats(None, max_in_flight=0)
+    stats.in_flight = 1000
+    assert stats.available(now=0.0)
+    assert stats.display == "None"
@@ -0,0 +1,24 @@
+import pytest
+
+import bench
+
+def measure(name: str = None) -> dict:
+    result = bench.measure_startup(name)
+    if result["error"] and result["error"].startswith("ModuleNotFoundError"):
+        pytest.skip(result["error"])
+    assert result["error"] is None, result["error"]
+    return result
+
+def test_cli_cold_start():
+    # `python main.py` and the headless CLI, no script yet: none of the heavy modules and within budget
+    result = measure()
+    assert result["loaded"] == []
+    assert result["seconds"] <= bench.STARTUP_BUDGET, result["imports"]
+
+@pytest.mark.parametrize("name", bench.list_scripts())
+def test_script_cold_start(name):
+    # Scripts need web3 to run at all; the compiler and the menu belong to their own code paths
+    result = measure(name)
+    assert "solcx" not in result["loaded"]
+    assert "inquirer" not in result["loaded"]
+    assert result["seconds"] <= bench.STARTUP_BUDGET, result["imports"]
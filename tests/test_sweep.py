@@ -0,0 +1,24 @@
+import sweep
+
+DESTINATION = "0x" + "ab" * 20
+TOKENS = {"PING": "0x" + "01" * 20, "PONG": "0x" + "02" * 20}
+
+def test_plan_wallet_tokens_then_native():
+    gas_price = 10
+    wallet = {"stt": 10 ** 18, "tokens": {"PING": 5, "PONG": 7}, "nonce": 3}
+    txs = sweep.plan_wallet(wallet, DESTINATION, TOKENS, gas_price)
+    assert [tx["to"] for tx in txs] == [TOKENS["PONG"], TOKENS["PING"], DESTINATION]
+    assert [tx["nonce"] for tx in txs] == [3, 4, 5]
+    assert txs[0]["data"].endswith(hex(7)[2:].rjust(64, "0"))
+    assert DESTINATION[2:] in txs[0]["data"]
+    assert txs[-1]["value"] == 10 ** 18 - (2 * sweep.TOKEN_GAS + sweep.NATIVE_GAS) * gas_price
+
+def test_plan_wallet_drops_tokens_it_cannot_pay_gas_for():
+    gas_price = 10
+    wallet = {"stt": sweep.TOKEN_GAS * gas_price, "tokens": {"PING": 5, "PONG": 7}, "nonce": 0}
+    txs = sweep.plan_wallet(wallet, DESTINATION, TOKENS, gas_price)
+    # One token sweep fits, the larger one, and nothing is left for the native transfer
+    assert [tx["to"] for tx in txs] == [TOKENS["PONG"]]
+
+def test_plan_wallet_empty():
+    assert sweep.plan_wallet({"stt": 0, "tokens": {"PING": 0}, "nonce": 0}, DESTINATION, TOKENS, 10) == []
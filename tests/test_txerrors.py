@@ -0,0 +1,37 @@
+import pytest
+import requests
+
+import txerrors
+
+@pytest.mark.parametrize("message, expected", [
+    ("nonce too low", ("nonce_too_low", txerrors.RESYNC_NONCE)),
+    ("already known", ("already_known", txerrors.CHECK_HASH)),
+    ("replacement transaction underpriced", ("nonce_taken", txerrors.RESYNC_NONCE)),
+    ("transaction underpriced", ("underpriced", txerrors.BUMP_FEE)),
+    ("max fee per gas less than block base fee", ("underpriced", txerrors.BUMP_FEE)),
+    ("insufficient funds for gas * price + value", ("insufficient_funds", txerrors.GIVE_UP)),
+    ("Too Many Requests", ("rate_limited", txerrors.BACK_OFF)),
+    ("execution reverted: not owner", ("reverted", txerrors.GIVE_UP)),
+    ("exceeds block gas limit", txerrors.UNKNOWN),
+    ("gas limit exceeded", txerrors.UNKNOWN),
+])
+def test_classify_rpc_errors(message, expected):
+    # web3 raises JSON-RPC errors as ValueError({'code': ..., 'message': ...})
+    assert txerrors.classify(ValueError({"code": -32000, "message": message})) == expected
+
+def test_classify_plain_message():
+    assert txerrors.classify(Exception("Nonce Too Low")) == ("nonce_too_low", txerrors.RESYNC_NONCE)
+
+def test_classify_http_429():
+    response = requests.Response()
+    response.status_code = 429
+    error = requests.exceptions.HTTPError("429 Client Error", response=response)
+    assert txerrors.classify(error) == ("rate_limited", txerrors.BACK_OFF)
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ReadTimeout("read timed out"),
+    requests.exceptions.ConnectionError("connection refused"),
+    TimeoutError(),
+])
+def test_classify_transport_errors(error):
+    assert txerrors.classify(error) == ("timeout", txerrors.CHECK_HASH)
@@ -0,0 +1,181 @@
+import time
+import requests
+from colorama import Fore, Style
+
+import config
+import metrics
+
+TX_ERRORS_CONFIG = config.get_section("txErrors")
+# Submissions per transaction, the first one included
+MAX_ATTEMPTS = TX_ERRORS_CONFIG.get("maxAttempts", 4)
+# Nodes only accept a replacement that raises the fee by at least 10%
+FEE_BUMP = TX_ERRORS_CONFIG.get("feeBump", 1.15)
+# First back-off delay in seconds, doubled on every further attempt
+BACKOFF = TX_ERRORS_CONFIG.get("backoff", 1.0)
+
+# Recovery actions
+RESYNC_NONCE = "resync_nonce"
+BUMP_FEE = "bump_fee"
+CHECK_HASH = "check_hash"
+BACK_OFF = "back_off"
+GIVE_UP = "give_up"
+
+# (class, action, lower-case message fragments); the first class with a matching fragment wins
+TAXONOMY = (
+    ("nonce_too_low", RESYNC_NONCE, ("nonce too low", "invalid nonce", "nonce has already been used")),
+    ("already_known", CHECK_HASH, ("already known", "known transaction", "already imported")),
+    # Scripts take the 'latest' nonce, so this is another pending transaction of the wallet holding it:
+    # bumping would replace (and drop) that one, so move to the next free nonce instead
+    ("nonce_taken", RESYNC_NONCE, ("replacement transaction underpriced",)),
+    ("underpriced", BUMP_FEE, ("transaction underpriced", "fee too low", "max fee per gas less than block base fee")),
+    ("insufficient_funds", GIVE_UP, ("insufficient funds",)),
+    ("rate_limited", BACK_OFF, ("429", "too many requests", "rate limit", "request limit exceeded", "requests limit")),
+    ("timeout", CHECK_HASH, ("timed out", "timeout", "connection aborted", "connection reset")),
+    ("reverted", GIVE_UP, ("execution reverted", "revert")),
+)
+UNKNOWN = ("unknown", GIVE_UP)
+
+def _message(error) -> str:
+    # web3 raises ValueError({'code': ..., 'message': ...}) for JSON-RPC errors
+    if error.args and isinstance(error.args[0], dict):
+        return str(error.args[0].get("message", error.args[0])).lower()
+    return str(error).lower()
+
+def classify(error) -> tuple:
+    """(class, recovery action) for an exception raised while submitting a transaction."""
+    if isinstance(error, requests.exceptions.HTTPError) and getattr(error.response, "status_code", None) == 429:
+        return "rate_limited", BACK_OFF
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, TimeoutError)):
+        # The request may have reached the node before the connection gave out
+        return "timeout", CHECK_HASH
+    message = _message(error)
+    for kind, action, fragments in TAXONOMY:
+        if any(fragment in message for fragment in fragments):
+            return kind, action
+    return UNKNOWN
+
+def _broadcast(w3, tx_hash) -> bool:
+    # TransactionNotFound, or the node is still not answering: either way, send the same bytes again
+    try:
+        return w3.eth.get_transaction(tx_hash) is not None
+    except Exception:
+        return False
+
+def _bump(tx: dict):
+    for key in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"):
+        if tx.get(key):
+            tx[key] = int(tx[key] * FEE_BUMP)
+
+def _sign(w3, script: str, tx: dict, private_key: str):
+    with metrics.timer(script, "sign"):
+        return w3.eth.account.sign_transaction(tx, private_key)
+
+def _hex(tx_hash) -> str:
+    return tx_hash if isinstance(tx_hash, str) else "0x" + bytes(tx_hash).hex()
+
+def send(w3, script: str, tx: dict, private_key: str, label: str = None, signed_tx=None, error: Exception = None,
+         sent: dict = None):
+    """Sign and submit `tx`, recovering from errors that are not the transaction's fault.
+
+    A stale or taken nonce is resynced from the pending count (unless this very transaction is what
+    used it up), a fee below the node's floor is bumped, a timeout or "already known" is settled by
+    looking for the hash, and rate limiting is backed off. Returns the
+    transaction hash, or re-raises once the error is one to give up on or MAX_ATTEMPTS are spent.
+    Every error is counted as tx_error_<class>, and every one that was got past as recovered_<class>.
+
+    `signed_tx` and `error` resume from a submission made elsewhere (send_batch) that failed with
+    `error`. `sent`, if given, is updated with the transaction that went out, whose nonce or fees
+    recovery may have changed.
+    """
+    tx = dict(tx)
+    signed_tx = signed_tx or _sign(w3, script, tx, private_key)
+    errors = []
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        tx_hash = None
+        if error is None:
+            try:
+                with metrics.timer(script, "submit"):
+                    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                error = e
+        if error is not None:
+            kind, action = classify(error)
+            metrics.inc(script, f"tx_error_{kind}")
+            if action == GIVE_UP or attempt == MAX_ATTEMPTS:
+                raise error
+            error = None
+            errors.append(kind)
+            print(f"{Fore.YELLOW}  ⚠ {label or tx.get('from', 'Transaction')}: {kind.replace('_', ' ')}, "
+                  f"{action.replace('_', ' ')} (attempt {attempt}/{MAX_ATTEMPTS}){Style.RESET_ALL}")
+            if action == CHECK_HASH:
+                # "already known" means the node holds these exact bytes; after a timeout, ask for them
+                if kind == "already_known" or _broadcast(w3, signed_tx.hash):
+                    tx_hash = signed_tx.hash
+            elif action == RESYNC_NONCE and _broadcast(w3, signed_tx.hash):
+                # An earlier attempt of this transaction landed after all (e.g. after a timeout)
+                tx_hash = signed_tx.hash
+            elif action == RESYNC_NONCE:
+                with metrics.timer(script, "nonce"):
+                    tx['nonce'] = w3.eth.get_transaction_count(w3.eth.account.from_key(private_key).address, 'pending')
+                signed_tx = _sign(w3, script, tx, private_key)
+            elif action == BUMP_FEE:
+                _bump(tx)
+                signed_tx = _sign(w3, script, tx, private_key)
+            elif action == BACK_OFF:
+                time.sleep(BACKOFF * 2 ** (attempt - 1))
+            if tx_hash is None:
+                continue
+        for kind in errors:
+            metrics.inc(script, f"recovered_{kind}")
+        if sent is not None:
+            sent.update(tx)
+        return tx_hash
+
+def send_batch(w3, script: str, txs: list, labels: list = None) -> list:
+    """Sign and submit (tx, private_key) pairs as one JSON-RPC batch, with send()'s recovery.
+
+    Returns, per pair, the transaction hash (a hex string) or the exception it was given up on. A pair
+    the node refused carries on in send() from that error. If the batch itself failed in transit,
+    the pairs whose hash the node holds count as sent and the rest are submitted again one by one;
+    if the node cannot be asked either, every pair fails with the transport error.
+    """
+    import provider
+    url = w3.provider.endpoint_uri
+    labels = labels or [None] * len(txs)
+    signed = [_sign(w3, script, tx, private_key) for tx, private_key in txs]
+    lost = None
+    try:
+        with metrics.timer(script, "submit"):
+            replies = provider.rpc_batch(url, [("eth_sendRawTransaction", [_hex(s.raw_transaction)]) for s in signed])
+    except Exception as e:
+        lost, _ = classify(e)
+        metrics.inc(script, f"tx_error_{lost}", len(signed))
+        try:
+            known = provider.rpc_batch(url, [("eth_getTransactionByHash", [_hex(s.hash)]) for s in signed])
+        except Exception:
+            return [e] * len(signed)
+        # None: not there (or not answered), so submit those bytes again
+        replies = [s.hash if isinstance(found, dict) else None for s, found in zip(signed, known)]
+    results = []
+    for (tx, private_key), s, reply, label in zip(txs, signed, replies, labels):
+        try:
+            if reply is None or isinstance(reply, Exception):
+                reply = send(w3, script, tx, private_key, label, signed_tx=s, error=reply)
+        except Exception as e:
+            results.append(e)
+            continue
+        if lost is not None:
+            metrics.inc(script, f"recovered_{lost}")
+        results.append(_hex(reply))
+    return results
+
+def stats(script: str) -> dict:
+    """{class: (errors, recovered)} for every class seen in this run."""
+    counters = metrics.snapshot(script).get(script, {}).get("counters", {})
+    kinds = [name[len("tx_error_"):] for name in counters if name.startswith("tx_error_")]
+    return {kind: (counters[f"tx_error_{kind}"], counters.get(f"recovered_{kind}", 0)) for kind in sorted(kinds)}
+
+def report(script: str):
+    for kind, (errors, recovered) in stats(script).items():
+        color = Fore.GREEN if recovered == errors else Fore.YELLOW
+        print(f"{color}  ℹ Send errors, {kind.replace('_', ' ')}: {recovered}/{errors} recovered{Style.RESET_ALL}")